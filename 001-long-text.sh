@@ -7,12 +7,16 @@ then
     exit 1
 fi
 
-# spawn
+# write a manifest of 26 jobs, whose paths are relative to it
+manifest="tests/001-long-text.jsonl"
+: > "${manifest}"
 for i in {a..z}
 do
-    edge-tts -f tests/001-long-text.txt --write-media "tests/001-long-text_${i}.mp3" --write-subtitles "tests/001-long-text_${i}.srt" &
+    printf '{"file": "001-long-text.txt", "write_media": "001-long-text_%s.mp3", "write_subtitles": "001-long-text_%s.srt"}\n' "${i}" "${i}" >> "${manifest}"
 done
-wait
+
+# run all jobs at once in one process
+edge-tts --batch "${manifest}" --jobs 26 --overwrite || exit 1
 
 # set return code to 0
 ret=0
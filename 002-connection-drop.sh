@@ -0,0 +1,68 @@
+#!/usr/bin/env bash
+
+# a connection closed before turn.end must fail the stream, and a resumed
+# save must pick up from the last finished partial text
+python3 - <<'EOF' || exit 1
+import asyncio
+import os
+import sys
+
+from edge_tts.communicate import Communicate
+from edge_tts.exceptions import WebSocketError
+from edge_tts.stub_server import StubServer
+
+TEXT = " ".join(f"word{i}." for i in range(1500))
+REFERENCE = "tests/002-connection-drop_reference.mp3"
+RESUMED = "tests/002-connection-drop_resumed.mp3"
+
+
+async def main() -> int:
+    for fname in (REFERENCE, RESUMED, RESUMED + ".checkpoint"):
+        if os.path.exists(fname):
+            os.remove(fname)
+
+    async with StubServer(seed=1) as server:
+        await Communicate(
+            TEXT, initial_byte_length=300, endpoint=server.url
+        ).save(REFERENCE)
+
+    # every dropped connection has to surface as an error on every path
+    for options in ({}, {"reuse_connection": True}, {"max_concurrency": 3}):
+        async with StubServer(drop_rate=1.0, seed=1) as server:
+            try:
+                async for _ in Communicate(
+                    TEXT, endpoint=server.url, **options
+                ).stream():
+                    pass
+            except WebSocketError:
+                continue
+        print(f"a dropped connection was not reported with {options}")
+        return 1
+
+    # a resumed save has to end up with the same audio despite the drops
+    async with StubServer(drop_rate=0.3, seed=2) as server:
+        errors = 0
+        while True:
+            try:
+                await Communicate(
+                    TEXT, initial_byte_length=300, endpoint=server.url
+                ).save(RESUMED, resume=True)
+                break
+            except WebSocketError:
+                errors += 1
+        if errors != server.stats["dropped"]:
+            print(f"{server.stats['dropped']} drops, but {errors} errors")
+            return 1
+
+    with open(REFERENCE, "rb") as reference, open(RESUMED, "rb") as resumed:
+        if reference.read() != resumed.read():
+            print("the resumed audio differs from the reference")
+            return 1
+    if os.path.exists(RESUMED + ".checkpoint"):
+        print("the checkpoint was not removed")
+        return 1
+    return 0
+
+
+sys.exit(asyncio.run(main()))
+EOF
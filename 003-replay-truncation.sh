@@ -0,0 +1,40 @@
+#!/usr/bin/env bash
+
+# a recording cut short anywhere within its last record must be refused
+python3 - <<'EOF' || exit 1
+import asyncio
+import sys
+
+from edge_tts.communicate import Communicate
+from edge_tts.stub_server import StubServer
+from edge_tts.transport import RECORD, SessionRecorder, SessionReplay
+
+RECORDING = "tests/003-replay-truncation.rec"
+TRUNCATED = "tests/003-replay-truncation_truncated.rec"
+
+
+async def record() -> None:
+    async with StubServer(seed=1) as server:
+        with SessionRecorder(RECORDING) as recorder:
+            await Communicate(
+                "Hello, world! " * 20, endpoint=server.url, recorder=recorder
+            ).save("tests/003-replay-truncation.mp3")
+
+
+asyncio.run(record())
+with open(RECORDING, "rb") as file:
+    data = file.read()
+
+# the complete recording has to be accepted
+SessionReplay(RECORDING).close()
+
+for cut in range(1, 2 * RECORD.size + 1):
+    with open(TRUNCATED, "wb") as file:
+        file.write(data[:-cut])
+    try:
+        SessionReplay(TRUNCATED).close()
+    except ValueError:
+        continue
+    print(f"a recording missing its last {cut} bytes was accepted")
+    sys.exit(1)
+EOF
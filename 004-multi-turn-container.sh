@@ -0,0 +1,50 @@
+#!/usr/bin/env bash
+
+# audio of several turns must make up a single valid file
+python3 - <<'EOF' || exit 1
+import asyncio
+import sys
+import wave
+
+from edge_tts.communicate import Communicate
+from edge_tts.stub_server import StubServer
+
+TEXT = " ".join(f"word{i}." for i in range(1500))
+RIFF = "tests/004-multi-turn-container.wav"
+
+
+async def main() -> int:
+    async with StubServer(seed=1) as server:
+        raw = bytearray()
+        async for chunk in Communicate(
+            TEXT, output_format="raw-24khz-16bit-mono-pcm", endpoint=server.url
+        ).stream():
+            if chunk["type"] == "audio":
+                raw += chunk["data"]
+
+        for options in ({}, {"reuse_connection": True}, {"max_concurrency": 3}):
+            await Communicate(
+                TEXT,
+                output_format="riff-24khz-16bit-mono-pcm",
+                endpoint=server.url,
+                **options,
+            ).save(RIFF)
+            with open(RIFF, "rb") as file:
+                data = file.read()
+            with wave.open(RIFF) as riff:
+                frames = riff.readframes(riff.getnframes())
+            if data.count(b"RIFF") != 1 or frames != bytes(raw):
+                print(f"the RIFF file is not the audio of all turns with {options}")
+                return 1
+
+    # containers whose stream starts over every turn cannot hold several
+    try:
+        Communicate(TEXT, output_format="webm-24khz-16bit-mono-opus")
+    except ValueError:
+        return 0
+    print("a text of several turns was accepted for webm")
+    return 1
+
+
+sys.exit(asyncio.run(main()))
+EOF
@@ -0,0 +1,46 @@
+#!/usr/bin/env bash
+
+# max_concurrency partial texts must be in flight at once when no limiter
+# is given
+python3 - <<'EOF' || exit 1
+import asyncio
+import sys
+
+from edge_tts.communicate import Communicate
+from edge_tts.stub_server import StubServer
+
+TEXT = " ".join(f"word{i}." for i in range(6000))
+
+
+async def main() -> int:
+    for max_concurrency in (8, 12):
+        async with StubServer(latency=0.3, seed=1) as server:
+            communicate = Communicate(
+                TEXT,
+                initial_byte_length=300,
+                max_concurrency=max_concurrency,
+                endpoint=server.url,
+            )
+            peak = 0
+
+            async def sample() -> None:
+                nonlocal peak
+                while True:
+                    peak = max(peak, communicate.limiter.in_flight)
+                    await asyncio.sleep(0.01)
+
+            sampler = asyncio.create_task(sample())
+            try:
+                async for _ in communicate.stream():
+                    pass
+            finally:
+                sampler.cancel()
+
+        if peak != max_concurrency:
+            print(f"{peak} turns in flight, expected {max_concurrency}")
+            return 1
+    return 0
+
+
+sys.exit(asyncio.run(main()))
+EOF
@@ -0,0 +1,29 @@
+#!/usr/bin/env bash
+
+# text must never be split inside a UTF-8 character, and a maximum byte
+# length too small for the next character must be refused
+python3 - <<'EOF' || exit 1
+import sys
+
+from edge_tts.communicate import split_text_by_byte_length
+
+TEXT = "😀😀 😀😀😀 a😀b"
+
+for byte_length in (1, 2, 3):
+    try:
+        chunks = list(split_text_by_byte_length(TEXT, byte_length))
+    except ValueError:
+        continue
+    print(f"byte_length {byte_length} was accepted: {chunks}")
+    sys.exit(1)
+
+for byte_length in range(4, 20):
+    chunks = list(split_text_by_byte_length(TEXT, byte_length))
+    if any(len(chunk) > byte_length for chunk in chunks):
+        print(f"a chunk is longer than {byte_length} bytes: {chunks}")
+        sys.exit(1)
+    joined = "".join(chunk.decode("utf-8") for chunk in chunks)
+    if joined.replace(" ", "") != TEXT.replace(" ", ""):
+        print(f"characters were lost with byte_length {byte_length}: {chunks}")
+        sys.exit(1)
+EOF
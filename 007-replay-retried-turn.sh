@@ -0,0 +1,57 @@
+#!/usr/bin/env bash
+
+# a turn whose connection closed before turn.end must not be recorded, so
+# that the turn it was retried with is the one replayed
+python3 - <<'EOF' || exit 1
+import asyncio
+import sys
+
+import aiohttp
+
+from edge_tts.transport import SessionRecorder, SessionReplay
+
+RECORDING = "tests/007-replay-retried-turn.rec"
+TURN_END = "X-RequestId:0\r\nContent-Type:application/json\r\nPath:turn.end\r\n\r\n{}"
+
+
+class Connection:
+    """Answers every receive with the next of the given messages."""
+
+    def __init__(self, *messages: aiohttp.WSMessage) -> None:
+        self.messages = list(messages)
+
+    async def send_str(self, data: str) -> None:
+        pass
+
+    async def receive(self, timeout: object = None) -> aiohttp.WSMessage:
+        return self.messages.pop(0)
+
+
+async def main() -> int:
+    stale = Connection(aiohttp.WSMessage(aiohttp.WSMsgType.CLOSE, None, None))
+    fresh = Connection(
+        aiohttp.WSMessage(aiohttp.WSMsgType.BINARY, b"audio", None),
+        aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, TURN_END, None),
+    )
+    with SessionRecorder(RECORDING) as recorder:
+        for connection in (stale, fresh):
+            transport = recorder.record_turn(connection, b"turn")
+            await transport.send_str("ssml")
+            while (await transport.receive()).type == aiohttp.WSMsgType.BINARY:
+                pass
+        if recorder.turns != 1:
+            print(f"{recorder.turns} turns were recorded, expected 1")
+            return 1
+
+    with SessionReplay(RECORDING, speed=None) as replay:
+        transport = replay.replay_turn(b"turn")
+        await transport.send_str("ssml")
+        received = await transport.receive()
+        if received.type != aiohttp.WSMsgType.BINARY or received.data != b"audio":
+            print(f"the failed turn was replayed: {received}")
+            return 1
+    return 0
+
+
+sys.exit(asyncio.run(main()))
+EOF
@@ -0,0 +1,212 @@
+"""BackgroundLoop module is used to run the coroutines of the synchronous API on
+one long-lived event loop thread, instead of starting a thread and an event
+loop for every call."""
+
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+from collections import deque
+from typing import (
+    Any,
+    AsyncGenerator,
+    Coroutine,
+    Deque,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from .session import SessionManager
+
+T = TypeVar("T")
+
+# An item handed from the event loop thread, as (True, item), or the end of
+# the items, as (False, None) or (False, error).
+Handoff = Tuple[bool, Any]
+
+# The default number of items handed from the event loop thread to the
+# thread consuming them that may be waiting to be consumed.
+DEFAULT_QUEUE_SIZE = 64
+
+
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    """Wakes the coroutine waiting for the future, unless it was cancelled."""
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class _BatchQueue:
+    """
+    Hands items from a coroutine on an event loop to a thread. The thread
+    takes all the items waiting at once, so the threads wake each other at
+    most once per batch instead of passing every item through the loop.
+    The coroutine waits while max_size items are waiting to be taken.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_size: int) -> None:
+        self.loop = loop
+        self.max_size = max_size
+        self.items: Deque[Handoff] = deque()
+        self.ready = threading.Condition()
+        self.space: "Optional[asyncio.Future[None]]" = None
+
+    async def put(self, handoff: Handoff) -> None:
+        """Adds an item, waiting for the thread to take the items if full."""
+        space: "Optional[asyncio.Future[None]]" = None
+        with self.ready:
+            self.items.append(handoff)
+            if len(self.items) >= self.max_size:
+                space = self.space = self.loop.create_future()
+            self.ready.notify()
+        if space is not None:
+            await space
+
+    def take(self) -> List[Handoff]:
+        """Takes all the waiting items, waiting for one if there are none."""
+        with self.ready:
+            while not self.items:
+                self.ready.wait()
+            batch = list(self.items)
+            self.items.clear()
+            space, self.space = self.space, None
+        if space is not None:
+            self.loop.call_soon_threadsafe(_wake, space)
+        return batch
+
+
+async def _produce(agen: AsyncGenerator[T, None], queue: _BatchQueue) -> None:
+    """
+    Puts the items of the async generator into the queue as (True, item),
+    followed by (False, None) at its end or (False, error) if it raised.
+    """
+    try:
+        async for item in agen:
+            await queue.put((True, item))
+    except asyncio.CancelledError:  # pylint: disable=try-except-raise
+        # Before Python 3.8, CancelledError is a subclass of Exception.
+        raise
+    except Exception as e:  # pylint: disable=broad-except
+        await queue.put((False, e))
+        return
+    finally:
+        await agen.aclose()
+    await queue.put((False, None))
+
+
+class BackgroundLoop:
+    """
+    BackgroundLoop owns an event loop running in a daemon thread, which
+    Communicate.stream_sync() and Communicate.save_sync() run their
+    coroutines on. As the loop outlives the calls, so do the pooled
+    connections of its session, and no thread or loop is started per call.
+    """
+
+    _default: Optional["BackgroundLoop"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="edge-tts-loop", daemon=True
+        )
+        self.thread.start()
+
+    @classmethod
+    def default(cls) -> "BackgroundLoop":
+        """
+        Returns the process-wide background loop, starting it if needed.
+
+        Returns:
+            BackgroundLoop: The process-wide background loop.
+        """
+        with cls._default_lock:
+            if cls._default is None or not cls._default.thread.is_alive():
+                cls._default = cls()
+                atexit.register(cls._default.close)
+            return cls._default
+
+    def __check_thread(self) -> None:
+        if threading.current_thread() is self.thread:
+            raise RuntimeError(
+                "the synchronous API cannot be used from its own event loop"
+            )
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """
+        Runs the coroutine on the loop and waits for its result. If waiting
+        is interrupted, the coroutine is cancelled.
+
+        Args:
+            coro (Coroutine): The coroutine to run.
+
+        Returns:
+            The result of the coroutine.
+        """
+        self.__check_thread()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result()
+        finally:
+            if not future.done():
+                future.cancel()
+                concurrent.futures.wait([future])
+
+    def iterate(
+        self, agen: AsyncGenerator[T, None], queue_size: int = DEFAULT_QUEUE_SIZE
+    ) -> Generator[T, None, None]:
+        """
+        Iterates the async generator on the loop, handing its items to the
+        calling thread in batches of at most queue_size items, so that a slow
+        consumer holds up the async generator instead of letting the items
+        pile up. Closing the returned generator early cancels the async
+        generator.
+
+        Args:
+            agen (AsyncGenerator): The async generator to iterate.
+            queue_size (int): The maximum number of items waiting to be
+                consumed.
+
+        Yields:
+            The items of the async generator.
+        """
+        self.__check_thread()
+
+        queue = _BatchQueue(self.loop, queue_size)
+        producer = asyncio.run_coroutine_threadsafe(_produce(agen, queue), self.loop)
+        try:
+            while True:
+                for is_item, value in queue.take():
+                    if not is_item:
+                        if isinstance(value, BaseException):
+                            raise value
+                        return
+                    yield value
+        finally:
+            if not producer.done():
+                producer.cancel()
+            concurrent.futures.wait([producer])
+
+    def close(self) -> None:
+        """
+        Closes the session of the loop, stops the loop and waits for its
+        thread to end.
+
+        Returns:
+            None
+        """
+        if self.loop.is_closed() or not self.thread.is_alive():
+            return
+
+        async def shutdown() -> None:
+            await SessionManager.default().close()
+            await self.loop.shutdown_asyncgens()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
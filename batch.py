@@ -0,0 +1,310 @@
+"""BatchCommunicator module is used to synthesize many texts with the same
+settings, a bounded number at once over a shared pool of connections, reporting
+every text as it completes."""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from typing_extensions import Literal
+
+from .background_loop import BackgroundLoop
+from .communicate import Communicate
+from .constants import DEFAULT_VOICE
+from .data_classes import TTSConfig
+from .formats import DEFAULT_OUTPUT_FORMAT
+from .limiter import AdaptiveLimiter
+from .metrics import Metrics
+from .pool import DEFAULT_MAX_IDLE_TIME, ConnectionPool
+from .session import SessionManager
+from .sinks import Sink, SubtitleSink
+
+# The suffix of the files outputs are written to until their job succeeds.
+PART_SUFFIX = ".part"
+
+# Where the audio or metadata of a job is saved to.
+Output = Union[str, bytes, Sink]
+
+
+@dataclass
+class BatchJob:  # pylint: disable=too-many-instance-attributes
+    """
+    A text to synthesize, along with where to save its audio and, optionally,
+    its metadata or its subtitles. The voice and prosody of the
+    BatchCommunicator are used unless the job overrides them.
+    """
+
+    text: str
+    output: Output
+    metadata: Optional[Output] = None
+    subtitles: Optional[Union[str, bytes]] = None
+    voice: Optional[str] = None
+    rate: Optional[str] = None
+    volume: Optional[str] = None
+    pitch: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        """
+        Validates the BatchJob object after initialization.
+        """
+        if self.metadata is not None and self.subtitles is not None:
+            raise ValueError("metadata cannot be used with subtitles")
+
+    def overrides(self) -> Dict[str, str]:
+        """
+        Returns the settings the job overrides.
+
+        Returns:
+            Dict[str, str]: The overridden settings by name.
+        """
+        return {
+            name: value
+            for name, value in (
+                ("voice", self.voice),
+                ("rate", self.rate),
+                ("volume", self.volume),
+                ("pitch", self.pitch),
+            )
+            if value is not None
+        }
+
+
+@dataclass
+class BatchResult:
+    """
+    The outcome of a BatchJob. The error is None if the job succeeded.
+    """
+
+    index: int
+    job: BatchJob
+    error: Optional[Exception] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether the job succeeded."""
+        return self.error is None
+
+
+# A job, given as a BatchJob or as a tuple of the text, the audio output
+# and, optionally, the metadata output, which are passed to BatchJob.
+JobLike = Union[BatchJob, Tuple[str, Output], Tuple[str, Output, Optional[Output]]]
+
+
+def _as_job(job: JobLike) -> BatchJob:
+    """Returns the job as a BatchJob."""
+    if isinstance(job, BatchJob):
+        return job
+    if isinstance(job, tuple) and len(job) in (2, 3):
+        return BatchJob(*job)
+    raise TypeError("job must be BatchJob or a tuple of text, output and metadata")
+
+
+def _part_name(fname: Union[str, bytes]) -> Union[str, bytes]:
+    """Returns the name of the file an output is written to until it succeeds."""
+    if isinstance(fname, bytes):
+        return fname + PART_SUFFIX.encode("utf-8")
+    return fname + PART_SUFFIX
+
+
+class BatchCommunicator:
+    """
+    BatchCommunicator synthesizes many texts, up to max_concurrency texts at
+    once. Its settings are validated once, and jobs can override the voice
+    and prosody, whose validation is remembered across jobs. The connections
+    the texts are sent over are pooled, so that a text is sent over a
+    connection left open by an earlier one where possible instead of
+    connecting again, which dominates the time taken by short texts.
+
+    Audio, metadata and subtitles saved to files are written to a temporary
+    file next to them which only replaces them once the job succeeds, so that
+    a file exists only if its job succeeded.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(
+        self,
+        voice: str = DEFAULT_VOICE,
+        *,
+        rate: str = "+0%",
+        volume: str = "+0%",
+        pitch: str = "+0Hz",
+        boundary: Literal["WordBoundary", "SentenceBoundary"] = "SentenceBoundary",
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
+        proxy: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        connect_timeout: Optional[int] = 10,
+        receive_timeout: Optional[int] = 60,
+        max_concurrency: int = 8,
+        max_idle_time: float = DEFAULT_MAX_IDLE_TIME,
+        session_manager: Optional[SessionManager] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        # Validate the TTS settings once, so that invalid settings fail
+        # before any job is started.
+        self.tts_config = TTSConfig(voice, rate, volume, pitch, boundary, output_format)
+
+        # Validate the max_concurrency parameter.
+        if not isinstance(max_concurrency, int):
+            raise TypeError("max_concurrency must be int")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        self.max_concurrency: int = max_concurrency
+
+        # Validate the max_idle_time parameter.
+        if not isinstance(max_idle_time, (int, float)):
+            raise TypeError("max_idle_time must be float")
+        if max_idle_time <= 0:
+            raise ValueError("max_idle_time must be greater than 0")
+        self.max_idle_time: float = float(max_idle_time)
+
+        # Unless a limiter is given, the jobs share one of their own that
+        # starts out allowing max_concurrency connections, as the process-wide
+        # one starts out lower and would hold the jobs back.
+        if limiter is None:
+            limiter = AdaptiveLimiter(
+                initial_limit=max_concurrency, max_limit=max_concurrency
+            )
+
+        # The remaining parameters are validated by Communicate when the
+        # first job is started.
+        self.options: Dict[str, Any] = {
+            "voice": voice,
+            "rate": rate,
+            "volume": volume,
+            "pitch": pitch,
+            "boundary": boundary,
+            "output_format": output_format,
+            "proxy": proxy,
+            "endpoint": endpoint,
+            "connect_timeout": connect_timeout,
+            "receive_timeout": receive_timeout,
+            "session_manager": session_manager,
+            "limiter": limiter,
+            "metrics": metrics,
+        }
+
+    async def __run_job(self, job: BatchJob, pool: ConnectionPool) -> None:
+        """Synthesizes a job, replacing its output files once it succeeds."""
+        outputs: List[Tuple[Union[str, bytes], Union[str, bytes]]] = [
+            (output, _part_name(output))
+            for output in (job.output, job.metadata, job.subtitles)
+            if isinstance(output, (str, bytes))
+        ]
+        parts = dict(outputs)
+        audio = job.output
+        metadata = job.metadata
+        if isinstance(audio, (str, bytes)):
+            audio = parts[audio]
+        if isinstance(metadata, (str, bytes)):
+            metadata = parts[metadata]
+        if job.subtitles is not None:
+            metadata = SubtitleSink(parts[job.subtitles])
+
+        communicate = Communicate(
+            job.text,
+            reuse_connection=True,
+            pool=pool,
+            **{**self.options, **job.overrides()},
+        )
+        try:
+            await communicate.save(audio, metadata)
+            for output, part in outputs:
+                os.replace(part, output)
+        except BaseException:
+            for _, part in outputs:
+                try:
+                    os.remove(part)
+                except FileNotFoundError:
+                    pass
+            raise
+
+    async def run(self, jobs: Iterable[JobLike]) -> AsyncGenerator[BatchResult, None]:
+        """
+        Synthesizes the jobs and yields their results as they complete, in
+        the order they complete. A job that fails yields its error in its
+        result instead of stopping the other jobs.
+
+        The jobs are taken from the iterable as they are started, so it can
+        be a generator of any length.
+
+        Args:
+            jobs (Iterable): The jobs, as BatchJob instances or tuples of the
+                text, the audio output and, optionally, the metadata output.
+
+        Yields:
+            BatchResult: The result of every job.
+
+        Raises:
+            TypeError: If a job is neither a BatchJob nor a tuple. The jobs
+                already started are completed first.
+        """
+        pending: Iterator[Tuple[int, BatchJob]] = (
+            (index, _as_job(job)) for index, job in enumerate(jobs)
+        )
+        results: "asyncio.Queue[Optional[BatchResult]]" = asyncio.Queue()
+
+        async with ConnectionPool(
+            max_idle=self.max_concurrency, max_idle_time=self.max_idle_time
+        ) as pool:
+
+            async def worker() -> None:
+                """
+                Runs jobs one after another until none are left, and puts
+                None into the results once it is done.
+                """
+                try:
+                    for index, job in pending:
+                        started = time.monotonic()
+                        error: Optional[Exception] = None
+                        try:
+                            await self.__run_job(job, pool)
+                        except Exception as e:  # pylint: disable=broad-except
+                            error = e
+                        results.put_nowait(
+                            BatchResult(index, job, error, time.monotonic() - started)
+                        )
+                finally:
+                    results.put_nowait(None)
+
+            workers = [
+                asyncio.create_task(worker()) for _ in range(self.max_concurrency)
+            ]
+            try:
+                finished = 0
+                while finished < len(workers):
+                    result = await results.get()
+                    if result is None:
+                        finished += 1
+                    else:
+                        yield result
+
+                # Raise the error of the jobs, if any.
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+    def run_sync(self, jobs: Iterable[JobLike]) -> Generator[BatchResult, None, None]:
+        """
+        Synchronous interface for async run method.
+
+        The jobs run on a shared background event loop. Closing the generator
+        early cancels the jobs that are still running.
+        """
+        yield from BackgroundLoop.default().iterate(self.run(jobs))
@@ -0,0 +1,500 @@
+"""Offline microbenchmarks of the text and subtitle paths of edge-tts, which
+report the throughput and peak memory of each function and compare them against
+a saved baseline. Run them with python -m edge_tts.benchmarks."""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections import deque
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from tabulate import tabulate
+
+from .communicate import (
+    get_headers_and_data,
+    mkssml,
+    remove_incompatible_characters,
+    split_text_by_byte_length,
+)
+from .constants import DEFAULT_VOICE
+from .data_classes import TTSConfig
+from .srt_composer import Subtitle, compose
+from .submaker import SubMaker
+from .typing import TTSChunk
+
+# The version of the baseline file format.
+BASELINE_VERSION = 1
+
+# The byte length Communicate splits texts into.
+SPLIT_BYTE_LENGTH = 4096
+
+# The text sizes and cue counts benchmarked by default and with --full.
+DEFAULT_SIZES = "1K,64K,1M"
+FULL_SIZES = "1K,64K,1M,10M,100M"
+DEFAULT_CUES = "100000"
+FULL_CUES = "100000,1000000"
+
+# The shortest time a timed sample of a benchmark takes, in seconds.
+MIN_SAMPLE_TIME = 0.05
+
+# The units of the size suffixes accepted by --sizes.
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+# The repeating patterns of the texts the splitter is benchmarked on.
+TEXT_PATTERNS = {
+    "ascii": "The quick brown fox jumps over the lazy dog. ",
+    "cjk": "今天天气很好，我们去公园散步吧。",
+    "nospace": "abcdefghijklmnopqrstuvwxyz0123456789",
+    "entities": escape("Tom & Jerry <3 \"cheese\" & 'crackers' > "),
+}
+
+# The pattern of the texts remove_incompatible_characters() and escape() are
+# benchmarked on, with characters they replace.
+RAW_PATTERN = 'Fish & chips <cheap>\x0bcolumn\x0cbreak\x1f "quoted" text. '
+
+# A binary audio message as received from the service, and the length of its
+# headers.
+AUDIO_HEADERS = (
+    b"X-RequestId:0123456789abcdef0123456789abcdef\r\n"
+    b"Content-Type:audio/mpeg\r\n"
+    b"X-StreamId:0123456789ABCDEF0123456789ABCDEF\r\n"
+    b"Path:audio"
+)
+AUDIO_MESSAGE = AUDIO_HEADERS + b"\r\n" + bytes(4096)
+
+# A benchmark returns the function to time and the number of bytes or items
+# it processes per call.
+Benchmark = Callable[[int], Tuple[Callable[[], Any], int]]
+
+
+def parse_sizes(value: str) -> List[int]:
+    """
+    Parses a comma separated list of sizes such as "1K,64K,1M".
+
+    Args:
+        value (str): The list of sizes.
+
+    Returns:
+        List[int]: The sizes in bytes.
+    """
+    sizes = []
+    for item in value.split(","):
+        item = item.strip().upper()
+        number, unit = item.rstrip("KMG"), item[len(item.rstrip("KMG")) :]
+        if not number.isdigit() or unit not in SIZE_UNITS or int(number) < 1:
+            raise ValueError(f"Invalid size '{item}'.")
+        sizes.append(int(number) * SIZE_UNITS[unit])
+    return sizes
+
+
+def format_size(size: int) -> str:
+    """Returns the size with the largest unit that divides it, e.g. 64K."""
+    for unit in ("G", "M", "K"):
+        if size % SIZE_UNITS[unit] == 0:
+            return f"{size // SIZE_UNITS[unit]}{unit}"
+    return str(size)
+
+
+def make_text(pattern: str, size: int) -> str:
+    """
+    Returns the pattern repeated to the given size in UTF-8 bytes, cut at a
+    character boundary.
+
+    Args:
+        pattern (str): The pattern to repeat.
+        size (int): The size of the text in bytes.
+
+    Returns:
+        str: The text.
+    """
+    encoded = pattern.encode("utf-8")
+    repeated = encoded * (size // len(encoded) + 1)
+    return repeated[:size].decode("utf-8", "ignore")
+
+
+def _consume(iterable: Iterable[Any]) -> None:
+    """Exhausts an iterable without keeping its items."""
+    deque(iterable, maxlen=0)
+
+
+def _bench_remove_incompatible_characters(
+    size: int,
+) -> Tuple[Callable[[], Any], int]:
+    text = make_text(RAW_PATTERN, size)
+    return lambda: remove_incompatible_characters(text), size
+
+
+def _bench_escape(size: int) -> Tuple[Callable[[], Any], int]:
+    text = make_text(RAW_PATTERN, size)
+    return lambda: escape(text), size
+
+
+def _bench_split(pattern: str) -> Benchmark:
+    def bench(size: int) -> Tuple[Callable[[], Any], int]:
+        text = make_text(pattern, size).encode("utf-8")
+        return (
+            lambda: _consume(split_text_by_byte_length(text, SPLIT_BYTE_LENGTH)),
+            size,
+        )
+
+    return bench
+
+
+def _bench_mkssml(size: int) -> Tuple[Callable[[], Any], int]:
+    tc = TTSConfig(DEFAULT_VOICE, "+0%", "+0%", "+0Hz", "SentenceBoundary")
+    chunks = list(
+        split_text_by_byte_length(
+            make_text(TEXT_PATTERNS["ascii"], size), SPLIT_BYTE_LENGTH
+        )
+    )
+    return lambda: _consume(mkssml(tc, chunk) for chunk in chunks), size
+
+
+def _bench_get_headers_and_data(count: int) -> Tuple[Callable[[], Any], int]:
+    header_length = len(AUDIO_HEADERS)
+
+    def run() -> None:
+        for _ in range(count):
+            get_headers_and_data(AUDIO_MESSAGE, header_length)
+
+    return run, count
+
+
+def _make_boundaries(count: int) -> List[TTSChunk]:
+    """Returns the given number of consecutive WordBoundary messages."""
+    return [
+        {
+            "type": "WordBoundary",
+            "offset": index * 3_000_000,
+            "duration": 2_500_000,
+            "text": f"word{index}",
+        }
+        for index in range(count)
+    ]
+
+
+def _bench_submaker_feed(count: int) -> Tuple[Callable[[], Any], int]:
+    messages = _make_boundaries(count)
+
+    def run() -> None:
+        submaker = SubMaker()
+        for message in messages:
+            submaker.feed(message)
+
+    return run, count
+
+
+def _bench_compose(count: int) -> Tuple[Callable[[], Any], int]:
+    cues = [
+        Subtitle(
+            index=index + 1,
+            start=timedelta(milliseconds=index * 300),
+            end=timedelta(milliseconds=index * 300 + 250),
+            content=f"word{index}",
+        )
+        for index in range(count)
+    ]
+    return lambda: compose(cues), count
+
+
+# The benchmarks of text sizes, by name.
+SIZE_BENCHMARKS: Dict[str, Benchmark] = {
+    "remove_incompatible_characters": _bench_remove_incompatible_characters,
+    "escape": _bench_escape,
+    **{
+        f"split_text_by_byte_length[{name}]": _bench_split(pattern)
+        for name, pattern in TEXT_PATTERNS.items()
+    },
+    "mkssml": _bench_mkssml,
+}
+
+# The benchmarks of item counts, by name.
+COUNT_BENCHMARKS: Dict[str, Benchmark] = {
+    "get_headers_and_data": _bench_get_headers_and_data,
+    "SubMaker.feed": _bench_submaker_feed,
+    "compose": _bench_compose,
+}
+
+
+def measure(run: Callable[[], Any], repeat: int) -> Tuple[float, int]:
+    """
+    Measures the best time of a function over a number of samples, and the
+    peak memory it allocates in a separate call, as tracing memory slows it
+    down. Fast functions are called repeatedly in each sample, so that the
+    sample takes at least MIN_SAMPLE_TIME.
+
+    Args:
+        run (callable): The function to measure.
+        repeat (int): The number of timed samples.
+
+    Returns:
+        Tuple[float, int]: The best time of one call in seconds and the peak
+            memory in bytes.
+    """
+    gc.collect()
+
+    # The first call warms up caches, and tells how many calls a sample needs.
+    started = time.perf_counter()
+    run()
+    loops = max(1, int(MIN_SAMPLE_TIME / max(time.perf_counter() - started, 1e-9)))
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, (time.perf_counter() - started) / loops)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run_benchmarks(
+    sizes: List[int],
+    counts: List[int],
+    *,
+    repeat: int = 3,
+    selected: Optional[str] = None,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs the benchmarks and returns their results.
+
+    Args:
+        sizes (List[int]): The text sizes in bytes to benchmark text functions on.
+        counts (List[int]): The numbers of items to benchmark the other
+            functions on.
+        repeat (int): The number of timed calls of each benchmark.
+        selected (Optional[str]): Only run the benchmarks whose name contains it.
+        progress (callable): The function to call with the key of each
+            benchmark before it runs.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The results by key, which is the name of
+            the benchmark followed by its size or count.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for benchmarks, params, unit in (
+        (SIZE_BENCHMARKS, sizes, "bytes"),
+        (COUNT_BENCHMARKS, counts, "items"),
+    ):
+        for name, bench in benchmarks.items():
+            if selected is not None and selected not in name:
+                continue
+            for param in params:
+                key = f"{name} @ {format_size(param)}"
+                if progress is not None:
+                    progress(key)
+                run, amount = bench(param)
+                seconds, peak = measure(run, repeat)
+                results[key] = {
+                    "seconds": seconds,
+                    "unit": unit,
+                    "amount": amount,
+                    "throughput": amount / seconds if seconds > 0 else float("inf"),
+                    "peak_memory": peak,
+                }
+                del run
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+) -> Dict[str, List[str]]:
+    """
+    Compares results against a baseline.
+
+    A result regressed if its throughput is lower, or its peak memory is
+    higher, than that of the baseline by more than the tolerance.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): The results of run_benchmarks().
+        baseline (Dict[str, Dict[str, Any]]): The results of the baseline.
+        tolerance (float): The allowed relative difference, e.g. 0.1 for 10%.
+
+    Returns:
+        Dict[str, List[str]]: The regressions of each key that regressed.
+    """
+    regressions: Dict[str, List[str]] = {}
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        found = []
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            found.append("throughput")
+        if result["peak_memory"] > base["peak_memory"] * (1 + tolerance):
+            found.append("peak_memory")
+        if found:
+            regressions[key] = found
+    return regressions
+
+
+def _format_time(seconds: float) -> str:
+    """Returns the time in ms, or in µs if it is shorter than a millisecond."""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:,.1f} µs"
+    return f"{seconds * 1e3:,.2f} ms"
+
+
+def _format_throughput(result: Dict[str, Any]) -> str:
+    """Returns the throughput in MiB/s for bytes, or items/s otherwise."""
+    if result["unit"] == "bytes":
+        return f"{result['throughput'] / 1024**2:,.1f} MiB/s"
+    return f"{result['throughput']:,.0f} items/s"
+
+
+def _print_results(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Optional[Dict[str, Dict[str, Any]]],
+    regressions: Dict[str, List[str]],
+) -> None:
+    """Prints the results for humans, along with the changes from the baseline."""
+    headers = ["Benchmark", "Time", "Throughput", "Peak memory"]
+    if baseline is not None:
+        headers += ["Throughput change", "Memory change", ""]
+    table = []
+    for key, result in results.items():
+        row = [
+            key,
+            _format_time(result["seconds"]),
+            _format_throughput(result),
+            f"{result['peak_memory'] / 1024**2:,.2f} MiB",
+        ]
+        if baseline is not None:
+            base = baseline.get(key)
+            if base is None:
+                row += ["", "", "new"]
+            else:
+                row += [
+                    f"{result['throughput'] / base['throughput'] - 1:+.1%}",
+                    f"{result['peak_memory'] / max(base['peak_memory'], 1) - 1:+.1%}",
+                    "REGRESSED" if key in regressions else "",
+                ]
+        table.append(row)
+    print(tabulate(table, headers, disable_numparse=True))
+
+
+def _load_baseline(fname: str) -> Dict[str, Dict[str, Any]]:
+    """Loads the results of a baseline saved with --save."""
+    with open(fname, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    if not isinstance(data, dict) or data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{fname} is not a baseline of version {BASELINE_VERSION}.")
+    results: Dict[str, Dict[str, Any]] = data["results"]
+    return results
+
+
+def _save_baseline(fname: str, results: Dict[str, Dict[str, Any]]) -> None:
+    """Saves the results as a baseline, along with where they were measured."""
+    with open(fname, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "version": BASELINE_VERSION,
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "machine": platform.machine(),
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+        file.write("\n")
+
+
+def main() -> None:
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the text and subtitle functions of edge-tts offline."
+    )
+    parser.add_argument(
+        "--sizes",
+        help=f"comma separated text sizes, e.g. 1K,1M. Default {DEFAULT_SIZES}.",
+    )
+    parser.add_argument(
+        "--cues",
+        help="comma separated numbers of messages and subtitle cues. "
+        f"Default {DEFAULT_CUES}.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help=f"benchmark sizes {FULL_SIZES} and cues {FULL_CUES} "
+        "unless given otherwise",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="timed runs of each benchmark, of which the best is kept. Default 3.",
+    )
+    parser.add_argument(
+        "-k", "--select", help="only run the benchmarks whose name contains this"
+    )
+    parser.add_argument("--save", metavar="FILE", help="save the results as a baseline")
+    parser.add_argument(
+        "--compare", metavar="FILE", help="compare the results against a baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="relative change from the baseline that counts as a regression. "
+        "Default 0.1.",
+    )
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    try:
+        sizes = parse_sizes(args.sizes or (FULL_SIZES if args.full else DEFAULT_SIZES))
+        counts = parse_sizes(args.cues or (FULL_CUES if args.full else DEFAULT_CUES))
+    except ValueError as e:
+        parser.error(str(e))
+    if args.repeat < 1:
+        parser.error("--repeat must be positive")
+    if args.tolerance < 0:
+        parser.error("--tolerance must not be negative")
+
+    baseline = _load_baseline(args.compare) if args.compare else None
+    results = run_benchmarks(
+        sizes,
+        counts,
+        repeat=args.repeat,
+        selected=args.select,
+        progress=(
+            None
+            if args.json
+            else lambda key: print(f"running {key}", file=sys.stderr, flush=True)
+        ),
+    )
+    regressions = (
+        compare(results, baseline, args.tolerance) if baseline is not None else {}
+    )
+
+    if args.json:
+        print(json.dumps({"results": results, "regressions": regressions}, indent=2))
+    else:
+        _print_results(results, baseline, regressions)
+    if args.save:
+        _save_baseline(args.save, results)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
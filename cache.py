@@ -0,0 +1,368 @@
+"""SynthesisCache module is used to store synthesized audio and metadata on disk
+so that texts which were already synthesized can be replayed without contacting
+the service."""
+
+import asyncio
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .data_classes import TTSConfig
+from .typing import TTSChunkView
+
+# Bump this whenever the layout of an entry or the key derivation changes.
+CACHE_VERSION = 4
+
+ENTRY_SUFFIX = ".tts"
+
+# Every entry is laid out as the audio data, followed by the JSON encoded list
+# of events and the offset compensation of the turn, followed by the length of
+# that JSON encoded object.
+TRAILER = struct.Struct(">Q")
+
+
+def _size_of(path: str) -> int:
+    """Returns the size of a file, or 0 if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+class SynthesisCacheEntry:
+    """
+    SynthesisCacheEntry records the messages of a stream in memory, which
+    only become a cache entry once commit() writes them to disk.
+    """
+
+    def __init__(self, cache: "SynthesisCache", key: str) -> None:
+        self.cache = cache
+        self.key = key
+        self.audio: List[bytes] = []
+        self.events: List[Dict[str, Any]] = []
+
+    def write(self, message: TTSChunkView) -> None:
+        """
+        Record a message of the stream.
+
+        Args:
+            message (TTSChunkView): The audio or metadata message.
+
+        Returns:
+            None
+        """
+        if message["type"] == "audio":
+            self.audio.append(bytes(message["data"]))
+            self.events.append({"type": "audio", "size": len(message["data"])})
+        else:
+            self.events.append(dict(message))
+
+    def _commit_blocking(self, offset_compensation: float) -> None:
+        events = json.dumps(
+            {"events": self.events, "offset_compensation": offset_compensation},
+            separators=(",", ":"),
+        ).encode("utf-8")
+        path = self.cache.path(self.key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.writelines(self.audio)
+                file.write(events)
+                file.write(TRAILER.pack(len(events)))
+                size = file.tell()
+            replaced_size = _size_of(path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        finally:
+            self.abort()
+        self.cache.added(size - replaced_size)
+
+    async def commit(self, offset_compensation: float = 0) -> None:
+        """
+        Store the recorded messages as a cache entry and evict the least
+        recently used entries if the cache grew past its maximum size. The
+        entry is written and renamed in a worker thread, so that slow disks
+        do not block the event loop.
+
+        Args:
+            offset_compensation (float): For entries of a single turn, the
+                offset compensation the turn adds for the turns after it.
+
+        Returns:
+            None
+        """
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._commit_blocking, offset_compensation
+        )
+
+    def abort(self) -> None:
+        """
+        Discard the recorded messages.
+
+        Returns:
+            None
+        """
+        self.audio = []
+        self.events = []
+
+
+class SynthesisCache:
+    """
+    SynthesisCache is a content-addressed on-disk cache of synthesized audio
+    and metadata, keyed on the normalized text and the TTS configuration.
+    The least recently used entries are evicted once the cache grows past
+    its maximum size.
+
+    The total size of the entries is tracked in memory, seeded from the
+    directory when the cache is opened, so that the directory is only
+    scanned once the cache grows past its maximum size. Entries added by
+    other processes sharing the directory are counted from the next scan.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, "os.PathLike[str]"],
+        max_size: int = 256 * 1024 * 1024,
+    ) -> None:
+        """
+        Args:
+            directory (str or os.PathLike): The directory to store entries in.
+                It is created if it does not exist.
+            max_size (int): The maximum total size of all entries in bytes.
+        """
+        if not isinstance(max_size, int):
+            raise TypeError("max_size must be int")
+        if max_size <= 0:
+            raise ValueError("max_size must be greater than 0")
+
+        self.directory: str = os.fspath(directory)
+        self.max_size: int = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Entries are committed from worker threads, so the total size is
+        # guarded by a lock.
+        self._lock = threading.Lock()
+        self.size: int = sum(size for _, size, _ in self.__scan())
+
+    def __scan(self) -> List[Tuple[float, int, str]]:
+        """Returns the time of last use, size and path of every entry."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for dir_entry in it:
+                if not dir_entry.name.endswith(ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = dir_entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+        return entries
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """
+        Normalize the text so that texts which only differ in surrounding or
+        repeated whitespace share the same cache entry.
+
+        Args:
+            text (str): The text to normalize.
+
+        Returns:
+            str: The normalized text.
+        """
+        return " ".join(text.split())
+
+    @staticmethod
+    def make_key(text: str, tts_config: TTSConfig, *, partial: bool = False) -> str:
+        """
+        Make the cache key for the given text and TTS configuration.
+
+        Args:
+            text (str): The normalized text, or the escaped partial text of a
+                single turn.
+            tts_config (TTSConfig): The TTS configuration.
+            partial (bool): Whether the key is for a single turn, whose offsets
+                are relative to the start of the turn.
+
+        Returns:
+            str: The cache key.
+        """
+        material = json.dumps(
+            [
+                CACHE_VERSION,
+                "partial" if partial else "text",
+                text,
+                tts_config.voice,
+                tts_config.rate,
+                tts_config.volume,
+                tts_config.pitch,
+                tts_config.boundary,
+                tts_config.output_format,
+            ],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        """
+        Get the path of the entry for the given key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str: The path of the entry.
+        """
+        return os.path.join(self.directory, f"{key}{ENTRY_SUFFIX}")
+
+    async def get(self, key: str) -> Optional[List[TTSChunkView]]:
+        """
+        Get the messages stored for the given key and mark the entry as
+        recently used. The audio data of the messages are views into the
+        entry, which is read into memory once in a worker thread.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[List[TTSChunkView]]: The stored messages, or None on a
+                miss.
+        """
+        turn = await self.get_turn(key)
+        return turn[0] if turn is not None else None
+
+    async def get_turn(self, key: str) -> Optional[Tuple[List[TTSChunkView], float]]:
+        """
+        Get the messages and the offset compensation stored for the given key
+        and mark the entry as recently used. The entry is read in a worker
+        thread, so that slow disks do not block the event loop.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[Tuple[List[TTSChunkView], float]]: The stored messages and
+                offset compensation, or None on a miss.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._get_turn_blocking, key
+        )
+
+    def _get_turn_blocking(
+        self, key: str
+    ) -> Optional[Tuple[List[TTSChunkView], float]]:
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        try:
+            if len(data) < TRAILER.size:
+                raise ValueError("Entry is too short")
+            (events_size,) = TRAILER.unpack_from(data, len(data) - TRAILER.size)
+            audio_size = len(data) - TRAILER.size - events_size
+            if audio_size < 0:
+                raise ValueError("Entry is truncated")
+            stored = json.loads(data[audio_size : len(data) - TRAILER.size])
+            events = stored["events"]
+            offset_compensation = stored["offset_compensation"]
+        except (ValueError, KeyError, TypeError):
+            # The entry is corrupt, so treat it as a miss and drop it.
+            self.remove(key)
+            return None
+
+        audio = memoryview(data)
+        messages: List[TTSChunkView] = []
+        position = 0
+        for event in events:
+            if event["type"] == "audio":
+                size = event["size"]
+                messages.append(
+                    {"type": "audio", "data": audio[position : position + size]}
+                )
+                position += size
+            else:
+                messages.append(event)
+        return messages, offset_compensation
+
+    def entry(self, key: str) -> SynthesisCacheEntry:
+        """
+        Start recording a new entry for the given key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            SynthesisCacheEntry: The entry to record the messages into.
+        """
+        return SynthesisCacheEntry(self, key)
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the entry for the given key, if any.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            None
+        """
+        path = self.path(key)
+        size = _size_of(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self.size -= size
+
+    def added(self, size: int) -> None:
+        """
+        Count the size an entry added to the cache, and evict the least
+        recently used entries if the cache grew past its maximum size.
+
+        Args:
+            size (int): The number of bytes the cache grew by.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.size += size
+            over_limit = self.size > self.max_size
+        if over_limit:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the total size of the
+        cache is no larger than its maximum size. The directory is scanned,
+        which also recounts the total size.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            entries = sorted(self.__scan())
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total_size <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+            self.size = total_size
@@ -0,0 +1,178 @@
+"""Checkpoint module is used to record the progress of Communicate.save() next
+to its output, so that an interrupted save can resume from the first partial
+text that was not finished."""
+
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Optional, Union
+
+from .data_classes import TTSConfig
+
+CHECKPOINT_VERSION = 1
+
+CHECKPOINT_SUFFIX = ".checkpoint"
+
+
+def chain_digest(digest: str, partial_text: bytes) -> str:
+    """
+    Returns the digest of the partial texts so far, given the digest of the
+    ones before the given partial text.
+
+    Args:
+        digest (str): The digest of the partial texts before.
+        partial_text (bytes): The next partial text.
+
+    Returns:
+        str: The digest of the partial texts including the given one.
+    """
+    return hashlib.sha256(digest.encode("ascii") + partial_text).hexdigest()
+
+
+class Checkpoint:  # pylint: disable=too-many-instance-attributes
+    """
+    Checkpoint records the partial texts of a save() which were finished,
+    along with the offset compensation after them and the sizes the output
+    files had at that point. It is written to a JSON file next to the audio
+    file after every partial text and removed once the save completes.
+    """
+
+    def __init__(
+        self,
+        audio_fname: Union[str, bytes, "os.PathLike[Any]"],
+        metadata_fname: Optional[Union[str, bytes, "os.PathLike[Any]"]],
+        tts_config: TTSConfig,
+    ) -> None:
+        """
+        Args:
+            audio_fname (str, bytes or os.PathLike): The path of the audio
+                file the checkpoint belongs to.
+            metadata_fname (Optional[str, bytes or os.PathLike]): The path of
+                the metadata file the checkpoint belongs to, if any.
+            tts_config (TTSConfig): The TTS configuration of the save.
+        """
+        self.audio_fname = audio_fname
+        self.metadata_fname = metadata_fname
+        self.path: str = os.fsdecode(audio_fname) + CHECKPOINT_SUFFIX
+        self.config: Dict[str, Any] = dataclasses.asdict(tts_config)
+        self.partial_texts: int = 0
+        self.digest: str = ""
+        self.offset_compensation: float = 0
+        self.audio_size: int = 0
+        self.metadata_size: int = 0
+
+    def load(self) -> bool:  # pylint: disable=too-many-return-statements
+        """
+        Load the checkpoint file, if there is one for the same configuration
+        and the output files still hold everything it recorded.
+
+        Returns:
+            bool: Whether the checkpoint was loaded. If not, the save starts
+                over.
+        """
+        try:
+            with open(self.path, "rb") as file:
+                stored = json.load(file)
+            if stored["version"] != CHECKPOINT_VERSION:
+                return False
+            if stored["config"] != self.config:
+                return False
+            partial_texts = int(stored["partial_texts"])
+            digest = str(stored["digest"])
+            offset_compensation = float(stored["offset_compensation"])
+            audio_size = int(stored["audio_size"])
+            metadata_size = int(stored["metadata_size"])
+            if os.path.getsize(self.audio_fname) < audio_size:
+                return False
+            if self.metadata_fname is not None:
+                if os.path.getsize(self.metadata_fname) < metadata_size:
+                    return False
+            elif metadata_size > 0:
+                return False
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+        self.partial_texts = partial_texts
+        self.digest = digest
+        self.offset_compensation = offset_compensation
+        self.audio_size = audio_size
+        self.metadata_size = metadata_size
+        return True
+
+    def reset(self) -> None:
+        """
+        Forget what the checkpoint recorded, so that the save starts over.
+        The checkpoint file is replaced once the first partial text is
+        finished again.
+
+        Returns:
+            None
+        """
+        self.partial_texts = 0
+        self.digest = ""
+        self.offset_compensation = 0
+        self.audio_size = 0
+        self.metadata_size = 0
+
+    def advance(
+        self,
+        partial_text: bytes,
+        offset_compensation: float,
+        audio_size: int,
+        metadata_size: int,
+    ) -> None:
+        """
+        Record that another partial text was finished and write the
+        checkpoint file. The file is replaced atomically, so it always holds
+        a consistent checkpoint.
+
+        Args:
+            partial_text (bytes): The partial text that was finished.
+            offset_compensation (float): The offset compensation after it.
+            audio_size (int): The size of the audio file after it.
+            metadata_size (int): The size of the metadata file after it.
+
+        Returns:
+            None
+        """
+        self.partial_texts += 1
+        self.digest = chain_digest(self.digest, partial_text)
+        self.offset_compensation = offset_compensation
+        self.audio_size = audio_size
+        self.metadata_size = metadata_size
+
+        data = json.dumps(
+            {
+                "version": CHECKPOINT_VERSION,
+                "config": self.config,
+                "partial_texts": self.partial_texts,
+                "digest": self.digest,
+                "offset_compensation": self.offset_compensation,
+                "audio_size": self.audio_size,
+                "metadata_size": self.metadata_size,
+            }
+        ).encode("utf-8")
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.path) or None, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def remove(self) -> None:
+        """
+        Remove the checkpoint file, if any.
+
+        Returns:
+            None
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
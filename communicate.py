@@ -1,32 +1,49 @@
 """Communicate with the service. Only the Communicate class should be used by
 end-users. The other classes and functions are for internal use only."""
 
+# pylint: disable=too-many-lines
+
 import asyncio
-import concurrent.futures
+import collections
+import functools
 import json
-import ssl
+import re
 import time
 import uuid
-from contextlib import nullcontext
-from io import TextIOWrapper
-from queue import Queue
+from contextlib import asynccontextmanager
 from typing import (
     AsyncGenerator,
-    ContextManager,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
     Dict,
     Generator,
+    Hashable,
+    Iterable,
+    Iterator,
     List,
     Optional,
+    Set,
     Tuple,
     Union,
 )
 from xml.sax.saxutils import escape, unescape
 
 import aiohttp
-import certifi
 from typing_extensions import Literal
 
-from .constants import DEFAULT_VOICE, SEC_MS_GEC_VERSION, WSS_HEADERS, WSS_URL
+from .background_loop import BackgroundLoop
+from .cache import SynthesisCache
+from .checkpoint import Checkpoint, chain_digest
+from .constants import (
+    DEFAULT_VOICE,
+    SEC_MS_GEC_VERSION,
+    TEXT_BLOCK_SIZE,
+    WSS_HEADERS,
+    WSS_URL,
+)
 from .data_classes import TTSConfig
 from .drm import DRM
 from .exceptions import (
@@ -35,7 +52,20 @@ from .exceptions import (
     UnknownResponse,
     WebSocketError,
 )
-from .typing import CommunicateState, TTSChunk
+from .formats import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS, OutputFormat, fix_riff_sizes
+from .limiter import (
+    MAX_THROTTLE_RETRIES,
+    THROTTLING_STATUSES,
+    AdaptiveLimiter,
+    backoff_delay,
+)
+from .metrics import ChunkMetrics, Metrics
+from .mp3 import TICKS_PER_SECOND
+from .pool import ConnectionPool
+from .session import SessionManager
+from .sinks import FileSink, Sink
+from .transport import FrameTransport, SessionRecorder, SessionReplay
+from .typing import CommunicateState, PCMChunk, TTSChunk, TTSChunkView
 
 
 def get_headers_and_data(
@@ -62,6 +92,44 @@ def get_headers_and_data(
     return headers, data[header_length + 2 :]
 
 
+def get_path_and_content_type(
+    data: bytes, header_start: int, header_end: int
+) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """
+    Returns the Path and Content-Type headers from the given data, without
+    parsing any of the other headers or copying the rest of the data.
+
+    Args:
+        data (bytes): The data to be parsed.
+        header_start (int): The index of the start of the headers.
+        header_end (int): The index of the end of the headers.
+
+    Returns:
+        tuple: The values of the Path and Content-Type headers, or None for
+            the headers which are missing.
+    """
+    path = content_type = None
+    line_start = header_start
+    while line_start < header_end:
+        line_end = data.find(b"\r\n", line_start, header_end)
+        if line_end < 0:
+            line_end = header_end
+        if data.startswith(b"Path:", line_start, line_end):
+            path = data[line_start + 5 : line_end]
+        elif data.startswith(b"Content-Type:", line_start, line_end):
+            content_type = data[line_start + 13 : line_end]
+        line_start = line_end + 2
+
+    return path, content_type
+
+
+# Translation table replacing the characters the service does not support
+# with a space.
+INCOMPATIBLE_CHARACTERS = dict.fromkeys(
+    [*range(0, 9), *range(11, 13), *range(14, 32)], " "
+)
+
+
 def remove_incompatible_characters(string: Union[str, bytes]) -> str:
     """
     The service does not support a couple character ranges.
@@ -80,14 +148,7 @@ def remove_incompatible_characters(string: Union[str, bytes]) -> str:
     if not isinstance(string, str):
         raise TypeError("string must be str or bytes")
 
-    chars: List[str] = list(string)
-
-    for idx, char in enumerate(chars):
-        code: int = ord(char)
-        if (0 <= code <= 8) or (11 <= code <= 12) or (14 <= code <= 31):
-            chars[idx] = " "
-
-    return "".join(chars)
+    return string.translate(INCOMPATIBLE_CHARACTERS)
 
 
 def connect_id() -> str:
@@ -100,59 +161,57 @@ def connect_id() -> str:
     return str(uuid.uuid4()).replace("-", "")
 
 
-def _find_last_newline_or_space_within_limit(text: bytes, limit: int) -> int:
+def _find_last_newline_or_space_within_limit(text: bytes, start: int, end: int) -> int:
     """
     Finds the index of the rightmost preferred split character (newline or space)
-    within the initial `limit` bytes of the text.
+    within `text[start:end]`.
 
     This helps find a natural word or sentence boundary for splitting, prioritizing
     newlines over spaces.
 
     Args:
         text (bytes): The byte string to search within.
-        limit (int): The maximum index (exclusive) to search up to.
+        start (int): The index to start searching from.
+        end (int): The maximum index (exclusive) to search up to.
 
     Returns:
-        int: The index of the last found newline or space within the limit,
+        int: The index of the last found newline or space within the range,
              or -1 if neither is found in that range.
     """
     # Prioritize finding a newline character
-    split_at = text.rfind(b"\n", 0, limit)
+    split_at = text.rfind(b"\n", start, end)
     # If no newline is found, search for a space
     if split_at < 0:
-        split_at = text.rfind(b" ", 0, limit)
+        split_at = text.rfind(b" ", start, end)
     return split_at
 
 
-def _find_safe_utf8_split_point(text_segment: bytes) -> int:
+def _find_safe_utf8_split_point(text: bytes, start: int, end: int) -> int:
     """
-    Finds the rightmost possible byte index such that the
-    segment `text_segment[:index]` is a valid UTF-8 sequence.
+    Finds the rightmost index within `[start, end]` that is not in the middle
+    of a multi-byte UTF-8 character, assuming `text` is valid UTF-8.
 
-    This prevents splitting in the middle of a multi-byte UTF-8 character.
+    Instead of trial decoding, this walks back over UTF-8 continuation bytes
+    (0b10xxxxxx), which can never start a character, so at most three bytes
+    are inspected.
 
     Args:
-        text_segment (bytes): The byte segment being considered for splitting.
+        text (bytes): The byte string being considered for splitting.
+        start (int): The index of the start of the current chunk.
+        end (int): The index just past the largest allowed chunk.
 
     Returns:
-        int: The index of the safe split point. Returns 0 if no valid split
-             point is found (e.g., if the first byte is part of a multi-byte
-             sequence longer than the limit allows).
+        int: The index of the safe split point. Returns `start` if no valid split
+             point is found (e.g., if the first character is longer than the
+             range allows).
     """
-    split_at = len(text_segment)
-    while split_at > 0:
-        try:
-            text_segment[:split_at].decode("utf-8")
-            # Found the largest valid UTF-8 sequence
-            return split_at
-        except UnicodeDecodeError:
-            # The byte at split_at-1 is part of an incomplete multi-byte char, try earlier
-            split_at -= 1
-
+    split_at = end
+    while start < split_at < len(text) and text[split_at] & 0xC0 == 0x80:
+        split_at -= 1
     return split_at
 
 
-def _adjust_split_point_for_xml_entity(text: bytes, split_at: int) -> int:
+def _adjust_split_point_for_xml_entity(text: bytes, start: int, split_at: int) -> int:
     """
     Adjusts a proposed split point backward to prevent splitting inside an XML entity.
 
@@ -160,7 +219,8 @@ def _adjust_split_point_for_xml_entity(text: bytes, split_at: int) -> int:
     `&` and `;`, this function moves `split_at` to the index before `&`.
 
     Args:
-        text (bytes): The text segment being considered.
+        text (bytes): The text being split.
+        start (int): The index of the start of the current chunk.
         split_at (int): The proposed split point index, determined by whitespace
                         or UTF-8 safety.
 
@@ -169,8 +229,11 @@ def _adjust_split_point_for_xml_entity(text: bytes, split_at: int) -> int:
              if an unterminated entity is detected right before the original `split_at`.
              Otherwise, the original `split_at` is returned.
     """
-    while split_at > 0 and b"&" in text[:split_at]:
-        ampersand_index = text.rindex(b"&", 0, split_at)
+    while split_at > start:
+        ampersand_index = text.rfind(b"&", start, split_at)
+        if ampersand_index < 0:
+            break
+
         # Check if a semicolon exists between the ampersand and the split point
         if text.find(b";", ampersand_index, split_at) != -1:
             # Found a terminated entity (like &amp;), safe to break at original split_at
@@ -182,8 +245,207 @@ def _adjust_split_point_for_xml_entity(text: bytes, split_at: int) -> int:
     return split_at
 
 
+# Matches the end of a sentence in UTF-8 encoded text: a full stop, question
+# or exclamation mark (with any closing quotes or brackets) followed by
+# whitespace, a newline, or a full-width CJK full stop, exclamation or
+# question mark.
+SENTENCE_END = re.compile(
+    rb"[.!?][\"')\]]*(?=\s)|\n|\xe3\x80\x82|\xef\xbc\x81|\xef\xbc\x9f"
+)
+
+# How far back from the end of the buffered text a sentence end may start,
+# as it can only be matched once the whitespace after it arrived.
+SENTENCE_END_LOOKBACK = 16
+
+
+def _find_last_sentence_end(text: bytes, start: int, end: int) -> int:
+    """
+    Finds the index just past the last sentence end within `text[start:end]`.
+
+    Args:
+        text (bytes): The byte string to search within.
+        start (int): The index to start searching from.
+        end (int): The maximum index (exclusive) to search up to.
+
+    Returns:
+        int: The index just past the last sentence end within the range,
+             or -1 if there is none.
+    """
+    sentence_end = -1
+    for match in SENTENCE_END.finditer(text, start, end):
+        sentence_end = match.end()
+    return sentence_end
+
+
+def _next_chunk_start(text: bytes, start: int, split_at: int) -> int:
+    """
+    Returns where the chunk after the one from `start` to `split_at` starts.
+
+    An empty chunk is only skipped if the text starts with the newline or
+    space it was split at. Otherwise nothing fits into the chunk, and
+    advancing would cut a multi-byte UTF-8 character or an XML entity.
+
+    Args:
+        text (bytes): The text being split.
+        start (int): The index of the start of the current chunk.
+        split_at (int): The index the current chunk ends at.
+
+    Returns:
+        int: The index of the start of the next chunk.
+
+    Raises:
+        ValueError: If not even the first character or XML entity fits into
+            the maximum byte length.
+    """
+    if split_at > start:
+        return split_at
+    if text[start : start + 1] in (b"\n", b" "):
+        return start + 1
+    raise ValueError(
+        "Maximum byte length is too small to hold the character or xml entity "
+        f"at byte {start}"
+    )
+
+
+def _find_split_point(
+    text: bytes, start: int, byte_length: int, *, prefer_sentence_end: bool = False
+) -> int:
+    """
+    Finds where to end the chunk starting at `start`, so that it does not exceed
+    `byte_length` bytes, does not end with an incomplete UTF-8 character and
+    does not split an XML entity.
+
+    Args:
+        text (bytes): The text being split.
+        start (int): The index of the start of the current chunk.
+        byte_length (int): The maximum allowed byte length of the chunk.
+        prefer_sentence_end (bool): Whether to end the chunk at the last
+            sentence end within it, if there is one.
+
+    Returns:
+        int: The index to end the chunk at.
+
+    Raises:
+        ValueError: If a split point cannot be determined.
+    """
+    end = start + byte_length
+
+    # A sentence end is always a safe split point, as it is neither inside
+    # a multi-byte UTF-8 character nor inside an xml entity.
+    if prefer_sentence_end:
+        split_at = _find_last_sentence_end(text, start, end)
+        if split_at > start:
+            return split_at
+
+    # Find the initial split point based on whitespace or UTF-8 boundary
+    split_at = _find_last_newline_or_space_within_limit(text, start, end)
+
+    if split_at < 0:
+        # No newline or space found, so we need to find a safe UTF-8 split point
+        split_at = _find_safe_utf8_split_point(text, start, end)
+
+    # Adjust the split point to avoid cutting in the middle of an xml entity, such as '&amp;'
+    split_at = _adjust_split_point_for_xml_entity(text, start, split_at)
+
+    if split_at < start:
+        # This should not happen if byte_length is reasonable,
+        # but guards against edge cases.
+        raise ValueError(
+            "Maximum byte length is too small or "
+            "invalid text structure near '&' or invalid UTF-8"
+        )
+
+    return split_at
+
+
+def split_text_blocks_by_byte_length(
+    blocks: Iterable[Union[str, bytes]],
+    byte_length: int,
+    *,
+    initial_byte_length: Optional[int] = None,
+) -> Generator[bytes, None, None]:
+    """
+    Splits text that arrives in consecutive blocks into chunks, each not
+    exceeding a maximum byte length.
+
+    The chunks are exactly the ones split_text_by_byte_length() would yield for
+    the concatenation of all the blocks, but blocks are only pulled as they are
+    needed and at most `byte_length` bytes are carried over between blocks, so
+    memory use does not depend on the length of the text.
+
+    Args:
+        blocks (iterable of str or bytes): The consecutive blocks of the input
+            text. Blocks that are str are encoded to UTF-8.
+        byte_length (int): The maximum allowed byte length for any yielded chunk.
+                           Must be positive.
+        initial_byte_length (Optional[int]): The maximum byte length of the
+            first chunk. See split_text_by_byte_length().
+
+    Yields:
+        bytes: Text chunks (UTF-8 encoded, stripped of leading/trailing whitespace)
+               that conform to the byte length and integrity constraints.
+
+    Raises:
+        TypeError: If a block is not str or bytes.
+        ValueError: If `byte_length` or `initial_byte_length` is not positive,
+                    or if a split point cannot be determined.
+    """
+    if byte_length <= 0:
+        raise ValueError("byte_length must be greater than 0")
+    if initial_byte_length is not None and initial_byte_length <= 0:
+        raise ValueError("initial_byte_length must be greater than 0")
+
+    # The maximum byte length of the next chunk, which starts out small and
+    # doubles with every chunk when an initial byte length is given.
+    chunk_byte_length = min(initial_byte_length or byte_length, byte_length)
+
+    text = b""
+    start = 0
+    for block in blocks:
+        if isinstance(block, str):
+            block = block.encode("utf-8")
+        if not isinstance(block, bytes):
+            raise TypeError("text must be str or bytes")
+
+        # Carry over the part of the previous blocks that was not split yet.
+        text = text[start:] + block if start < len(text) else block
+        start = 0
+
+        # Only split while the whole window of the next chunk is available,
+        # the rest is split once more text arrives.
+        while len(text) - start > chunk_byte_length:
+            split_at = _find_split_point(
+                text,
+                start,
+                chunk_byte_length,
+                prefer_sentence_end=chunk_byte_length < byte_length,
+            )
+            if split_at <= start and chunk_byte_length < byte_length:
+                # Nothing fits into the smaller chunk, so retry with a larger
+                # one instead of splitting an xml entity.
+                chunk_byte_length = min(chunk_byte_length * 2, byte_length)
+                continue
+
+            # Yield the chunk
+            chunk = text[start:split_at].strip()
+            if chunk:
+                yield chunk
+
+            # Prepare for the next iteration
+            start = _next_chunk_start(text, start, split_at)
+            chunk_byte_length = min(chunk_byte_length * 2, byte_length)
+
+    # Yield the remaining part
+    remaining_chunk = text[start:].strip()
+    if remaining_chunk:
+        yield remaining_chunk
+
+
 def split_text_by_byte_length(
-    text: Union[str, bytes], byte_length: int
+    text: Union[str, bytes],
+    byte_length: int,
+    *,
+    initial_byte_length: Optional[int] = None,
 ) -> Generator[bytes, None, None]:
     """
     Splits text into chunks, each not exceeding a maximum byte length.
@@ -194,10 +456,20 @@ def split_text_by_byte_length(
     2. Chunks do not end with an incomplete UTF-8 multi-byte character.
     3. Chunks do not split XML entities (like `&amp;`) in the middle.
 
+    The text is walked once with offsets instead of being re-sliced after every
+    chunk, so splitting takes linear time in the length of the text.
+
+    If `initial_byte_length` is given, the first chunk is at most that many
+    bytes long and every following chunk may be twice as long as the one
+    before it, up to `byte_length`. Such smaller chunks end at a sentence end
+    where possible, so the first chunk is typically the first sentence.
+
     Args:
         text (str or bytes): The input text. If str, it's encoded to UTF-8.
         byte_length (int): The maximum allowed byte length for any yielded chunk.
                            Must be positive.
+        initial_byte_length (Optional[int]): The maximum byte length of the
+            first chunk. Must be positive if given.
 
     Yields:
         bytes: Text chunks (UTF-8 encoded, stripped of leading/trailing whitespace)
@@ -205,45 +477,91 @@ def split_text_by_byte_length(
 
     Raises:
         TypeError: If `text` is not str or bytes.
-        ValueError: If `byte_length` is not positive, or if a split point
-                    cannot be determined (e.g., due to extremely small byte_length
-                    relative to character/entity sizes).
+        ValueError: If `byte_length` or `initial_byte_length` is not positive,
+                    or if a split point cannot be determined (e.g., due to
+                    extremely small byte_length relative to character/entity
+                    sizes).
     """
     if isinstance(text, str):
         text = text.encode("utf-8")
     if not isinstance(text, bytes):
         raise TypeError("text must be str or bytes")
 
-    if byte_length <= 0:
-        raise ValueError("byte_length must be greater than 0")
+    yield from split_text_blocks_by_byte_length(
+        (text,), byte_length, initial_byte_length=initial_byte_length
+    )
 
-    while len(text) > byte_length:
-        # Find the initial split point based on whitespace or UTF-8 boundary
-        split_at = _find_last_newline_or_space_within_limit(text, byte_length)
 
-        if split_at < 0:
-            ## No newline or space found, so we need to find a safe UTF-8 split point
-            split_at = _find_safe_utf8_split_point(text)
+async def split_text_stream_by_sentence(
+    fragments: AsyncIterable[Union[str, bytes]], byte_length: int
+) -> AsyncGenerator[bytes, None]:
+    """
+    Splits text that is still being generated, such as the tokens streamed
+    from a language model, into chunks of complete sentences.
 
-        # Adjust the split point to avoid cutting in the middle of an xml entity, such as '&amp;'
-        split_at = _adjust_split_point_for_xml_entity(text, split_at)
+    A chunk is yielded as soon as a sentence is complete, holding all the
+    complete sentences received so far. Text without a sentence end is only
+    split once more than `byte_length` bytes of it are pending, with the same
+    guarantees as split_text_by_byte_length().
 
-        if split_at < 0:
-            # This should not happen if byte_length is reasonable,
-            # but guards against edge cases.
-            raise ValueError(
-                "Maximum byte length is too small or "
-                "invalid text structure near '&' or invalid UTF-8"
-            )
+    Args:
+        fragments (async iterable of str or bytes): The consecutive fragments
+            of the input text. Fragments that are str are encoded to UTF-8.
+        byte_length (int): The maximum allowed byte length for any yielded chunk.
+                           Must be positive.
+
+    Yields:
+        bytes: Text chunks (UTF-8 encoded, stripped of leading/trailing whitespace)
+               that conform to the byte length and integrity constraints.
+
+    Raises:
+        TypeError: If a fragment is not str or bytes.
+        ValueError: If `byte_length` is not positive, or if a split point
+                    cannot be determined.
+    """
+    if byte_length <= 0:
+        raise ValueError("byte_length must be greater than 0")
 
-        # Yield the chunk
-        chunk = text[:split_at].strip()
-        if chunk:
-            yield chunk
+    text = b""
+    sentence_end = 0
+    async for fragment in fragments:
+        if isinstance(fragment, str):
+            fragment = fragment.encode("utf-8")
+        if not isinstance(fragment, bytes):
+            raise TypeError("text must be str or bytes")
+
+        # Only look for sentence ends in the text that was not searched yet,
+        # plus the few bytes which could not be matched without what follows.
+        scan_from = max(sentence_end, len(text) - SENTENCE_END_LOOKBACK, 0)
+        text += fragment
+        sentence_end = max(
+            sentence_end, _find_last_sentence_end(text, scan_from, len(text))
+        )
 
-        # Prepare for the next iteration
-        # If split_at became 0 after adjustment, advance by 1 to avoid infinite loop
-        text = text[split_at if split_at > 0 else 1 :]
+        start = 0
+        while True:
+            if len(text) - start > byte_length:
+                # Too much text is pending, so split it at the last sentence
+                # end which fits, or wherever split_text_by_byte_length would.
+                split_at = _find_last_sentence_end(text, start, start + byte_length)
+                if split_at <= start:
+                    split_at = _find_split_point(text, start, byte_length)
+            elif sentence_end > start:
+                split_at = sentence_end
+            else:
+                break
+
+            # Yield the chunk
+            chunk = text[start:split_at].strip()
+            if chunk:
+                yield chunk
+
+            start = _next_chunk_start(text, start, split_at)
+
+        # Only keep the text that was not yielded yet.
+        if start > 0:
+            text = text[start:]
+            sentence_end = max(sentence_end - start, 0)
 
     # Yield the remaining part
     remaining_chunk = text.strip()
@@ -309,49 +627,156 @@ def ssml_headers_plus_data(request_id: str, timestamp: str, ssml: str) -> str:
     )
 
 
+# The turn state, message queue and task of a partial text being synthesized.
+PartialTextJob = Tuple[
+    CommunicateState, "asyncio.Queue[Optional[TTSChunkView]]", "asyncio.Task[None]"
+]
+
+
 class Communicate:
     """
     Communicate with the service.
     """
 
-    # pylint: disable=too-many-arguments
-    def __init__(
+    # pylint: disable=too-many-arguments,too-many-instance-attributes,too-many-statements
+    def __init__(  # pylint: disable=too-many-locals,too-many-branches
         self,
-        text: str,
+        text: Union[str, Iterable[str], AsyncIterable[str]],
         voice: str = DEFAULT_VOICE,
         *,
         rate: str = "+0%",
         volume: str = "+0%",
         pitch: str = "+0Hz",
         boundary: Literal["WordBoundary", "SentenceBoundary"] = "SentenceBoundary",
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
         connector: Optional[aiohttp.BaseConnector] = None,
         proxy: Optional[str] = None,
+        endpoint: Optional[str] = None,
         connect_timeout: Optional[int] = 10,
         receive_timeout: Optional[int] = 60,
+        reuse_connection: bool = False,
+        pool: Optional[ConnectionPool] = None,
+        max_concurrency: int = 1,
+        session_manager: Optional[SessionManager] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        metrics: Optional[Metrics] = None,
+        cache: Optional[SynthesisCache] = None,
+        chunk_cache: Optional[SynthesisCache] = None,
+        initial_byte_length: Optional[int] = None,
+        recorder: Optional[SessionRecorder] = None,
+        replay: Optional[SessionReplay] = None,
     ):
         # Validate TTS settings and store the TTSConfig object.
-        self.tts_config = TTSConfig(voice, rate, volume, pitch, boundary)
-
-        # Validate the text parameter.
-        if not isinstance(text, str):
-            raise TypeError("text must be str")
+        self.tts_config = TTSConfig(voice, rate, volume, pitch, boundary, output_format)
+        self.output_format: OutputFormat = OUTPUT_FORMATS[self.tts_config.output_format]
+
+        # Validate the text parameter. Besides a str, the text can be given as
+        # an iterable of str blocks (such as an open text file), which is
+        # consumed lazily as the stream progresses, or as an async iterable
+        # of str fragments (such as the tokens streamed from a language
+        # model), which is synthesized sentence by sentence as it arrives.
+        if not isinstance(text, (str, AsyncIterable)) and (
+            not isinstance(text, Iterable)
+            or isinstance(text, (bytes, bytearray, memoryview))
+        ):
+            raise TypeError(
+                "text must be str, an iterable of str or an async iterable of str"
+            )
 
-        # Split the text into multiple strings and store them.
-        self.texts = split_text_by_byte_length(
-            escape(remove_incompatible_characters(text)),
-            4096,
+        # Validate the cache parameter and derive the cache key from the text.
+        if cache is not None and not isinstance(cache, SynthesisCache):
+            raise TypeError("cache must be SynthesisCache")
+        if cache is not None and not isinstance(text, str):
+            raise ValueError("cache can only be used when text is str")
+        self.cache: Optional[SynthesisCache] = cache
+        self.cache_key: str = (
+            cache.make_key(
+                cache.normalize_text(remove_incompatible_characters(text)),
+                self.tts_config,
+            )
+            if cache is not None and isinstance(text, str)
+            else ""
         )
 
+        # Validate the chunk_cache parameter.
+        if chunk_cache is not None and not isinstance(chunk_cache, SynthesisCache):
+            raise TypeError("chunk_cache must be SynthesisCache")
+        self.chunk_cache: Optional[SynthesisCache] = chunk_cache
+
+        # Validate the initial_byte_length parameter. If given, the first
+        # partial text is kept this short so that audio starts sooner, and
+        # the partial texts after it grow up to the maximum size.
+        if initial_byte_length is not None:
+            if not isinstance(initial_byte_length, int):
+                raise TypeError("initial_byte_length must be int")
+            if initial_byte_length <= 0:
+                raise ValueError("initial_byte_length must be greater than 0")
+
+        # Split the text into multiple strings and store them. The text is
+        # cleaned and escaped one block at a time, so that no full copies of
+        # it are made.
+        self.texts: Union[Iterator[bytes], AsyncIterator[bytes]]
+        if isinstance(text, AsyncIterable):
+            self.texts = split_text_stream_by_sentence(
+                (
+                    escape(remove_incompatible_characters(fragment))
+                    async for fragment in text
+                ),
+                4096,
+            )
+        else:
+            blocks: Iterable[str] = (
+                (
+                    text[i : i + TEXT_BLOCK_SIZE]
+                    for i in range(0, len(text), TEXT_BLOCK_SIZE)
+                )
+                if isinstance(text, str)
+                else text
+            )
+            partial_texts = split_text_blocks_by_byte_length(
+                (escape(remove_incompatible_characters(block)) for block in blocks),
+                4096,
+                initial_byte_length=initial_byte_length,
+            )
+
+            # The streams of some containers start over in every turn and
+            # cannot be joined, so a text given as str is checked to fit into
+            # a single turn before anything is synthesized. Other texts are
+            # checked as they are split.
+            if self.output_format.single_turn and isinstance(text, str):
+                single_turn = list(partial_texts)
+                if len(single_turn) > 1:
+                    raise self.__too_many_turns()
+                self.texts = iter(single_turn)
+            else:
+                self.texts = partial_texts
+
+        # Iterables of blocks, such as open files or pipes, may block while
+        # the next block is read, so they are pulled in a worker thread.
+        self.__pull_in_thread: bool = not isinstance(text, (str, AsyncIterable))
+
+        # Partial texts that were taken from the text to be checked against
+        # a checkpoint, but have to be synthesized after all.
+        self.__pending: Deque[bytes] = collections.deque()
+
         # Validate the proxy parameter.
         if proxy is not None and not isinstance(proxy, str):
             raise TypeError("proxy must be str")
         self.proxy: Optional[str] = proxy
 
+        # Validate the endpoint parameter. Connections are made to the
+        # service unless another endpoint, such as a StubServer, is given.
+        if endpoint is not None and not isinstance(endpoint, str):
+            raise TypeError("endpoint must be str")
+        self.endpoint: str = endpoint if endpoint is not None else WSS_URL
+
         # Validate the timeout parameters.
         if not isinstance(connect_timeout, int):
             raise TypeError("connect_timeout must be int")
         if not isinstance(receive_timeout, int):
             raise TypeError("receive_timeout must be int")
+        self.connect_timeout: int = connect_timeout
+        self.receive_timeout: int = receive_timeout
         self.session_timeout = aiohttp.ClientTimeout(
             total=None,
             connect=None,
@@ -364,6 +789,79 @@ class Communicate:
             raise TypeError("connector must be aiohttp.BaseConnector")
         self.connector: Optional[aiohttp.BaseConnector] = connector
 
+        # Validate the session_manager parameter. Connections are made through
+        # the process-wide session manager unless a connector or session
+        # manager is given.
+        if session_manager is not None and not isinstance(
+            session_manager, SessionManager
+        ):
+            raise TypeError("session_manager must be SessionManager")
+        if session_manager is not None and connector is not None:
+            raise ValueError("session_manager cannot be used with connector")
+        self.session_manager: SessionManager = (
+            session_manager if session_manager is not None else SessionManager.default()
+        )
+
+        # Validate the limiter parameter. It is stored once max_concurrency
+        # is validated, which sizes the limiter used when none is given.
+        if limiter is not None and not isinstance(limiter, AdaptiveLimiter):
+            raise TypeError("limiter must be AdaptiveLimiter")
+
+        # Validate the metrics parameter. Nothing is measured without it.
+        if metrics is not None and not isinstance(metrics, Metrics):
+            raise TypeError("metrics must be Metrics")
+        self.metrics: Optional[Metrics] = metrics
+        self.__turns = 0
+
+        # Validate the recorder and replay parameters. Every turn is recorded
+        # to the recorder, if given. If a replay is given, every turn is
+        # replayed from it instead of being synthesized by the service.
+        if recorder is not None and not isinstance(recorder, SessionRecorder):
+            raise TypeError("recorder must be SessionRecorder")
+        if replay is not None and not isinstance(replay, SessionReplay):
+            raise TypeError("replay must be SessionReplay")
+        if recorder is not None and replay is not None:
+            raise ValueError("recorder cannot be used with replay")
+        self.recorder: Optional[SessionRecorder] = recorder
+        self.replay: Optional[SessionReplay] = replay
+
+        # Validate the reuse_connection parameter.
+        if not isinstance(reuse_connection, bool):
+            raise TypeError("reuse_connection must be bool")
+        self.reuse_connection: bool = reuse_connection
+
+        # Validate the pool parameter. If given, the connection is taken from
+        # the pool and returned to it once the stream ends, so that it can
+        # be reused by other Communicate instances.
+        if pool is not None and not isinstance(pool, ConnectionPool):
+            raise TypeError("pool must be ConnectionPool")
+        if pool is not None and not reuse_connection:
+            raise ValueError("pool can only be used with reuse_connection")
+        if pool is not None and connector is not None:
+            raise ValueError("pool cannot be used with connector")
+        self.pool: Optional[ConnectionPool] = pool
+
+        # Validate the max_concurrency parameter.
+        if not isinstance(max_concurrency, int):
+            raise TypeError("max_concurrency must be int")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        if max_concurrency > 1 and reuse_connection:
+            raise ValueError("max_concurrency cannot be used with reuse_connection")
+        self.max_concurrency: int = max_concurrency
+
+        # Connections wait for a slot of the limiter. Unless one is given,
+        # the instance has one of its own that starts out allowing
+        # max_concurrency connections, so that it does not hold back the
+        # concurrency asked for.
+        self.limiter: AdaptiveLimiter = (
+            limiter
+            if limiter is not None
+            else AdaptiveLimiter(
+                initial_limit=max_concurrency, max_limit=max_concurrency
+            )
+        )
+
         # Store current state of TTS.
         self.state: CommunicateState = {
             "partial_text": b"",
@@ -372,12 +870,32 @@ class Communicate:
             "stream_was_called": False,
         }
 
-    def __parse_metadata(self, data: bytes) -> TTSChunk:
+        # The checkpoint save() resumes from and records finished partial
+        # texts to, and the function it runs once a partial text is finished.
+        self.__checkpoint: Optional[Checkpoint] = None
+        self.__on_turn_end: Optional[Callable[[bytes], Awaitable[None]]] = None
+
+        # Whether the audio was started by a turn, so that the header the
+        # service starts every turn with is stripped from the turns after it.
+        self.__audio_started: bool = False
+
+    def __too_many_turns(self) -> ValueError:
+        """Returns the error of a text too long for a single-turn output format."""
+        return ValueError(
+            f"{self.tts_config.output_format} can only hold a single turn, "
+            "as its stream starts over in every turn. Use a shorter text, or "
+            "an mp3, riff or raw output format."
+        )
+
+    @staticmethod
+    def __parse_metadata(
+        data: Union[str, bytes], state: CommunicateState
+    ) -> TTSChunkView:
         for meta_obj in json.loads(data)["Metadata"]:
             meta_type = meta_obj["Type"]
             if meta_type in ("WordBoundary", "SentenceBoundary"):
                 current_offset = (
-                    meta_obj["Data"]["Offset"] + self.state["offset_compensation"]
+                    meta_obj["Data"]["Offset"] + state["offset_compensation"]
                 )
                 current_duration = meta_obj["Data"]["Duration"]
                 return {
@@ -391,156 +909,829 @@ class Communicate:
             raise UnknownResponse(f"Unknown metadata type: {meta_type}")
         raise UnexpectedResponse("No WordBoundary metadata found")
 
-    async def __stream(self) -> AsyncGenerator[TTSChunk, None]:
-        async def send_command_request() -> None:
-            """Sends the command request to the service."""
-            word_boundary = self.tts_config.boundary == "WordBoundary"
-            wd = "true" if word_boundary else "false"
-            sq = "true" if not word_boundary else "false"
-            await websocket.send_str(
-                f"X-Timestamp:{date_to_string()}\r\n"
-                "Content-Type:application/json; charset=utf-8\r\n"
-                "Path:speech.config\r\n\r\n"
-                '{"context":{"synthesis":{"audio":{"metadataoptions":{'
-                f'"sentenceBoundaryEnabled":"{sq}","wordBoundaryEnabled":"{wd}"'
-                "},"
-                '"outputFormat":"audio-24khz-48kbitrate-mono-mp3"'
-                "}}}}\r\n"
+    async def __send_command_request(
+        self, websocket: aiohttp.ClientWebSocketResponse
+    ) -> None:
+        """Sends the command request to the service."""
+        word_boundary = self.tts_config.boundary == "WordBoundary"
+        wd = "true" if word_boundary else "false"
+        sq = "true" if not word_boundary else "false"
+        await websocket.send_str(
+            f"X-Timestamp:{date_to_string()}\r\n"
+            "Content-Type:application/json; charset=utf-8\r\n"
+            "Path:speech.config\r\n\r\n"
+            '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+            f'"sentenceBoundaryEnabled":"{sq}","wordBoundaryEnabled":"{wd}"'
+            "},"
+            f'"outputFormat":"{self.tts_config.output_format}"'
+            "}}}}\r\n"
+        )
+
+    async def __send_ssml_request(
+        self, websocket: FrameTransport, partial_text: bytes
+    ) -> None:
+        """Sends the SSML request to the service."""
+        await websocket.send_str(
+            ssml_headers_plus_data(
+                connect_id(),
+                date_to_string(),
+                mkssml(self.tts_config, partial_text),
             )
+        )
 
-        async def send_ssml_request() -> None:
-            """Sends the SSML request to the service."""
-            await websocket.send_str(
-                ssml_headers_plus_data(
-                    connect_id(),
-                    date_to_string(),
-                    mkssml(
-                        self.tts_config,
-                        self.state["partial_text"],
-                    ),
-                )
+    @asynccontextmanager
+    async def __session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """
+        Yields the session to connect to the service with. This is the shared
+        session of the session manager, unless a connector was given, in which
+        case a session owning that connector is created.
+        """
+        if self.connector is None:
+            session = await self.session_manager.session()
+            owns_session = False
+        else:
+            session = aiohttp.ClientSession(
+                connector=self.connector,
+                trust_env=True,
+                timeout=self.session_timeout,
+                trace_configs=[DRM.trace_config()],
+            )
+            owns_session = True
+
+        try:
+            yield session
+        finally:
+            if owns_session:
+                await session.close()
+
+    async def __connect(
+        self, session: aiohttp.ClientSession
+    ) -> aiohttp.ClientWebSocketResponse:
+        """
+        Opens a new connection to the service and sends the speech.config
+        command. The caller is responsible for closing the returned websocket.
+        """
+        websocket = await asyncio.wait_for(
+            session.ws_connect(
+                f"{self.endpoint}&ConnectionId={connect_id()}"
+                f"&Sec-MS-GEC={DRM.generate_sec_ms_gec()}"
+                f"&Sec-MS-GEC-Version={SEC_MS_GEC_VERSION}",
+                compress=15,
+                proxy=self.proxy,
+                headers=WSS_HEADERS,
+                ssl=self.session_manager.ssl_context,
+            ),
+            self.connect_timeout,
+        )
+        try:
+            await self.__send_command_request(websocket)
+        except BaseException:
+            await websocket.close()
+            raise
+        return websocket
+
+    def __parse_audio_frame(self, binary_data: bytes) -> Optional[memoryview]:
+        """
+        Parses a binary message, returning its audio data as a view into it,
+        or None for the empty message that terminates the audio stream.
+        """
+        # Message is too short to contain header length.
+        if len(binary_data) < 2:
+            raise UnexpectedResponse(
+                "We received a binary message, but it is missing the header length."
+            )
+
+        # The first two bytes of the binary message contain the header length.
+        header_length = int.from_bytes(binary_data[:2], "big")
+        if header_length > len(binary_data):
+            raise UnexpectedResponse(
+                "The header length is greater than the length of the data."
+            )
+
+        # Parse the headers of the binary message, and take the audio
+        # data as a view into it instead of copying it.
+        path, content_type = get_path_and_content_type(binary_data, 2, header_length)
+        data = memoryview(binary_data)[header_length + 2 :]
+
+        # Check if the path is audio.
+        if path != b"audio":
+            raise UnexpectedResponse(
+                "Received binary message, but the path is not audio."
+            )
+
+        # At termination of the stream, the service sends a binary message
+        # with no Content-Type; this is expected. What is not expected is for
+        # an audio stream to be sent with no data.
+        if content_type is not None and not self.output_format.accepts(content_type):
+            raise UnexpectedResponse(
+                "Received binary message, but with an unexpected Content-Type."
+            )
+
+        # We only allow no Content-Type if there is no data.
+        if content_type is None:
+            if len(data) == 0:
+                return None
+
+            # If the data is not empty, then we need to raise an exception.
+            raise UnexpectedResponse(
+                "Received binary message with no Content-Type, but with data."
+            )
+
+        # If the data is empty now, then we need to raise an exception.
+        if len(data) == 0:
+            raise UnexpectedResponse(
+                "Received binary message, but it is missing the audio data."
             )
 
+        return data
+
+    def __turn_transport(
+        self, websocket: FrameTransport, partial_text: bytes
+    ) -> FrameTransport:
+        """
+        Returns the transport to synthesize a turn over, which records the
+        turn if a recorder was given.
+        """
+        if self.recorder is None:
+            return websocket
+        return self.recorder.record_turn(websocket, self.__turn_key(partial_text))
+
+    def __turn_key(self, partial_text: bytes) -> bytes:
+        """
+        Returns the key a turn is recorded and replayed under, which holds
+        the SSML of the partial text and the rest of the settings.
+        """
+        return (
+            f"{self.tts_config.output_format}\n{self.tts_config.boundary}\n"
+            f"{mkssml(self.tts_config, partial_text)}"
+        ).encode("utf-8")
+
+    async def __receive_turn(
+        self,
+        websocket: FrameTransport,
+        state: CommunicateState,
+    ) -> AsyncGenerator[TTSChunkView, None]:
+        """
+        Sends the SSML request for the partial text of the given state and
+        yields the audio and metadata of the turn until turn.end is received.
+        The offsets of the given state are updated as the turn progresses.
+        The turn is recorded if a recorder was given.
+
+        A connection closed before turn.end raises WebSocketError, as the
+        audio of the turn is incomplete. Callers that can resend the turn,
+        such as __stream_reusing_connection(), catch it explicitly.
+        """
+        websocket = self.__turn_transport(websocket, state["partial_text"])
+        await self.__send_ssml_request(websocket, state["partial_text"])
+
+        # The turn is timed from the SSML request if metrics are recorded.
+        chunk = state.get("chunk_metrics")
+        sent = time.monotonic() if chunk is not None else 0.0
+
         # audio_was_received indicates whether we have received audio data
         # from the websocket. This is so we can raise an exception if we
         # don't receive any audio data.
         audio_was_received = False
 
-        # Create a new connection to the service.
-        ssl_ctx = ssl.create_default_context(cafile=certifi.where())
-        async with aiohttp.ClientSession(
-            connector=self.connector,
-            trust_env=True,
-            timeout=self.session_timeout,
-        ) as session, session.ws_connect(
-            f"{WSS_URL}&ConnectionId={connect_id()}"
-            f"&Sec-MS-GEC={DRM.generate_sec_ms_gec()}"
-            f"&Sec-MS-GEC-Version={SEC_MS_GEC_VERSION}",
-            compress=15,
-            proxy=self.proxy,
-            headers=WSS_HEADERS,
-            ssl=ssl_ctx,
-        ) as websocket:
-            await send_command_request()
-
-            await send_ssml_request()
-
-            async for received in websocket:
-                if received.type == aiohttp.WSMsgType.TEXT:
-                    encoded_data: bytes = received.data.encode("utf-8")
-                    parameters, data = get_headers_and_data(
-                        encoded_data, encoded_data.find(b"\r\n\r\n")
+        # The audio is measured as it arrives, to know the exact duration of
+        # the turn once it ends.
+        scanner = self.output_format.new_scanner()
+
+        while True:
+            received = await websocket.receive(self.receive_timeout)
+            if received.type in (
+                aiohttp.WSMsgType.CLOSE,
+                aiohttp.WSMsgType.CLOSING,
+                aiohttp.WSMsgType.CLOSED,
+            ):
+                raise WebSocketError("Connection closed before the turn ended.")
+
+            if received.type == aiohttp.WSMsgType.TEXT:
+                # Only the headers are encoded, as the body is only parsed
+                # for metadata, which is JSON that can be parsed as str.
+                text_data: str = received.data
+                header_end = text_data.find("\r\n\r\n")
+                if header_end < 0:
+                    header_end = len(text_data)
+                headers = text_data[:header_end].encode("utf-8")
+                path, _ = get_path_and_content_type(headers, 0, len(headers))
+
+                if path == b"audio.metadata":
+                    # Parse the metadata and yield it.
+                    parsed_metadata = self.__parse_metadata(
+                        text_data[header_end + 4 :], state
                     )
 
-                    path = parameters.get(b"Path", None)
-                    if path == b"audio.metadata":
-                        # Parse the metadata and yield it.
-                        parsed_metadata = self.__parse_metadata(data)
-                        yield parsed_metadata
-
-                        # Update the last duration offset for use by the next SSML request.
-                        self.state["last_duration_offset"] = (
-                            parsed_metadata["offset"] + parsed_metadata["duration"]
-                        )
-                    elif path == b"turn.end":
-                        # Update the offset compensation for the next SSML request.
-                        self.state["offset_compensation"] = self.state[
-                            "last_duration_offset"
-                        ]
-
-                        # Use average padding typically added by the service
-                        # to the end of the audio data. This seems to work pretty
-                        # well for now, but we might ultimately need to use a
-                        # more sophisticated method like using ffmpeg to get
-                        # the actual duration of the audio data.
-                        self.state["offset_compensation"] += 8_750_000
-
-                        # Exit the loop so we can send the next SSML request.
-                        break
-                    elif path not in (b"response", b"turn.start"):
-                        raise UnknownResponse("Unknown path received")
-                elif received.type == aiohttp.WSMsgType.BINARY:
-                    # Message is too short to contain header length.
-                    if len(received.data) < 2:
-                        raise UnexpectedResponse(
-                            "We received a binary message, but it is missing the header length."
+                    # Update the last duration offset for use by the next SSML request.
+                    state["last_duration_offset"] = (
+                        parsed_metadata["offset"] + parsed_metadata["duration"]
+                    )
+                    yield parsed_metadata
+                elif path == b"turn.end":
+                    # Update the offset compensation for the next SSML request
+                    # to the duration of the audio of this turn, as the audio
+                    # of the next turn directly follows it.
+                    if scanner is not None and scanner.duration > 0:
+                        state["offset_compensation"] = scanner.duration
+                    else:
+                        # Without audio that can be measured, fall back to the
+                        # average padding typically added by the service
+                        # to the end of the audio data.
+                        state["offset_compensation"] = (
+                            state["last_duration_offset"] + 8_750_000
                         )
 
-                    # The first two bytes of the binary message contain the header length.
-                    header_length = int.from_bytes(received.data[:2], "big")
-                    if header_length > len(received.data):
-                        raise UnexpectedResponse(
-                            "The header length is greater than the length of the data."
+                    if chunk is not None:
+                        chunk.turn_time = time.monotonic() - sent
+                        chunk.audio_duration = (
+                            state["offset_compensation"] / TICKS_PER_SECOND
                         )
 
-                    # Parse the headers and data from the binary message.
-                    parameters, data = get_headers_and_data(
-                        received.data, header_length
-                    )
+                    # Exit the loop so we can send the next SSML request.
+                    break
+                elif path == b"turn.start":
+                    if chunk is not None:
+                        chunk.time_to_turn_start = time.monotonic() - sent
+                elif path != b"response":
+                    raise UnknownResponse("Unknown path received")
+            elif received.type == aiohttp.WSMsgType.BINARY:
+                data = self.__parse_audio_frame(received.data)
+                if data is None:
+                    continue
+
+                # Yield the audio data.
+                audio_was_received = True
+                if scanner is not None:
+                    scanner.feed(data)
+                if chunk is not None:
+                    if chunk.time_to_first_byte is None:
+                        chunk.time_to_first_byte = time.monotonic() - sent
+                    chunk.audio_bytes += len(data)
+                yield {"type": "audio", "data": data}
+            elif received.type == aiohttp.WSMsgType.ERROR:
+                raise WebSocketError(
+                    received.data if received.data else "Unknown error"
+                )
 
-                    # Check if the path is audio.
-                    if parameters.get(b"Path") != b"audio":
-                        raise UnexpectedResponse(
-                            "Received binary message, but the path is not audio."
-                        )
+        if not audio_was_received:
+            raise NoAudioReceived(
+                "No audio was received. Please verify that your parameters are correct."
+            )
+
+    async def __connect_with_skew_retry(
+        self, session: aiohttp.ClientSession, chunk: Optional[ChunkMetrics]
+    ) -> aiohttp.ClientWebSocketResponse:
+        """Connects to the service, retrying once after a clock skew correction."""
+        try:
+            return await self.__connect(session)
+        except aiohttp.ClientResponseError as e:
+            if e.status != 403:
+                raise
+
+            DRM.handle_client_response_error(e)
+            if chunk is not None:
+                chunk.retries += 1
+            return await self.__connect(session)
+
+    async def __connect_with_retry(
+        self, session: aiohttp.ClientSession, state: CommunicateState
+    ) -> aiohttp.ClientWebSocketResponse:
+        """
+        Connects to the service for the partial text of the given state once
+        the limiter grants a connection slot, which is released by
+        __disconnect(). The latency of the connection is reported to the
+        limiter. If the service throttles the connection, the limiter is told
+        and the connection is retried after a backoff, waiting for a slot
+        again.
+        """
+        chunk = state.get("chunk_metrics")
+        attempt = 0
+        while True:
+            queued = time.monotonic() if chunk is not None else 0.0
+            await self.limiter.acquire(self)
+            started = time.monotonic()
+            if chunk is not None:
+                chunk.queue_time = (chunk.queue_time or 0.0) + started - queued
+            try:
+                websocket = await self.__connect_with_skew_retry(session, chunk)
+            except aiohttp.ClientResponseError as e:
+                self.limiter.release()
+                if e.status not in THROTTLING_STATUSES:
+                    raise
+                self.limiter.record_throttle()
+                if attempt >= MAX_THROTTLE_RETRIES:
+                    raise
+                if chunk is not None:
+                    chunk.retries += 1
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                self.limiter.release()
+                raise
+
+            latency = time.monotonic() - started
+            self.limiter.record_success(latency)
+            if chunk is not None:
+                chunk.connect_time = latency
+            return websocket
+
+    async def __disconnect(self, websocket: aiohttp.ClientWebSocketResponse) -> None:
+        """Closes a connection and releases its slot of the limiter."""
+        try:
+            await websocket.close()
+        finally:
+            self.limiter.release()
+
+    def __pool_key(self, session: aiohttp.ClientSession) -> Hashable:
+        """
+        Returns the key the connections of this instance are pooled under,
+        which identifies what they were made through and configured with.
+        """
+        return (
+            session,
+            self.proxy,
+            self.endpoint,
+            self.tts_config.output_format,
+            self.tts_config.boundary,
+        )
+
+    async def __take_pooled(
+        self, session: aiohttp.ClientSession
+    ) -> Optional[aiohttp.ClientWebSocketResponse]:
+        """
+        Takes an idle connection from the pool, if a pool was given and it
+        has one, once the limiter grants a connection slot, which is released
+        by __disconnect() or __return_to_pool().
+        """
+        if self.pool is None or not self.pool.has_idle(self.__pool_key(session)):
+            return None
+
+        await self.limiter.acquire(self)
+        try:
+            websocket = await self.pool.take(self.__pool_key(session))
+        except BaseException:
+            self.limiter.release()
+            raise
+        if websocket is None:
+            self.limiter.release()
+        return websocket
+
+    async def __return_to_pool(
+        self,
+        pool: ConnectionPool,
+        session: aiohttp.ClientSession,
+        websocket: aiohttp.ClientWebSocketResponse,
+    ) -> None:
+        """Returns a connection to the pool and releases its slot of the limiter."""
+        try:
+            await pool.put(self.__pool_key(session), websocket)
+        finally:
+            self.limiter.release()
+
+    async def __stream(
+        self, session: aiohttp.ClientSession, state: CommunicateState
+    ) -> AsyncGenerator[TTSChunkView, None]:
+        """
+        Synthesizes the partial text of the given state on a new connection,
+        or replays it if a replay was given.
+        """
+        if self.replay is not None:
+            async for message in self.__receive_turn(
+                self.replay.replay_turn(self.__turn_key(state["partial_text"])),
+                state,
+            ):
+                yield message
+            return
+
+        websocket = await self.__connect_with_retry(session, state)
+        try:
+            async for message in self.__receive_turn(websocket, state):
+                yield message
+        finally:
+            await self.__disconnect(websocket)
+
+    def __new_turn_state(self, partial_text: bytes) -> CommunicateState:
+        """
+        Returns the state of a turn with offsets relative to its own start,
+        along with its metrics if metrics are recorded.
+        """
+        state: CommunicateState = {
+            "partial_text": partial_text,
+            "offset_compensation": 0,
+            "last_duration_offset": 0,
+            "stream_was_called": True,
+        }
+        if self.metrics is not None:
+            state["chunk_metrics"] = ChunkMetrics(self.__turns, len(partial_text))
+            self.__turns += 1
+        return state
+
+    def __rebase(self, message: TTSChunkView) -> TTSChunkView:
+        """
+        Rebases a message with an offset relative to its turn onto the
+        offset compensation of the turns before it.
+        """
+        if message["type"] in ("WordBoundary", "SentenceBoundary"):
+            message["offset"] += self.state["offset_compensation"]
+            self.state["last_duration_offset"] = message["offset"] + message["duration"]
+        return message
+
+    def __turn_header_to_strip(self) -> int:
+        """
+        Returns the number of bytes to strip from the start of the audio of
+        the next turn, which is the header the service starts every turn
+        with, unless the turn is the one that starts the audio.
+        """
+        size = self.output_format.turn_header_size if self.__audio_started else 0
+        self.__audio_started = True
+        return size
+
+    @staticmethod
+    def __strip_header(
+        message: TTSChunkView, header: int
+    ) -> Tuple[Optional[TTSChunkView], int]:
+        """
+        Strips up to the given number of header bytes from the start of an
+        audio message, returning what is left of the message, if anything,
+        and the number of header bytes left to strip.
+        """
+        if header == 0 or message["type"] != "audio":
+            return message, header
+        data = message["data"]
+        if len(data) <= header:
+            return None, header - len(data)
+        return {"type": "audio", "data": data[header:]}, 0
+
+    async def __stream_partial_text(
+        self,
+        state: CommunicateState,
+        synthesize: Callable[[CommunicateState], AsyncGenerator[TTSChunkView, None]],
+    ) -> AsyncGenerator[TTSChunkView, None]:
+        """
+        Yields the messages of the partial text of the given turn state, with
+        offsets relative to the turn. If a chunk cache was given, unchanged
+        partial texts are replayed from it and the others are synthesized
+        with the given function and stored in it.
+        """
+        if self.chunk_cache is None:
+            async for message in synthesize(state):
+                yield message
+            return
+
+        key = self.chunk_cache.make_key(
+            state["partial_text"].decode("utf-8"), self.tts_config, partial=True
+        )
+        cached_turn = await self.chunk_cache.get_turn(key)
+        if cached_turn is not None:
+            messages, state["offset_compensation"] = cached_turn
+            chunk = state.get("chunk_metrics")
+            if chunk is not None:
+                chunk.cached = True
+            for message in messages:
+                yield message
+            return
+
+        entry = self.chunk_cache.entry(key)
+        try:
+            async for message in synthesize(state):
+                entry.write(message)
+                yield message
+        except BaseException:
+            entry.abort()
+            raise
+        await entry.commit(state["offset_compensation"])
+
+    async def __next_partial_text(self) -> Optional[bytes]:
+        """
+        Returns the next partial text, or None after the last one, whether
+        the text is synchronous or not. Partial texts of an iterable of
+        blocks are split in a worker thread, so that reading the blocks never
+        blocks the event loop.
+        """
+        if self.__pending:
+            return self.__pending.popleft()
+        if isinstance(self.texts, AsyncIterator):
+            try:
+                # anext() is only built in from Python 3.10 on.
+                # pylint: disable-next=unnecessary-dunder-call
+                return await self.texts.__anext__()
+            except StopAsyncIteration:
+                return None
+        if self.__pull_in_thread:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, next, self.texts, None
+            )
+        return next(self.texts, None)
+
+    async def __partial_texts(self) -> AsyncGenerator[bytes, None]:
+        """
+        Yields the partial texts that are left, checking that an output
+        format that can only hold a single turn is not given more.
+        """
+        checkpoint = self.__checkpoint
+        turns = checkpoint.partial_texts if checkpoint is not None else 0
+        while True:
+            partial_text = await self.__next_partial_text()
+            if partial_text is None:
+                return
+            turns += 1
+            if turns > 1 and self.output_format.single_turn:
+                raise self.__too_many_turns()
+            yield partial_text
+
+    async def __skip_finished(self, checkpoint: Checkpoint) -> None:
+        """
+        Skips the partial texts the checkpoint recorded as finished, after
+        checking by their digest that the text still starts with them. If it
+        does not, the partial texts are kept and the checkpoint starts over.
+        """
+        finished: List[bytes] = []
+        digest = ""
+        while len(finished) < checkpoint.partial_texts:
+            partial_text = await self.__next_partial_text()
+            if partial_text is None:
+                break
+            finished.append(partial_text)
+            digest = chain_digest(digest, partial_text)
+
+        if len(finished) < checkpoint.partial_texts or digest != checkpoint.digest:
+            self.__pending.extend(finished)
+            checkpoint.reset()
+
+    async def __finish_turn(self, state: CommunicateState) -> None:
+        """
+        Records the metrics of a turn whose messages were all consumed, if
+        metrics are recorded, and runs the turn end function of save(), if any.
+        """
+        chunk = state.get("chunk_metrics")
+        if self.metrics is not None and chunk is not None:
+            self.metrics.record(chunk)
+        if self.__on_turn_end is not None:
+            await self.__on_turn_end(state["partial_text"])
 
-                    # At termination of the stream, the service sends a binary message
-                    # with no Content-Type; this is expected. What is not expected is for
-                    # an MPEG audio stream to be sent with no data.
-                    content_type = parameters.get(b"Content-Type", None)
-                    if content_type not in [b"audio/mpeg", None]:
-                        raise UnexpectedResponse(
-                            "Received binary message, but with an unexpected Content-Type."
+    async def __stream_partial_texts(
+        self,
+        synthesize: Callable[[CommunicateState], AsyncGenerator[TTSChunkView, None]],
+    ) -> AsyncGenerator[TTSChunkView, None]:
+        """
+        Synthesizes the partial texts one after another with the given
+        function, rebasing the offsets of every turn onto the turns before it.
+        """
+        async for partial_text in self.__partial_texts():
+            self.state["partial_text"] = partial_text
+            state = self.__new_turn_state(partial_text)
+            chunk = state.get("chunk_metrics")
+            header = self.__turn_header_to_strip()
+            async for received in self.__stream_partial_text(state, synthesize):
+                message, header = self.__strip_header(received, header)
+                if message is None:
+                    continue
+                if chunk is None:
+                    yield self.__rebase(message)
+                else:
+                    # Time the consumer, as it holds up the turn.
+                    yielded = time.monotonic()
+                    yield self.__rebase(message)
+                    chunk.consumer_time += time.monotonic() - yielded
+            self.state["offset_compensation"] += state["offset_compensation"]
+            await self.__finish_turn(state)
+
+    async def __stream_reusing_connection(self) -> AsyncGenerator[TTSChunkView, None]:
+        """
+        Streams all the partial texts over a single connection, sending the
+        next SSML request after each turn.end. The connection is only
+        reestablished if it drops between turns. If a pool was given, the
+        connection is taken from it if possible, and returned to it once all
+        the partial texts were streamed.
+        """
+        async with self.__session() as session:
+            websocket: Optional[aiohttp.ClientWebSocketResponse] = None
+
+            async def synthesize(
+                state: CommunicateState,
+            ) -> AsyncGenerator[TTSChunkView, None]:
+                """Synthesizes the partial text over the shared connection."""
+                nonlocal websocket
+                fresh_connection = False
+                while True:
+                    if websocket is None or websocket.closed:
+                        if websocket is not None:
+                            closed = websocket
+                            websocket = None
+                            await self.__disconnect(closed)
+                        websocket = await self.__take_pooled(session)
+                        if websocket is None:
+                            websocket = await self.__connect_with_retry(session, state)
+                            fresh_connection = True
+
+                    # Track whether this turn has already yielded anything,
+                    # as a turn can only be resent if nothing was yielded yet.
+                    message_was_yielded = False
+                    try:
+                        async for message in self.__receive_turn(websocket, state):
+                            message_was_yielded = True
+                            yield message
+                    except (
+                        aiohttp.ClientConnectionError,
+                        ConnectionError,
+                        WebSocketError,
+                    ):
+                        if message_was_yielded or fresh_connection:
+                            raise
+                        chunk = state.get("chunk_metrics")
+                        if chunk is not None:
+                            chunk.retries += 1
+                        closed = websocket
+                        websocket = None
+                        await self.__disconnect(closed)
+                        continue
+
+                    return
+
+            completed = False
+            try:
+                async for message in self.__stream_partial_texts(synthesize):
+                    yield message
+                completed = True
+            finally:
+                if websocket is not None:
+                    if completed and self.pool is not None:
+                        await self.__return_to_pool(self.pool, session, websocket)
+                    else:
+                        await self.__disconnect(websocket)
+
+    async def __synthesize_partial_text(
+        self,
+        session: aiohttp.ClientSession,
+        state: CommunicateState,
+        queue: "asyncio.Queue[Optional[TTSChunkView]]",
+    ) -> None:
+        """
+        Synthesizes the partial text of the given state on its own connection,
+        putting its audio and metadata into the queue followed by None.
+        """
+        try:
+            async for message in self.__stream_partial_text(
+                state, functools.partial(self.__stream, session)
+            ):
+                queue.put_nowait(message)
+        finally:
+            queue.put_nowait(None)
+
+    async def __stream_concurrently(self) -> AsyncGenerator[TTSChunkView, None]:
+        """
+        Synthesizes up to max_concurrency partial texts at once, each on its
+        own connection, and yields their audio and metadata in text order.
+        Every partial text is synthesized with offsets relative to its own
+        turn, which are then rebased onto the offset compensation of the
+        turns before it.
+
+        At most max_concurrency partial texts are in flight or waiting to be
+        yielded at any time, which bounds the memory held for partial texts
+        that finish out of order.
+        """
+        async with self.__session() as session:
+            slots = asyncio.Semaphore(self.max_concurrency)
+            jobs: "asyncio.Queue[Optional[PartialTextJob]]" = asyncio.Queue()
+            tasks: "Set[asyncio.Task[None]]" = set()
+
+            async def schedule() -> None:
+                """
+                Starts partial texts as they become available, while fewer
+                than max_concurrency are pending. Partial texts are pulled in
+                the background, so that a text source which is still being
+                generated does not hold up the partial texts already started.
+                """
+                try:
+                    async for partial_text in self.__partial_texts():
+                        await slots.acquire()
+                        state = self.__new_turn_state(partial_text)
+                        queue: "asyncio.Queue[Optional[TTSChunkView]]" = asyncio.Queue()
+                        task = asyncio.create_task(
+                            self.__synthesize_partial_text(session, state, queue)
                         )
+                        tasks.add(task)
+                        jobs.put_nowait((state, queue, task))
+                finally:
+                    jobs.put_nowait(None)
 
-                    # We only allow no Content-Type if there is no data.
-                    if content_type is None:
-                        if len(data) == 0:
+            scheduler = asyncio.create_task(schedule())
+            try:
+                while True:
+                    job = await jobs.get()
+                    if job is None:
+                        break
+
+                    state, queue, task = job
+                    self.state["partial_text"] = state["partial_text"]
+
+                    # Yield the messages of the oldest partial text as they arrive.
+                    chunk = state.get("chunk_metrics")
+                    header = self.__turn_header_to_strip()
+                    while True:
+                        received = await queue.get()
+                        if received is None:
+                            break
+                        message, header = self.__strip_header(received, header)
+                        if message is None:
                             continue
+                        if chunk is None:
+                            yield self.__rebase(message)
+                        else:
+                            # Time the consumer, as it holds up the turn.
+                            yielded = time.monotonic()
+                            yield self.__rebase(message)
+                            chunk.consumer_time += time.monotonic() - yielded
+
+                    # Raise the error of the partial text, if any. Tasks are
+                    # only forgotten once awaited, so that the errors of the
+                    # ones left are retrieved below.
+                    await task
+                    tasks.discard(task)
+
+                    # Rebase the offset compensation for the next partial text.
+                    self.state["offset_compensation"] += state["offset_compensation"]
+                    await self.__finish_turn(state)
+                    slots.release()
+
+                # Raise the error of the text source, if any.
+                await scheduler
+            finally:
+                scheduler.cancel()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(scheduler, *tasks, return_exceptions=True)
+
+    async def __stream_from_service(self) -> AsyncGenerator[TTSChunkView, None]:
+        """Streams audio and metadata of all the partial texts from the service."""
+
+        # Stream all the partial texts over a single connection. There is no
+        # connection to reuse when replaying, so turns are replayed one by one.
+        if self.reuse_connection and self.replay is None:
+            async for message in self.__stream_reusing_connection():
+                yield message
+            return
+
+        # Synthesize several partial texts at once, yielding them in order.
+        if self.max_concurrency > 1:
+            async for message in self.__stream_concurrently():
+                yield message
+            return
+
+        # Stream the audio and metadata from the service, opening a new
+        # connection for every partial text.
+        async with self.__session() as session:
+            async for message in self.__stream_partial_texts(
+                functools.partial(self.__stream, session)
+            ):
+                yield message
+
+    async def __stream_through_cache(
+        self, cache: SynthesisCache, key: str
+    ) -> AsyncGenerator[TTSChunkView, None]:
+        """
+        Replays the messages stored in the cache for the given key, or streams
+        them from the service and stores them once the stream is complete.
+        """
+        cached_messages = await cache.get(key)
+        if cached_messages is not None:
+            for message in cached_messages:
+                yield message
+            return
 
-                        # If the data is not empty, then we need to raise an exception.
-                        raise UnexpectedResponse(
-                            "Received binary message with no Content-Type, but with data."
-                        )
+        entry = cache.entry(key)
+        try:
+            async for message in self.__stream_from_service():
+                entry.write(message)
+                yield message
+        except BaseException:
+            entry.abort()
+            raise
+        await entry.commit()
+
+    async def __stream_views(self) -> AsyncGenerator[TTSChunkView, None]:
+        """
+        Streams audio and metadata, with the audio data as views into the
+        frames it was received in, or into the cache entry it was read from.
+        """
 
-                    # If the data is empty now, then we need to raise an exception.
-                    if len(data) == 0:
-                        raise UnexpectedResponse(
-                            "Received binary message, but it is missing the audio data."
-                        )
+        # Check if stream was called before.
+        if self.state["stream_was_called"]:
+            raise RuntimeError("stream can only be called once.")
+        self.state["stream_was_called"] = True
 
-                    # Yield the audio data.
-                    audio_was_received = True
-                    yield {"type": "audio", "data": data}
-                elif received.type == aiohttp.WSMsgType.ERROR:
-                    raise WebSocketError(
-                        received.data if received.data else "Unknown error"
-                    )
+        # A save that resumes from a checkpoint only needs the partial texts
+        # after it, so it cannot be served from the cache of the whole text.
+        if self.cache is not None and self.__checkpoint is None:
+            async for message in self.__stream_through_cache(
+                self.cache, self.cache_key
+            ):
+                yield message
+            return
 
-            if not audio_was_received:
-                raise NoAudioReceived(
-                    "No audio was received. Please verify that your parameters are correct."
-                )
+        async for message in self.__stream_from_service():
+            yield message
 
     async def stream(
         self,
@@ -548,88 +1739,234 @@ class Communicate:
         """
         Streams audio and metadata from the service.
 
+        If a cache was given and it holds the text, the stored audio and
+        metadata are replayed instead.
+
+        The audio of all the turns is joined into a single stream. For riff
+        output formats, the header the service starts every turn with is only
+        kept for the first turn, so the sizes it holds only cover that turn
+        until they are fixed with formats.fix_riff_sizes(), which save() does.
+
         Raises:
             NoAudioReceived: If no audio is received from the service.
             UnexpectedResponse: If the response from the service is unexpected.
             UnknownResponse: If the response from the service is unknown.
+            ValueError: If the output format can only hold a single turn and
+                the text needs more than one.
             WebSocketError: If there is an error with the websocket.
         """
+        async for message in self.__stream_views():
+            if message["type"] == "audio":
+                yield {"type": "audio", "data": message["data"].tobytes()}
+            else:
+                yield {
+                    "type": message["type"],
+                    "offset": message["offset"],
+                    "duration": message["duration"],
+                    "text": message["text"],
+                }
 
-        # Check if stream was called before.
-        if self.state["stream_was_called"]:
-            raise RuntimeError("stream can only be called once.")
-        self.state["stream_was_called"] = True
+    async def stream_pcm(
+        self, dtype: Literal["int16", "float32"] = "int16"
+    ) -> AsyncGenerator[PCMChunk, None]:
+        """
+        Streams the audio as NumPy arrays of samples, along with metadata
+        whose offsets are also given in samples. Requires a raw PCM output
+        format and NumPy.
 
-        # Stream the audio and metadata from the service.
-        for self.state["partial_text"] in self.texts:
-            try:
-                async for message in self.__stream():
-                    yield message
-            except aiohttp.ClientResponseError as e:
-                if e.status != 403:
-                    raise
+        The int16 arrays are read-only views into the received audio, so no
+        audio is copied. The float32 arrays are converted from them and are
+        scaled to [-1, 1). A sample split across two messages is yielded on
+        its own.
 
-                DRM.handle_client_response_error(e)
-                async for message in self.__stream():
-                    yield message
+        Args:
+            dtype (str): The data type of the arrays, int16 or float32.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+            ValueError: If the output format is not raw PCM, or if dtype is
+                not supported.
+        """
+        try:
+            import numpy  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise ImportError(
+                "stream_pcm requires NumPy, install it with: pip install edge-tts[numpy]"
+            ) from e
+
+        if self.output_format.container != "raw":
+            raise ValueError("stream_pcm requires a raw PCM output_format")
+        if dtype not in ("int16", "float32"):
+            raise ValueError("dtype must be 'int16' or 'float32'")
+
+        sample_width = self.output_format.sample_width
+        sample_rate = self.output_format.sample_rate
+        sample_offset = 0
+        partial_sample = b""
+        async for message in self.__stream_views():
+            if message["type"] != "audio":
+                yield {
+                    "type": message["type"],
+                    "sample_offset": round(
+                        message["offset"] * sample_rate / TICKS_PER_SECOND
+                    ),
+                    "sample_duration": round(
+                        message["duration"] * sample_rate / TICKS_PER_SECOND
+                    ),
+                    "offset": message["offset"],
+                    "duration": message["duration"],
+                    "text": message["text"],
+                }
+                continue
+
+            data = message["data"]
+            buffers = []
+
+            # Join the bytes of a sample split across messages.
+            if partial_sample:
+                missing = sample_width - len(partial_sample)
+                partial_sample += data[:missing].tobytes()
+                data = data[missing:]
+                if len(partial_sample) < sample_width:
+                    continue
+                buffers.append(memoryview(partial_sample))
+                partial_sample = b""
+
+            end = len(data) - len(data) % sample_width
+            partial_sample = data[end:].tobytes()
+            if end > 0:
+                buffers.append(data[:end])
+
+            for buffer in buffers:
+                samples = numpy.frombuffer(buffer, dtype="<i2")
+                if dtype == "float32":
+                    samples = samples.astype(numpy.float32) / 32768
+                yield {
+                    "type": "audio",
+                    "samples": samples,
+                    "sample_offset": sample_offset,
+                }
+                sample_offset += len(samples)
 
     async def save(
         self,
-        audio_fname: Union[str, bytes],
-        metadata_fname: Optional[Union[str, bytes]] = None,
+        audio_fname: Union[str, bytes, Sink],
+        metadata_fname: Optional[Union[str, bytes, Sink]] = None,
+        *,
+        resume: bool = False,
     ) -> None:
         """
-        Save the audio and metadata to the specified files.
+        Save the audio and metadata to the specified files or sinks.
+
+        Files are written through a FileSink, so writing happens in a worker
+        thread instead of blocking the event loop, and the stream is only
+        read as fast as the files can be written. Given sinks are closed once
+        the stream ends.
+
+        If resume is set, every finished partial text is recorded to a
+        checkpoint file next to the audio file. When saving to the same files
+        again after an error, the partial texts the checkpoint recorded are
+        skipped and the files are continued from where it left off. The
+        checkpoint is removed once the save completes. If the text no longer
+        starts with the partial texts the checkpoint recorded, the save
+        starts over instead.
+
+        Raises:
+            ValueError: If resume is set and the audio or metadata is saved
+                to a sink.
         """
-        metadata: Union[TextIOWrapper, ContextManager[None]] = (
-            open(metadata_fname, "w", encoding="utf-8")
-            if metadata_fname is not None
-            else nullcontext()
+        checkpoint: Optional[Checkpoint] = None
+        if resume:
+            if isinstance(audio_fname, Sink) or isinstance(metadata_fname, Sink):
+                raise ValueError("resume can only be used when saving to files")
+            checkpoint = Checkpoint(audio_fname, metadata_fname, self.tts_config)
+            if checkpoint.load():
+                # The files are only continued once the text was checked.
+                await self.__skip_finished(checkpoint)
+            self.__checkpoint = checkpoint
+            self.state["offset_compensation"] = checkpoint.offset_compensation
+            self.__audio_started = checkpoint.audio_size > 0
+
+        audio_size = checkpoint.audio_size if checkpoint is not None else 0
+        metadata_size = checkpoint.metadata_size if checkpoint is not None else 0
+        audio = (
+            audio_fname
+            if isinstance(audio_fname, Sink)
+            else FileSink(audio_fname, offset=audio_size)
         )
-        with metadata, open(audio_fname, "wb") as audio:
-            async for message in self.stream():
+        metadata: Optional[Sink] = (
+            metadata_fname
+            if isinstance(metadata_fname, Sink) or metadata_fname is None
+            else FileSink(metadata_fname, offset=metadata_size)
+        )
+
+        if checkpoint is not None:
+            resumable = checkpoint
+
+            async def finish_turn(partial_text: bytes) -> None:
+                """Records the partial text once its output reached the files."""
+                await audio.flush()
+                if metadata is not None:
+                    await metadata.flush()
+                await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    resumable.advance,
+                    partial_text,
+                    self.state["offset_compensation"],
+                    audio_size,
+                    metadata_size,
+                )
+
+            self.__on_turn_end = finish_turn
+
+        try:
+            # The audio data is written straight from the received frames.
+            async for message in self.__stream_views():
                 if message["type"] == "audio":
-                    audio.write(message["data"])
-                elif isinstance(metadata, TextIOWrapper) and message["type"] in (
+                    await audio.write(message["data"])
+                    audio_size += len(message["data"])
+                elif metadata is not None and message["type"] in (
                     "WordBoundary",
                     "SentenceBoundary",
                 ):
-                    json.dump(message, metadata)
-                    metadata.write("\n")
-
-    def stream_sync(self) -> Generator[TTSChunk, None, None]:
-        """Synchronous interface for async stream method"""
-
-        def fetch_async_items(queue: Queue) -> None:  # type: ignore
-            async def get_items() -> None:
-                async for item in self.stream():
-                    queue.put(item)
-                queue.put(None)
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(get_items())
-            loop.close()
+                    line = json.dumps(message).encode("utf-8") + b"\n"
+                    await metadata.write(line)
+                    metadata_size += len(line)
+        finally:
+            try:
+                await audio.close()
+            finally:
+                if metadata is not None:
+                    await metadata.close()
+
+        # The RIFF header is the one of the first turn, so its sizes are
+        # fixed once the audio of all the turns was written.
+        if self.output_format.container == "riff" and not isinstance(audio_fname, Sink):
+            await asyncio.get_running_loop().run_in_executor(
+                None, fix_riff_sizes, audio_fname
+            )
 
-        queue: Queue = Queue()  # type: ignore
+        if checkpoint is not None:
+            checkpoint.remove()
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            executor.submit(fetch_async_items, queue)
+    def stream_sync(self) -> Generator[TTSChunk, None, None]:
+        """
+        Synchronous interface for async stream method.
 
-            while True:
-                item = queue.get()
-                if item is None:
-                    break
-                yield item
+        The stream runs on a shared background event loop, and at most a
+        bounded number of messages wait to be consumed. Closing the generator
+        early cancels the stream.
+        """
+        yield from BackgroundLoop.default().iterate(self.stream())
 
     def save_sync(
         self,
-        audio_fname: Union[str, bytes],
-        metadata_fname: Optional[Union[str, bytes]] = None,
+        audio_fname: Union[str, bytes, Sink],
+        metadata_fname: Optional[Union[str, bytes, Sink]] = None,
+        *,
+        resume: bool = False,
     ) -> None:
         """Synchronous interface for async save method."""
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(
-                asyncio.run, self.save(audio_fname, metadata_fname)
-            )
-            future.result()
+        BackgroundLoop.default().run(
+            self.save(audio_fname, metadata_fname, resume=resume)
+        )
@@ -12,6 +12,9 @@ VOICE_LIST = (
 
 DEFAULT_VOICE = "en-US-EmmaMultilingualNeural"
 
+# Number of characters of input text that are read, cleaned and escaped at once.
+TEXT_BLOCK_SIZE = 64 * 1024
+
 CHROMIUM_FULL_VERSION = "140.0.3485.14"
 CHROMIUM_MAJOR_VERSION = CHROMIUM_FULL_VERSION.split(".", maxsplit=1)[0]
 SEC_MS_GEC_VERSION = f"1-{CHROMIUM_FULL_VERSION}"
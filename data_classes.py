@@ -3,11 +3,14 @@
 # pylint: disable=too-few-public-methods
 
 import argparse
+import functools
 import re
 from dataclasses import dataclass
 
 from typing_extensions import Literal
 
+from .formats import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS
+
 
 @dataclass
 class TTSConfig:
@@ -20,6 +23,7 @@ class TTSConfig:
     volume: str
     pitch: str
     boundary: Literal["WordBoundary", "SentenceBoundary"]
+    output_format: str = DEFAULT_OUTPUT_FORMAT
 
     @staticmethod
     def validate_string_param(param_name: str, param_value: str, pattern: str) -> str:
@@ -43,37 +47,59 @@ class TTSConfig:
     def __post_init__(self) -> None:
         """
         Validates the TTSConfig object after initialization.
+
+        The outcome of validating the same settings is remembered, as many
+        Communicate instances are typically created with the same settings.
         """
+        for name in ("voice", "rate", "volume", "pitch", "output_format"):
+            if not isinstance(getattr(self, name), str):
+                raise TypeError(f"{name} must be str")
+        self.voice = _validate_settings(
+            self.voice, self.rate, self.volume, self.pitch, self.output_format
+        )
 
-        # Possible values for voice are:
-        # - Microsoft Server Speech Text to Speech Voice (cy-GB, NiaNeural)
-        # - cy-GB-NiaNeural
-        # - fil-PH-AngeloNeural
-        # Always send the first variant as that is what Microsoft Edge does.
-        if not isinstance(self.voice, str):
-            raise TypeError("voice must be str")
-        match = re.match(r"^([a-z]{2,})-([A-Z]{2,})-(.+Neural)$", self.voice)
-        if match is not None:
-            lang = match.group(1)
-            region = match.group(2)
-            name = match.group(3)
-            if name.find("-") != -1:
-                region = f"{region}-{name[:name.find('-')]}"
-                name = name[name.find("-") + 1 :]
-            self.voice = (
-                "Microsoft Server Speech Text to Speech Voice"
-                + f" ({lang}-{region}, {name})"
-            )
-
-        # Validate the rate, volume, and pitch parameters.
-        self.validate_string_param(
-            "voice",
-            self.voice,
-            r"^Microsoft Server Speech Text to Speech Voice \(.+,.+\)$",
+
+@functools.lru_cache(maxsize=1024)
+def _validate_settings(
+    voice: str, rate: str, volume: str, pitch: str, output_format: str
+) -> str:
+    """
+    Validates the settings of a TTSConfig and returns its voice in the
+    variant sent to the service.
+    """
+
+    # Possible values for voice are:
+    # - Microsoft Server Speech Text to Speech Voice (cy-GB, NiaNeural)
+    # - cy-GB-NiaNeural
+    # - fil-PH-AngeloNeural
+    # Always send the first variant as that is what Microsoft Edge does.
+    match = re.match(r"^([a-z]{2,})-([A-Z]{2,})-(.+Neural)$", voice)
+    if match is not None:
+        lang = match.group(1)
+        region = match.group(2)
+        name = match.group(3)
+        if name.find("-") != -1:
+            region = f"{region}-{name[:name.find('-')]}"
+            name = name[name.find("-") + 1 :]
+        voice = (
+            "Microsoft Server Speech Text to Speech Voice"
+            + f" ({lang}-{region}, {name})"
         )
-        self.validate_string_param("rate", self.rate, r"^[+-]\d+%$")
-        self.validate_string_param("volume", self.volume, r"^[+-]\d+%$")
-        self.validate_string_param("pitch", self.pitch, r"^[+-]\d+Hz$")
+
+    # Validate the rate, volume, and pitch parameters.
+    TTSConfig.validate_string_param(
+        "voice",
+        voice,
+        r"^Microsoft Server Speech Text to Speech Voice \(.+,.+\)$",
+    )
+    TTSConfig.validate_string_param("rate", rate, r"^[+-]\d+%$")
+    TTSConfig.validate_string_param("volume", volume, r"^[+-]\d+%$")
+    TTSConfig.validate_string_param("pitch", pitch, r"^[+-]\d+Hz$")
+
+    # Validate the output format against the formats the service supports.
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Invalid output_format '{output_format}'.")
+    return voice
 
 
 class UtilArgs(argparse.Namespace):
@@ -88,4 +114,11 @@ class UtilArgs(argparse.Namespace):
     pitch: str
     write_media: str
     write_subtitles: str
+    output_format: str
     proxy: str
+    batch: str
+    jobs: int
+    overwrite: bool
+    summary: str
+    play: str
+    live_subtitles: bool
@@ -3,9 +3,11 @@ Currently the only DRM operation is generating the Sec-MS-GEC token value
 used in all API requests to Microsoft Edge's online text-to-speech service."""
 
 import hashlib
+import threading
 from datetime import datetime as dt
 from datetime import timezone as tz
-from typing import Optional
+from types import SimpleNamespace
+from typing import Mapping, Optional, Tuple
 
 import aiohttp
 
@@ -15,6 +17,12 @@ from .exceptions import SkewAdjustmentError
 WIN_EPOCH = 11644473600
 S_TO_NS = 1e9
 
+# The number of seconds the clock skew measured from the Date header of a
+# successful response has to differ by before it replaces the current one.
+# The Date header only has a resolution of one second, and the response
+# took some time to arrive.
+CALIBRATION_TOLERANCE = 2.0
+
 
 class DRM:
     """
@@ -23,6 +31,14 @@ class DRM:
 
     clock_skew_seconds: float = 0.0
 
+    # Guards clock_skew_seconds, as it is updated from every event loop and
+    # thread that talks to the service.
+    _lock = threading.Lock()
+
+    # The 5 minute window the last Sec-MS-GEC token was generated for, and
+    # the token.
+    _token: Tuple[int, str] = (-1, "")
+
     @staticmethod
     def adj_clock_skew_seconds(skew_seconds: float) -> None:
         """
@@ -37,7 +53,73 @@ class DRM:
         Returns:
             None
         """
-        DRM.clock_skew_seconds += skew_seconds
+        with DRM._lock:
+            DRM.clock_skew_seconds += skew_seconds
+
+    @staticmethod
+    def calibrate_clock_skew(server_timestamp: float, tolerance: float = 0.0) -> None:
+        """
+        Set the clock skew so that the corrected clock matches the server date.
+
+        Unlike adj_clock_skew_seconds(), this sets the clock skew instead of
+        adding to it, so that concurrent calibrations from the same server
+        date do not add up.
+
+        Args:
+            server_timestamp (float): The server date as a Unix timestamp.
+            tolerance (float): The number of seconds the new clock skew has to
+                differ from the current one by to replace it.
+
+        Returns:
+            None
+        """
+        with DRM._lock:
+            skew_seconds = server_timestamp - dt.now(tz.utc).timestamp()
+            if abs(skew_seconds - DRM.clock_skew_seconds) > tolerance:
+                DRM.clock_skew_seconds = skew_seconds
+
+    @staticmethod
+    def calibrate_from_headers(headers: Mapping[str, str]) -> None:
+        """
+        Calibrate the clock skew from the Date header of a response, if any.
+
+        This is done for every response of the service, so that the clock
+        skew is corrected before a request is rejected because of it.
+
+        Args:
+            headers (Mapping[str, str]): The headers of the response.
+
+        Returns:
+            None
+        """
+        server_date = headers.get("Date")
+        if server_date is None:
+            return
+        server_date_parsed = DRM.parse_rfc2616_date(server_date)
+        if server_date_parsed is None:
+            return
+        DRM.calibrate_clock_skew(server_date_parsed, CALIBRATION_TOLERANCE)
+
+    @staticmethod
+    def trace_config() -> aiohttp.TraceConfig:
+        """
+        Returns a trace config calibrating the clock skew from the responses
+        of the session it is given to.
+
+        Returns:
+            aiohttp.TraceConfig: The trace config.
+        """
+
+        async def on_request_end(
+            _session: aiohttp.ClientSession,
+            _context: SimpleNamespace,
+            params: aiohttp.TraceRequestEndParams,
+        ) -> None:
+            DRM.calibrate_from_headers(params.response.headers)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
 
     @staticmethod
     def get_unix_timestamp() -> float:
@@ -95,8 +177,7 @@ class DRM:
             raise SkewAdjustmentError(
                 f"Failed to parse server date: {server_date}"
             ) from e
-        client_date = DRM.get_unix_timestamp()
-        DRM.adj_clock_skew_seconds(server_date_parsed - client_date)
+        DRM.calibrate_clock_skew(server_date_parsed)
 
     @staticmethod
     def generate_sec_ms_gec() -> str:
@@ -105,7 +186,8 @@ class DRM:
 
         This function generates a token value based on the current time in Windows file time format
         adjusted for clock skew, and rounded down to the nearest 5 minutes. The token is then hashed
-        using SHA256 and returned as an uppercased hex digest.
+        using SHA256 and returned as an uppercased hex digest. As the token only changes every 5
+        minutes, the token of the current window is reused.
 
         Returns:
             str: The generated Sec-MS-GEC token value.
@@ -114,17 +196,46 @@ class DRM:
             https://github.com/rany2/edge-tts/issues/290#issuecomment-2464956570
         """
 
-        # Get the current timestamp in Unix format with clock skew correction
-        ticks = DRM.get_unix_timestamp()
+        # Get the 5 minute window of the current timestamp with clock skew
+        # correction, reusing the token if it was already generated for it
+        window = DRM.sec_ms_gec_window(DRM.get_unix_timestamp())
+        cached_window, cached_token = DRM._token
+        if window == cached_window:
+            return cached_token
+
+        token = DRM.sec_ms_gec_for_window(window)
+        DRM._token = (window, token)
+        return token
+
+    @staticmethod
+    def sec_ms_gec_window(unix_timestamp: float) -> int:
+        """
+        Returns the 5 minute window of Windows file time a Unix timestamp
+        falls into. The Sec-MS-GEC token changes with every window.
+
+        Args:
+            unix_timestamp (float): The Unix timestamp.
 
-        # Switch to Windows file time epoch (1601-01-01 00:00:00 UTC)
-        ticks += WIN_EPOCH
+        Returns:
+            int: The number of 5 minute windows since the Windows file time epoch.
+        """
+        # Switch to Windows file time epoch (1601-01-01 00:00:00 UTC) and
+        # round down to the nearest 5 minutes (300 seconds)
+        return int((unix_timestamp + WIN_EPOCH) // 300)
 
-        # Round down to the nearest 5 minutes (300 seconds)
-        ticks -= ticks % 300
+    @staticmethod
+    def sec_ms_gec_for_window(window: int) -> str:
+        """
+        Generates the Sec-MS-GEC token value of a 5 minute window.
+
+        Args:
+            window (int): The window, as returned by sec_ms_gec_window().
 
-        # Convert the ticks to 100-nanosecond intervals (Windows file time format)
-        ticks *= S_TO_NS / 100
+        Returns:
+            str: The Sec-MS-GEC token value.
+        """
+        # Convert the window to 100-nanosecond intervals (Windows file time format)
+        ticks = float(window * 300) * (S_TO_NS / 100)
 
         # Create the string to hash by concatenating the ticks and the trusted client token
         str_to_hash = f"{ticks:.0f}{TRUSTED_CLIENT_TOKEN}"
@@ -26,3 +26,7 @@ class WebSocketError(EdgeTTSException):
 
 class SkewAdjustmentError(EdgeTTSException):
     """Raised when an error occurs while adjusting the clock skew."""
+
+
+class ReplayMismatch(EdgeTTSException):
+    """Raised when a recording has no turn left for a partial text to replay."""
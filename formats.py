@@ -0,0 +1,178 @@
+"""Formats module describes the audio output formats the service can be asked
+for, and measures the duration of the audio received in them."""
+
+# pylint: disable=too-few-public-methods
+
+import os
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Union
+
+from typing_extensions import Literal
+
+from .mp3 import TICKS_PER_SECOND, MP3FrameScanner
+
+DEFAULT_OUTPUT_FORMAT = "audio-24khz-48kbitrate-mono-mp3"
+
+# The Content-Type media types the service labels audio of each container
+# with. Parameters such as "; codecs=opus" are ignored when matching.
+CONTENT_TYPES: Dict[str, Tuple[bytes, ...]] = {
+    "mp3": (b"audio/mpeg",),
+    "webm": (b"audio/webm",),
+    "ogg": (b"audio/ogg",),
+    "riff": (b"audio/x-wav", b"audio/wav"),
+    "raw": (b"audio/x-wav", b"audio/wav", b"audio/l16", b"audio/pcm", b"audio/basic"),
+}
+
+# The size of the canonical RIFF/WAVE header the service starts PCM audio
+# in a RIFF container with.
+RIFF_HEADER_SIZE = 44
+
+# The containers the service starts over in every turn, whose streams cannot
+# be joined, so that they can only hold the audio of a single turn.
+SINGLE_TURN_CONTAINERS = ("webm", "ogg")
+
+
+@dataclass(frozen=True)
+class OutputFormat:
+    """
+    Represents an audio output format of the service.
+    """
+
+    name: str
+    container: Literal["mp3", "webm", "ogg", "riff", "raw"]
+    sample_rate: int
+    sample_width: int = 2
+
+    def accepts(self, content_type: bytes) -> bool:
+        """
+        Checks whether the Content-Type of a received audio frame matches
+        the output format.
+
+        Args:
+            content_type (bytes): The value of the Content-Type header.
+
+        Returns:
+            bool: Whether the Content-Type matches the output format.
+        """
+        media_type = content_type.split(b";", 1)[0].strip().lower()
+        return media_type in CONTENT_TYPES[self.container]
+
+    @property
+    def turn_header_size(self) -> int:
+        """
+        The size of the header the service starts the audio of every turn
+        with, which is only kept for the first turn when turns are joined.
+        """
+        return RIFF_HEADER_SIZE if self.container == "riff" else 0
+
+    @property
+    def single_turn(self) -> bool:
+        """Whether the audio can only hold a single turn."""
+        return self.container in SINGLE_TURN_CONTAINERS
+
+    def new_scanner(self) -> Optional[Union[MP3FrameScanner, "PCMScanner"]]:
+        """
+        Returns a scanner measuring the duration of audio in this format, or
+        None if the duration of the format cannot be measured.
+
+        Returns:
+            Optional[Union[MP3FrameScanner, PCMScanner]]: The scanner.
+        """
+        if self.container == "mp3":
+            return MP3FrameScanner()
+        if self.container in ("riff", "raw"):
+            return PCMScanner(
+                self.sample_rate, self.sample_width, self.turn_header_size
+            )
+        return None
+
+
+class PCMScanner:
+    """
+    PCMScanner measures the duration of mono PCM audio from its size, as the
+    audio is fed to it in pieces of any size.
+    """
+
+    def __init__(self, sample_rate: int, sample_width: int, header_size: int) -> None:
+        self.sample_rate: int = sample_rate
+        self.sample_width: int = sample_width
+        self.header_size: int = header_size
+        self.size: int = 0
+
+    @property
+    def duration(self) -> float:
+        """The duration of the audio fed so far, in ticks of 100 nanoseconds."""
+        samples = max(self.size - self.header_size, 0) // self.sample_width
+        return samples * TICKS_PER_SECOND / self.sample_rate
+
+    def feed(self, data: Union[bytes, memoryview]) -> None:
+        """
+        Feed the next piece of the audio to the scanner.
+
+        Args:
+            data (bytes or memoryview): The next piece of the audio.
+
+        Returns:
+            None
+        """
+        self.size += len(data)
+
+
+OUTPUT_FORMATS: Dict[str, OutputFormat] = {
+    output_format.name: output_format
+    for output_format in (
+        OutputFormat("audio-16khz-32kbitrate-mono-mp3", "mp3", 16000),
+        OutputFormat("audio-16khz-64kbitrate-mono-mp3", "mp3", 16000),
+        OutputFormat("audio-16khz-128kbitrate-mono-mp3", "mp3", 16000),
+        OutputFormat("audio-24khz-48kbitrate-mono-mp3", "mp3", 24000),
+        OutputFormat("audio-24khz-96kbitrate-mono-mp3", "mp3", 24000),
+        OutputFormat("audio-24khz-160kbitrate-mono-mp3", "mp3", 24000),
+        OutputFormat("audio-48khz-96kbitrate-mono-mp3", "mp3", 48000),
+        OutputFormat("audio-48khz-192kbitrate-mono-mp3", "mp3", 48000),
+        OutputFormat("webm-16khz-16bit-mono-opus", "webm", 16000),
+        OutputFormat("webm-24khz-16bit-mono-opus", "webm", 24000),
+        OutputFormat("ogg-16khz-16bit-mono-opus", "ogg", 16000),
+        OutputFormat("ogg-24khz-16bit-mono-opus", "ogg", 24000),
+        OutputFormat("ogg-48khz-16bit-mono-opus", "ogg", 48000),
+        OutputFormat("riff-8khz-16bit-mono-pcm", "riff", 8000),
+        OutputFormat("riff-16khz-16bit-mono-pcm", "riff", 16000),
+        OutputFormat("riff-24khz-16bit-mono-pcm", "riff", 24000),
+        OutputFormat("riff-48khz-16bit-mono-pcm", "riff", 48000),
+        OutputFormat("raw-8khz-16bit-mono-pcm", "raw", 8000),
+        OutputFormat("raw-16khz-16bit-mono-pcm", "raw", 16000),
+        OutputFormat("raw-24khz-16bit-mono-pcm", "raw", 24000),
+        OutputFormat("raw-48khz-16bit-mono-pcm", "raw", 48000),
+    )
+}
+
+
+def fix_riff_sizes(fname: Union[str, bytes, "os.PathLike[Any]"]) -> None:
+    """
+    Fix the sizes in the RIFF header of a file of audio in a riff output
+    format. The header is the one of the first turn, so the sizes it holds
+    only cover that turn when the audio of several turns was joined.
+    Files that do not start with a canonical RIFF/WAVE header are left as
+    they are.
+
+    Args:
+        fname (str, bytes or os.PathLike): The path of the file.
+
+    Returns:
+        None
+    """
+    with open(fname, "r+b") as file:
+        header = file.read(RIFF_HEADER_SIZE)
+        if (
+            len(header) < RIFF_HEADER_SIZE
+            or header[0:4] != b"RIFF"
+            or header[8:12] != b"WAVE"
+            or header[36:40] != b"data"
+        ):
+            return
+
+        size = min(file.seek(0, os.SEEK_END), 0xFFFFFFFF)
+        file.seek(4)
+        file.write(struct.pack("<I", size - 8))
+        file.seek(40)
+        file.write(struct.pack("<I", size - RIFF_HEADER_SIZE))
@@ -0,0 +1,260 @@
+"""Limiter module is used to adapt the number of connections made to the service
+at once to what it tolerates, queueing the callers over the limit fairly."""
+
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+
+# How quickly the latency baseline follows latencies above it, so that it
+# recovers if the service becomes slower for good.
+BASELINE_DRIFT = 0.05
+
+# The minimum time in seconds between two decreases of the limit, so that
+# the failures of connections made under the old limit only count once.
+DECREASE_COOLDOWN = 1.0
+
+# The HTTP statuses the service refuses connections with when it is under too
+# much load. A 403 is not one of them, as it means the Sec-MS-GEC token was
+# refused, which is corrected once for clock skew and then raised.
+THROTTLING_STATUSES = (429, 503)
+
+# The number of times a throttled connection is retried, and the delays in
+# seconds the retries are backed off by.
+MAX_THROTTLE_RETRIES = 8
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 8.0
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Returns the delay before retrying a throttled connection, which grows
+    exponentially with the attempt and is jittered so that the callers
+    throttled at once do not retry at once.
+
+    Args:
+        attempt (int): The number of the retry, starting at 0.
+
+    Returns:
+        float: The delay in seconds.
+    """
+    return min(BACKOFF_CAP, BACKOFF_BASE * 2.0**attempt) * random.uniform(0.5, 1)
+
+
+class _Waiter:  # pylint: disable=too-few-public-methods
+    """A caller waiting for a connection slot on its event loop."""
+
+    __slots__ = ("loop", "future")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.future: "asyncio.Future[None]" = loop.create_future()
+
+
+class AdaptiveLimiter:  # pylint: disable=too-many-instance-attributes
+    """
+    AdaptiveLimiter limits the number of connections to the service that are
+    in flight at once, adapting the limit with additive increase and
+    multiplicative decrease (AIMD). Every connection made within the usual
+    latency increases the limit by about one per limit connections, while a
+    throttled connection or a latency well above the usual one divides it.
+
+    Callers over the limit wait in one queue per owner, such as a
+    Communicate instance, and the queues are served in turn, so that an
+    owner with many pending connections does not hold up the others.
+
+    A process-wide instance is returned by AdaptiveLimiter.default(), which
+    can be given to several Communicate instances so that they share one
+    limit. It can be shared between event loops and threads.
+    """
+
+    _default: Optional["AdaptiveLimiter"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        """
+        Args:
+            initial_limit (int): The number of connections allowed at first.
+            min_limit (int): The number of connections always allowed.
+            max_limit (int): The number of connections never exceeded.
+            decrease_factor (float): The factor the limit is multiplied by
+                when the service throttles.
+            latency_tolerance (float): How many times the usual latency a
+                connection may take before it counts as congestion.
+        """
+        for name, value in (
+            ("initial_limit", initial_limit),
+            ("min_limit", min_limit),
+            ("max_limit", max_limit),
+        ):
+            if not isinstance(value, int):
+                raise TypeError(f"{name} must be int")
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "min_limit, initial_limit and max_limit must be positive and "
+                "in increasing order"
+            )
+        if not isinstance(decrease_factor, (int, float)):
+            raise TypeError("decrease_factor must be float")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        if not isinstance(latency_tolerance, (int, float)):
+            raise TypeError("latency_tolerance must be float")
+        if latency_tolerance <= 1:
+            raise ValueError("latency_tolerance must be greater than 1")
+
+        self.limit: float = initial_limit
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit
+        self.decrease_factor: float = decrease_factor
+        self.latency_tolerance: float = latency_tolerance
+        self.in_flight: int = 0
+        self._baseline: Optional[float] = None
+        self._last_decrease: float = float("-inf")
+        self._lock = threading.Lock()
+        self._waiters: "OrderedDict[int, Deque[_Waiter]]" = OrderedDict()
+
+    @classmethod
+    def default(cls) -> "AdaptiveLimiter":
+        """
+        Returns the process-wide limiter, creating it if needed.
+
+        Returns:
+            AdaptiveLimiter: The process-wide limiter.
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @property
+    def waiting(self) -> int:
+        """The number of callers waiting for a connection slot."""
+        with self._lock:
+            return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _grant_locked(self) -> None:
+        """Hands free connection slots to the waiting owners in turn."""
+        while self._waiters and self.in_flight < int(self.limit):
+            owner, waiters = next(iter(self._waiters.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                self._waiters.move_to_end(owner)
+            else:
+                del self._waiters[owner]
+
+            try:
+                waiter.loop.call_soon_threadsafe(self._resolve, waiter.future)
+            except RuntimeError:
+                # The event loop of the waiter was closed.
+                continue
+            self.in_flight += 1
+
+    def _resolve(self, future: "asyncio.Future[None]") -> None:
+        """Wakes up a waiter, or frees its slot if it stopped waiting."""
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    async def acquire(self, owner: object) -> None:
+        """
+        Wait for a connection slot. The slot must be released with release()
+        once the connection is closed.
+
+        Args:
+            owner (object): The object the connection is made for. Owners
+                waiting for slots are served in turn.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.setdefault(id(owner), deque()).append(waiter)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                waiters = self._waiters.get(id(owner))
+                if waiters is not None and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self._waiters[id(owner)]
+                    raise
+
+            # The slot was granted before the wait was cancelled. If the
+            # future was cancelled too, _resolve() frees the slot instead.
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """
+        Release a connection slot acquired with acquire().
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.in_flight -= 1
+            self._grant_locked()
+
+    def _decrease_locked(self) -> None:
+        """Divides the limit, unless it was just divided."""
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+
+    def record_success(self, latency: float) -> None:
+        """
+        Record a connection made successfully, adapting the limit to its
+        latency.
+
+        Args:
+            latency (float): The time in seconds the connection took.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._baseline is None or latency < self._baseline:
+                self._baseline = latency
+            else:
+                self._baseline += (latency - self._baseline) * BASELINE_DRIFT
+
+            if latency > self._baseline * self.latency_tolerance:
+                self._decrease_locked()
+            else:
+                self.limit = min(
+                    float(self.max_limit), self.limit + 1 / int(self.limit)
+                )
+                self._grant_locked()
+
+    def record_throttle(self) -> None:
+        """
+        Record a connection the service refused because of the load,
+        decreasing the limit.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._decrease_locked()
@@ -0,0 +1,245 @@
+"""Load generator for the command line, which drives Communicate against a local
+StubServer at a set concurrency and reports throughput and tail latency. Run it
+with python -m edge_tts.loadgen."""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .communicate import Communicate
+from .formats import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS
+from .limiter import AdaptiveLimiter
+from .metrics import Metrics, summarize
+from .stub_server import StubServer
+
+# The time to the first audio, the time to the end, the audio size and the
+# name of the error, if any, of a job.
+JobResult = Tuple[Optional[float], float, int, Optional[str]]
+
+
+def _make_text(words: int) -> str:
+    """Returns a text of the given number of words, in sentences of 12."""
+    return " ".join(
+        f"word{index}." if index % 12 == 11 else f"word{index}"
+        for index in range(words)
+    )
+
+
+async def _run_job(
+    text: str,
+    args: argparse.Namespace,
+    metrics: Metrics,
+    limiter: AdaptiveLimiter,
+    endpoint: str,
+) -> JobResult:
+    """Streams the text, measuring the time to the first audio and to the end."""
+    started = time.monotonic()
+    first_audio: Optional[float] = None
+    audio_size = 0
+    try:
+        async for chunk in Communicate(
+            text,
+            output_format=args.output_format,
+            endpoint=endpoint,
+            reuse_connection=args.reuse_connection,
+            max_concurrency=args.max_concurrency,
+            limiter=limiter,
+            metrics=metrics,
+        ).stream():
+            if chunk["type"] == "audio":
+                if first_audio is None:
+                    first_audio = time.monotonic() - started
+                audio_size += len(chunk["data"])
+    except Exception as e:  # pylint: disable=broad-except
+        return first_audio, time.monotonic() - started, audio_size, type(e).__name__
+    return first_audio, time.monotonic() - started, audio_size, None
+
+
+async def generate_load(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Runs the jobs against a local StubServer and returns the report.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+        Dict[str, Any]: The report, which can be serialized to JSON.
+    """
+    text = _make_text(args.words)
+    metrics = Metrics()
+    if args.fixed_limit is not None:
+        limiter = AdaptiveLimiter(
+            initial_limit=args.fixed_limit,
+            min_limit=args.fixed_limit,
+            max_limit=args.fixed_limit,
+        )
+    else:
+        # The limit starts out allowing every connection the load asks for,
+        # so that the load is applied unless the server throttles it.
+        connections = args.concurrency * args.max_concurrency
+        limiter = AdaptiveLimiter(initial_limit=connections, max_limit=connections)
+
+    async with StubServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        frame_size=args.frame_size,
+        frame_delay=args.frame_delay,
+        throttle_rate=args.throttle_rate,
+        drop_rate=args.drop_rate,
+        clock_offset=args.clock_offset,
+        seed=args.seed,
+    ) as server:
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def job() -> JobResult:
+            async with slots:
+                return await _run_job(text, args, metrics, limiter, server.url)
+
+        started = time.monotonic()
+        results: List[JobResult] = await asyncio.gather(
+            *(job() for _ in range(args.requests))
+        )
+        elapsed = time.monotonic() - started
+
+    errors: Dict[str, int] = {}
+    for _, _, _, error in results:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+    chunks = metrics.summary()
+    first_audio = [result[0] for result in results if result[0] is not None]
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "errors": errors,
+        "elapsed": elapsed,
+        "requests_per_second": args.requests / elapsed,
+        "audio_bytes_per_second": sum(result[2] for result in results) / elapsed,
+        "audio_seconds_per_second": chunks["audio_duration"] / elapsed,
+        "latency": summarize([result[1] for result in results]),
+        "first_audio": summarize(first_audio) if first_audio else None,
+        "final_limit": limiter.limit,
+        "server": dict(server.stats),
+        "chunks": chunks,
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    """Prints the report for humans."""
+    print(
+        f"{report['requests']} requests at concurrency {report['concurrency']} "
+        f"in {report['elapsed']:.2f} s"
+    )
+    print(f"  errors: {report['errors'] or 'none'}")
+    print(
+        f"  throughput: {report['requests_per_second']:.2f} requests/s, "
+        f"{report['audio_seconds_per_second']:.1f} audio s/s, "
+        f"{report['audio_bytes_per_second'] / 1024:.0f} KiB/s"
+    )
+    print(f"  final limit: {report['final_limit']:.2f}")
+    for name in ("latency", "first_audio"):
+        summary = report[name]
+        if summary is not None:
+            print(
+                f"  {name}: p50 {summary['p50'] * 1000:.1f} ms, "
+                f"p95 {summary['p95'] * 1000:.1f} ms, "
+                f"p99 {summary['p99'] * 1000:.1f} ms, "
+                f"max {summary['max'] * 1000:.1f} ms"
+            )
+    print(f"  server: {report['server']}")
+
+
+async def amain() -> None:
+    """Async main function"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark edge-tts against a local stand-in of the service."
+    )
+    parser.add_argument(
+        "-n", "--requests", type=int, default=100, help="number of texts. Default 100."
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=10,
+        help="number of texts synthesized at once. Default 10.",
+    )
+    parser.add_argument(
+        "--words", type=int, default=200, help="words per text. Default 200."
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=1,
+        help="partial texts synthesized at once per text. Default 1.",
+    )
+    parser.add_argument(
+        "--reuse-connection",
+        action="store_true",
+        help="send all partial texts of a text over one connection",
+    )
+    parser.add_argument(
+        "--fixed-limit",
+        type=int,
+        help="use a fixed connection limit instead of adapting it",
+    )
+    parser.add_argument(
+        "--output-format",
+        default=DEFAULT_OUTPUT_FORMAT,
+        choices=sorted(OUTPUT_FORMATS),
+        metavar="FORMAT",
+        help=f"set audio output format. Default {DEFAULT_OUTPUT_FORMAT}.",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="seconds before a turn starts."
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.02, help="most seconds added to latency."
+    )
+    parser.add_argument(
+        "--frame-size", type=int, default=4096, help="most bytes per audio message."
+    )
+    parser.add_argument(
+        "--frame-delay", type=float, default=0.0, help="seconds between messages."
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="probability of refusing a connection with 429.",
+    )
+    parser.add_argument(
+        "--drop-rate",
+        type=float,
+        default=0.0,
+        help="probability of dropping a connection during a turn.",
+    )
+    parser.add_argument(
+        "--clock-offset",
+        type=float,
+        default=0.0,
+        help="seconds the clock of the server is ahead of the local clock.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed. Default 0.")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    if min(args.requests, args.concurrency, args.max_concurrency, args.words) < 1:
+        parser.error(
+            "--requests, --concurrency, --max-concurrency and --words must be positive"
+        )
+
+    report = await generate_load(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+def main() -> None:
+    """Run the main function using asyncio."""
+    asyncio.run(amain())
+
+
+if __name__ == "__main__":
+    main()
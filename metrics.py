@@ -0,0 +1,136 @@
+"""Metrics module is used to record where the time of every partial text goes,
+from connecting to the service to the last audio byte, and to summarize it."""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+# The timings of ChunkMetrics that are summarized by Metrics.summary().
+TIMINGS = (
+    "queue_time",
+    "connect_time",
+    "time_to_turn_start",
+    "time_to_first_byte",
+    "turn_time",
+    "consumer_time",
+)
+
+
+@dataclass
+class ChunkMetrics:  # pylint: disable=too-many-instance-attributes
+    """
+    The metrics of one partial text. Times are in seconds. The times of the
+    turn are measured from when its SSML request was sent, and are None if
+    the partial text was replayed from the chunk cache. The times of the
+    connection are None if the partial text was sent over a connection
+    opened for an earlier one.
+    """
+
+    index: int
+    text_bytes: int
+    cached: bool = False
+    retries: int = 0
+    queue_time: Optional[float] = None
+    connect_time: Optional[float] = None
+    time_to_turn_start: Optional[float] = None
+    time_to_first_byte: Optional[float] = None
+    turn_time: Optional[float] = None
+    consumer_time: float = 0.0
+    audio_bytes: int = 0
+    audio_duration: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the metrics as a dict that can be serialized to JSON.
+
+        Returns:
+            Dict[str, Any]: The metrics.
+        """
+        return asdict(self)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """
+    Returns the count, mean, median, 95th and 99th percentile and maximum of
+    the values.
+
+    Args:
+        values (List[float]): The values, which must not be empty.
+
+    Returns:
+        Dict[str, float]: The summary of the values.
+    """
+    values = sorted(values)
+    last = len(values) - 1
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": values[last // 2],
+        "p95": values[min(last, int(len(values) * 0.95))],
+        "p99": values[min(last, int(len(values) * 0.99))],
+        "max": values[-1],
+    }
+
+
+class Metrics:
+    """
+    Metrics records the ChunkMetrics of every partial text a Communicate
+    instance synthesizes, once the partial text is finished, and passes them
+    to an optional callback. The same Metrics can be given to several
+    Communicate instances to aggregate them.
+
+    Nothing is measured for a Communicate instance without Metrics.
+    """
+
+    def __init__(
+        self, callback: Optional[Callable[[ChunkMetrics], None]] = None
+    ) -> None:
+        """
+        Args:
+            callback (callable): The function to call with the metrics of
+                every finished partial text.
+        """
+        if callback is not None and not callable(callback):
+            raise TypeError("callback must be callable")
+        self.callback = callback
+        self.chunks: List[ChunkMetrics] = []
+
+    def record(self, chunk: ChunkMetrics) -> None:
+        """
+        Record the metrics of a finished partial text.
+
+        Args:
+            chunk (ChunkMetrics): The metrics of the partial text.
+
+        Returns:
+            None
+        """
+        self.chunks.append(chunk)
+        if self.callback is not None:
+            self.callback(chunk)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Returns the totals of the recorded partial texts, along with the
+        summary of each of their timings as returned by summarize(), as a
+        dict that can be serialized to JSON.
+
+        Returns:
+            Dict[str, Any]: The summary.
+        """
+        summary: Dict[str, Any] = {
+            "chunks": len(self.chunks),
+            "cached": sum(chunk.cached for chunk in self.chunks),
+            "retries": sum(chunk.retries for chunk in self.chunks),
+            "text_bytes": sum(chunk.text_bytes for chunk in self.chunks),
+            "audio_bytes": sum(chunk.audio_bytes for chunk in self.chunks),
+            "audio_duration": sum(chunk.audio_duration or 0.0 for chunk in self.chunks),
+        }
+        for name in TIMINGS:
+            values = [
+                value
+                for value in (getattr(chunk, name) for chunk in self.chunks)
+                if value is not None
+            ]
+            if values:
+                summary[name] = summarize(values)
+        return summary
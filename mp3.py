@@ -0,0 +1,116 @@
+"""MP3 module is used to measure the exact duration of MP3 audio from the headers
+of its frames, as the audio is received."""
+
+# pylint: disable=too-few-public-methods
+
+from typing import Optional, Tuple, Union
+
+# The bitrates in kbit/s of Layer III, by bitrate index, for MPEG-1 and for
+# MPEG-2 and MPEG-2.5. Index 0 means free format and index 15 is invalid.
+MPEG1_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+MPEG2_BITRATES = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+
+# The sample rates in Hz by version bits and sample rate index. Version bits
+# 0b00 are MPEG-2.5, 0b10 are MPEG-2 and 0b11 are MPEG-1; 0b01 is reserved.
+SAMPLE_RATES = {
+    0b00: (11025, 12000, 8000),
+    0b10: (22050, 24000, 16000),
+    0b11: (44100, 48000, 32000),
+}
+
+# The offsets and durations of the service are in ticks of 100 nanoseconds.
+TICKS_PER_SECOND = 10_000_000
+
+
+def parse_frame_header(b0: int, b1: int, b2: int) -> Optional[Tuple[int, int, int]]:
+    """
+    Parses the first three bytes of an MPEG Layer III frame header.
+
+    Args:
+        b0 (int): The first byte of the header.
+        b1 (int): The second byte of the header.
+        b2 (int): The third byte of the header.
+
+    Returns:
+        Optional[Tuple[int, int, int]]: The length of the frame in bytes, the
+            number of samples in it and its sample rate, or None if the bytes
+            are not the header of a Layer III frame.
+    """
+    # Check the frame sync and that the frame is Layer III.
+    if b0 != 0xFF or b1 & 0xE0 != 0xE0 or b1 & 0x06 != 0x02:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version == 0b01 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    if version == 0b11:
+        bitrate = MPEG1_BITRATES[bitrate_index] * 1000
+        return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+
+    bitrate = MPEG2_BITRATES[bitrate_index] * 1000
+    return 72 * bitrate // sample_rate + padding, 576, sample_rate
+
+
+class MP3FrameScanner:
+    """
+    MP3FrameScanner counts the frames of an MP3 stream and their duration
+    as the stream is fed to it in pieces of any size. Only the headers of
+    the frames are read, and the rest of every frame is skipped over.
+    """
+
+    def __init__(self) -> None:
+        self.frames: int = 0
+        self.duration: float = 0
+        self._skip: int = 0
+        self._tail: bytes = b""
+
+    def feed(self, data: Union[bytes, memoryview]) -> None:
+        """
+        Feed the next piece of the stream to the scanner.
+
+        Args:
+            data (bytes or memoryview): The next piece of the stream.
+
+        Returns:
+            None
+        """
+        size = len(data)
+        tail = self._tail
+
+        # Positions are relative to the start of data. A header which was
+        # split across the previous pieces starts at a negative position, in
+        # the tail kept from them.
+        position = -len(tail) if tail else self._skip
+        while position + 3 <= size:
+            if position < 0:
+                header = tail[position:] + bytes(data[: position + 3])
+                frame = parse_frame_header(header[0], header[1], header[2])
+            else:
+                frame = parse_frame_header(
+                    data[position], data[position + 1], data[position + 2]
+                )
+
+            if frame is None:
+                # Not a frame header, so look for one at the next byte.
+                position += 1
+                continue
+
+            frame_length, samples, sample_rate = frame
+            self.frames += 1
+            self.duration += samples * TICKS_PER_SECOND / sample_rate
+            position += frame_length
+
+        if position >= size:
+            self._skip = position - size
+            self._tail = b""
+        elif position >= 0:
+            self._skip = 0
+            self._tail = bytes(data[position:])
+        else:
+            self._skip = 0
+            self._tail = tail[position:] + bytes(data)
@@ -0,0 +1,292 @@
+"""Playback module is used to play synthesized audio while it is still being
+received, by piping it to a local player such as mpv, ffplay or aplay, and to
+show the subtitles of the boundary events as the audio they belong to plays."""
+
+import asyncio
+import shutil
+import sys
+from typing import List, Optional, TextIO
+
+from .formats import OUTPUT_FORMATS
+from .mp3 import TICKS_PER_SECOND
+from .sinks import Sink
+from .typing import TTSChunk
+
+# The players that can be used, in the order they are tried when no player
+# is asked for.
+PLAYERS = ("mpv", "ffplay", "aplay")
+
+# The demuxers ffplay is told to use for each container, so that it starts
+# playing without probing the start of the audio first.
+FFPLAY_FORMATS = {
+    "mp3": "mp3",
+    "webm": "matroska",
+    "ogg": "ogg",
+    "riff": "wav",
+    "raw": "s16le",
+}
+
+
+def player_command(player: str, output_format: str) -> List[str]:
+    """
+    Returns the command line of a player that plays audio of the given
+    output format from its stdin as soon as it arrives.
+
+    Args:
+        player (str): The player, one of PLAYERS.
+        output_format (str): The output format of the audio.
+
+    Returns:
+        List[str]: The command line of the player.
+
+    Raises:
+        ValueError: If the player is unknown, or cannot play the format.
+    """
+    fmt = OUTPUT_FORMATS[output_format]
+    if player == "mpv":
+        command = ["mpv", "--no-video", "--really-quiet", "--cache=no"]
+        if fmt.container == "raw":
+            command += [
+                "--demuxer=rawaudio",
+                f"--demuxer-rawaudio-rate={fmt.sample_rate}",
+                "--demuxer-rawaudio-channels=1",
+                "--demuxer-rawaudio-format=s16le",
+            ]
+        return command + ["-"]
+    if player == "ffplay":
+        command = ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"]
+        command += ["-fflags", "nobuffer", "-f", FFPLAY_FORMATS[fmt.container]]
+        if fmt.container == "raw":
+            command += ["-sample_rate", str(fmt.sample_rate)]
+        return command + ["-i", "pipe:0"]
+    if player == "aplay":
+        if fmt.container == "riff":
+            return ["aplay", "-q", "-t", "wav", "-"]
+        if fmt.container == "raw":
+            return [
+                "aplay",
+                "-q",
+                "-t",
+                "raw",
+                "-f",
+                "S16_LE",
+                "-r",
+                str(fmt.sample_rate),
+                "-c",
+                "1",
+                "-",
+            ]
+        raise ValueError(
+            "aplay can only play PCM audio, use a raw or riff output format "
+            "such as raw-24khz-16bit-mono-pcm"
+        )
+    raise ValueError(f"Unknown player {player}, expected one of {', '.join(PLAYERS)}")
+
+
+def find_player(output_format: str, player: str = "auto") -> List[str]:
+    """
+    Returns the command line of an installed player for the output format.
+
+    Args:
+        output_format (str): The output format of the audio.
+        player (str): The player to use, or "auto" for the first installed
+            one of PLAYERS that can play the format.
+
+    Returns:
+        List[str]: The command line of the player.
+
+    Raises:
+        ValueError: If the player is not installed or cannot play the format,
+            or if no installed player can.
+    """
+    if player != "auto":
+        command = player_command(player, output_format)
+        if shutil.which(player) is None:
+            raise ValueError(f"{player} is not installed")
+        return command
+
+    installed = [name for name in PLAYERS if shutil.which(name) is not None]
+    for name in installed:
+        try:
+            return player_command(name, output_format)
+        except ValueError:
+            continue
+    if installed:
+        raise ValueError(
+            f"{', '.join(installed)} cannot play {output_format}, "
+            "use a raw or riff output format"
+        )
+    raise ValueError(f"No player found, install one of {', '.join(PLAYERS)}")
+
+
+class PlayerSink(Sink):
+    """
+    PlayerSink pipes audio to the stdin of a player as it is written. Every
+    write waits for the pipe to drain, so that audio which arrives faster than
+    the player reads it stays in the pipe and the connection instead of
+    piling up in memory. Closing the sink waits for the player to finish.
+
+    If the player exits early, for example because it was quit, the audio
+    written from then on is dropped and stopped becomes True.
+    """
+
+    def __init__(self, command: List[str]) -> None:
+        """
+        Args:
+            command (List[str]): The command line of the player, which has to
+                read the audio from its stdin, such as one from find_player().
+        """
+        super().__init__(buffer_size=0)
+        if not isinstance(command, list) or not command:
+            raise TypeError("command must be a non-empty list")
+
+        self.command = command
+        self.started: Optional[float] = None
+        self.playing = asyncio.Event()
+        self._process: "Optional[asyncio.subprocess.Process]" = None
+        self._broken = False
+
+    @property
+    def stopped(self) -> bool:
+        """Whether the player exited or stopped reading its stdin."""
+        process = self._process
+        return process is not None and (
+            self._broken
+            or process.returncode is not None
+            or process.stdin is None
+            or process.stdin.is_closing()
+        )
+
+    async def start(self) -> None:
+        """
+        Start the player, if it was not started yet. Starting it before the
+        audio arrives hides the time the player takes to start.
+
+        Returns:
+            None
+        """
+        if self._process is None:
+            self._process = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+
+    async def _write(self, data: bytearray) -> None:
+        await self.start()
+        if self.stopped:
+            return
+        if self.started is None:
+            self.started = asyncio.get_running_loop().time()
+            self.playing.set()
+
+        assert self._process is not None and self._process.stdin is not None
+        try:
+            self._process.stdin.write(bytes(data))
+            await self._process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # The player exited while the audio was written.
+            self._broken = True
+
+    async def _close(self) -> None:
+        process = self._process
+        if process is None:
+            return
+
+        try:
+            if process.stdin is not None and not process.stdin.is_closing():
+                process.stdin.close()
+                try:
+                    await process.stdin.wait_closed()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+            await process.wait()
+        finally:
+            # Do not leave the player playing if closing was interrupted.
+            if process.returncode is None:
+                process.kill()
+
+
+class LiveSubtitles:
+    """
+    LiveSubtitles prints the text of every boundary event once the audio
+    it belongs to is played, timed from when the first audio was handed to
+    the player.
+    """
+
+    def __init__(self, player: PlayerSink, file: TextIO = sys.stderr) -> None:
+        """
+        Args:
+            player (PlayerSink): The player the audio is played with.
+            file (TextIO): Where to print the subtitles. Defaults to stderr.
+        """
+        self.player = player
+        self.file = file
+        self._queue: "asyncio.Queue[TTSChunk]" = asyncio.Queue()
+        self._current: Optional[TTSChunk] = None
+        self._task: "Optional[asyncio.Task[None]]" = None
+
+    def feed(self, chunk: TTSChunk) -> None:
+        """
+        Feed a boundary event, whose text is printed once it is due.
+
+        Args:
+            chunk (TTSChunk): The WordBoundary or SentenceBoundary chunk.
+
+        Returns:
+            None
+        """
+        if chunk["type"] not in ("WordBoundary", "SentenceBoundary"):
+            raise ValueError(
+                "Invalid message type, expected 'WordBoundary' or 'SentenceBoundary'."
+            )
+
+        if self._task is None:
+            self._task = asyncio.create_task(self.__show())
+        self._queue.put_nowait(chunk)
+
+    async def __show(self) -> None:
+        """Prints the boundary events in order once they are due."""
+        loop = asyncio.get_running_loop()
+        while True:
+            self._current = await self._queue.get()
+
+            # The events of a sentence arrive before its audio does.
+            await self.player.playing.wait()
+            assert self.player.started is not None
+            due = self.player.started + self._current["offset"] / TICKS_PER_SECOND
+            if due > loop.time():
+                await asyncio.sleep(due - loop.time())
+            print(self._current["text"], file=self.file, flush=True)
+            self._current = None
+
+    def finish(self) -> None:
+        """
+        Print the events that are left at once, as the player finished
+        playing the audio. They are dropped if no audio was played.
+
+        Returns:
+            None
+        """
+        self.cancel()
+        if not self.player.playing.is_set():
+            return
+
+        chunks = [self._current] if self._current is not None else []
+        while not self._queue.empty():
+            chunks.append(self._queue.get_nowait())
+        self._current = None
+        for chunk in chunks:
+            print(chunk["text"], file=self.file, flush=True)
+
+    def cancel(self) -> None:
+        """
+        Stop printing the events that are left.
+
+        Returns:
+            None
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
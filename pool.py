@@ -0,0 +1,167 @@
+"""ConnectionPool module is used to keep the connections to the service that
+Communicate instances are done with open, so that later instances synthesizing
+with the same settings can send their text over them instead of connecting."""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+
+import aiohttp
+
+# An idle connection, as the time it was returned to the pool and the connection.
+IdleConnection = Tuple[float, aiohttp.ClientWebSocketResponse]
+
+# The number of seconds an idle connection is kept before it is closed. The
+# service closes connections that stay idle for long.
+DEFAULT_MAX_IDLE_TIME = 20.0
+
+
+class ConnectionPool:
+    """
+    ConnectionPool holds idle connections to the service by key, which
+    identifies the session they were made through and the settings they were
+    configured with. Connections are only reused by Communicate instances
+    with the same key.
+
+    Idle connections do not hold a slot of the limiter, so a connection taken
+    from the pool has to acquire one again before it is used.
+    """
+
+    def __init__(
+        self, *, max_idle: int = 8, max_idle_time: float = DEFAULT_MAX_IDLE_TIME
+    ) -> None:
+        """
+        Args:
+            max_idle (int): The maximum number of idle connections kept. The
+                connections idle the longest are closed first.
+            max_idle_time (float): The number of seconds an idle connection
+                is kept before it is closed.
+        """
+        if not isinstance(max_idle, int):
+            raise TypeError("max_idle must be int")
+        if not isinstance(max_idle_time, (int, float)):
+            raise TypeError("max_idle_time must be float")
+        if max_idle < 0:
+            raise ValueError("max_idle must not be negative")
+        if max_idle_time <= 0:
+            raise ValueError("max_idle_time must be greater than 0")
+
+        self.max_idle = max_idle
+        self.max_idle_time = float(max_idle_time)
+        self.reused = 0
+        self._idle: Dict[Hashable, Deque[IdleConnection]] = {}
+        self._size = 0
+
+    @property
+    def idle(self) -> int:
+        """The number of idle connections."""
+        return self._size
+
+    def _pop_expired(self) -> List[aiohttp.ClientWebSocketResponse]:
+        """Removes the idle connections that were closed or idle for too long."""
+        deadline = time.monotonic() - self.max_idle_time
+        expired: List[aiohttp.ClientWebSocketResponse] = []
+        for key in list(self._idle):
+            kept: Deque[IdleConnection] = deque()
+            for returned, websocket in self._idle[key]:
+                if returned < deadline or websocket.closed:
+                    expired.append(websocket)
+                else:
+                    kept.append((returned, websocket))
+            if kept:
+                self._idle[key] = kept
+            else:
+                del self._idle[key]
+        self._size -= len(expired)
+        return expired
+
+    def has_idle(self, key: Hashable) -> bool:
+        """
+        Returns whether there is an idle connection for the key, which may
+        still be gone by the time it is taken.
+
+        Args:
+            key (Hashable): The key of the connection.
+
+        Returns:
+            bool: Whether there is an idle connection for the key.
+        """
+        return bool(self._idle.get(key))
+
+    async def take(self, key: Hashable) -> Optional[aiohttp.ClientWebSocketResponse]:
+        """
+        Takes the most recently returned open connection for the key, if any.
+        The connection may still have been closed by the service since.
+
+        Args:
+            key (Hashable): The key of the connection.
+
+        Returns:
+            Optional[aiohttp.ClientWebSocketResponse]: The connection, or None.
+        """
+        await self._close_all(self._pop_expired())
+        connections = self._idle.get(key)
+        if not connections:
+            return None
+
+        _, websocket = connections.pop()
+        if not connections:
+            del self._idle[key]
+        self._size -= 1
+        self.reused += 1
+        return websocket
+
+    async def put(
+        self, key: Hashable, websocket: aiohttp.ClientWebSocketResponse
+    ) -> None:
+        """
+        Returns a connection at the end of a turn to the pool, closing the
+        connections idle the longest if the pool is full.
+
+        Args:
+            key (Hashable): The key of the connection.
+            websocket (aiohttp.ClientWebSocketResponse): The connection.
+
+        Returns:
+            None
+        """
+        expired = self._pop_expired()
+        if self.max_idle == 0:
+            expired.append(websocket)
+        elif not websocket.closed:
+            self._idle.setdefault(key, deque()).append((time.monotonic(), websocket))
+            self._size += 1
+            while self._size > self.max_idle:
+                oldest_key = min(self._idle, key=lambda k: self._idle[k][0][0])
+                connections = self._idle[oldest_key]
+                expired.append(connections.popleft()[1])
+                if not connections:
+                    del self._idle[oldest_key]
+                self._size -= 1
+        await self._close_all(expired)
+
+    @staticmethod
+    async def _close_all(connections: List[aiohttp.ClientWebSocketResponse]) -> None:
+        """Closes the given connections."""
+        for websocket in connections:
+            await websocket.close()
+
+    async def close(self) -> None:
+        """
+        Close all idle connections.
+
+        Returns:
+            None
+        """
+        connections = [
+            websocket for idle in self._idle.values() for _, websocket in idle
+        ]
+        self._idle.clear()
+        self._size = 0
+        await self._close_all(connections)
+
+    async def __aenter__(self) -> "ConnectionPool":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.close()
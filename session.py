@@ -0,0 +1,136 @@
+"""SessionManager module is used to share one SSL context and one pooled
+aiohttp session between Communicate, list_voices and VoicesManager."""
+
+import asyncio
+import functools
+import ssl
+from typing import Dict, Optional
+
+import aiohttp
+import certifi
+
+from .drm import DRM
+
+
+@functools.lru_cache(maxsize=None)
+def get_ssl_context() -> ssl.SSLContext:
+    """
+    Returns the SSL context used to connect to the service.
+
+    The context is created from the certifi bundle once per process, as
+    loading the bundle is comparatively expensive.
+
+    Returns:
+        ssl.SSLContext: The SSL context.
+    """
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+class SessionManager:
+    """
+    SessionManager owns a pooled aiohttp session per event loop, along with
+    the SSL context used for all connections made through it.
+
+    A process-wide instance is returned by SessionManager.default() and is
+    used when no session manager is given to Communicate or list_voices.
+    """
+
+    _default: Optional["SessionManager"] = None
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        """
+        Args:
+            limit (int): The maximum number of simultaneous connections.
+                0 means no limit.
+            limit_per_host (int): The maximum number of simultaneous
+                connections to the same host. 0 means no limit.
+            ssl_context (Optional[ssl.SSLContext]): The SSL context to use.
+                Defaults to the process-wide context from get_ssl_context().
+        """
+        if not isinstance(limit, int):
+            raise TypeError("limit must be int")
+        if not isinstance(limit_per_host, int):
+            raise TypeError("limit_per_host must be int")
+        if limit < 0 or limit_per_host < 0:
+            raise ValueError("limit and limit_per_host must not be negative")
+        if ssl_context is not None and not isinstance(ssl_context, ssl.SSLContext):
+            raise TypeError("ssl_context must be ssl.SSLContext")
+
+        self.limit: int = limit
+        self.limit_per_host: int = limit_per_host
+        self.ssl_context: ssl.SSLContext = (
+            ssl_context if ssl_context is not None else get_ssl_context()
+        )
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    @classmethod
+    def default(cls) -> "SessionManager":
+        """
+        Returns the process-wide session manager, creating it if needed.
+
+        Returns:
+            SessionManager: The process-wide session manager.
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def _prune(self) -> None:
+        """
+        Forgets the sessions of event loops that have been closed.
+
+        Their connections can no longer be closed gracefully, so the sessions
+        are detached from their connectors instead of being reported as
+        unclosed.
+        """
+        for loop in [loop for loop in self._sessions if loop.is_closed()]:
+            self._sessions.pop(loop).detach()
+
+    async def session(self) -> aiohttp.ClientSession:
+        """
+        Returns the shared session for the running event loop, creating it
+        if needed. The session must not be closed by the caller.
+
+        Returns:
+            aiohttp.ClientSession: The shared session.
+        """
+        self._prune()
+
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    ssl=self.ssl_context,
+                ),
+                trust_env=True,
+                timeout=aiohttp.ClientTimeout(total=None),
+                trace_configs=[DRM.trace_config()],
+            )
+            self._sessions[loop] = session
+        return session
+
+    async def close(self) -> None:
+        """
+        Closes the session of the running event loop, if any. A new session
+        is created the next time one is requested.
+        """
+        self._prune()
+
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    async def __aenter__(self) -> "SessionManager":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.close()
@@ -0,0 +1,312 @@
+"""Sinks module is used to write synthesized audio and metadata to files, pipes,
+memory, callbacks or subtitle files without blocking the event loop."""
+
+import abc
+import asyncio
+import json
+import os
+from typing import Any, Awaitable, BinaryIO, Callable, Optional, Union
+
+from .submaker import SubMaker
+
+# The default size writes are coalesced to before they are flushed.
+DEFAULT_BUFFER_SIZE = 256 * 1024
+
+
+class Sink(abc.ABC):
+    """
+    Sink is the base class of the destinations audio and metadata are
+    written to. Subclasses implement _write(), and _close() if they hold a
+    destination that has to be released.
+
+    Writes are coalesced into a buffer, which is flushed once it holds at
+    least buffer_size bytes. At most one flush is in flight at any time while
+    the next buffer fills up, so a write waits for the previous flush when
+    the destination is slower than the data arrives. This propagates
+    backpressure to whatever produces the data, such as the socket reader
+    of Communicate.stream().
+    """
+
+    def __init__(self, *, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        """
+        Args:
+            buffer_size (int): The number of bytes to coalesce writes to
+                before flushing them. 0 flushes every write.
+        """
+        if not isinstance(buffer_size, int):
+            raise TypeError("buffer_size must be int")
+        if buffer_size < 0:
+            raise ValueError("buffer_size must not be negative")
+
+        self.buffer_size: int = buffer_size
+        self.closed: bool = False
+        self._buffer = bytearray()
+        self._flush_task: "Optional[asyncio.Task[None]]" = None
+
+    @abc.abstractmethod
+    async def _write(self, data: bytearray) -> None:
+        """Writes coalesced data to the destination."""
+
+    async def _close(self) -> None:
+        """Releases the destination once all data was written."""
+
+    async def _wait_for_flush(self) -> None:
+        """Waits for the flush in flight, if any, raising its error."""
+        if self._flush_task is not None:
+            flush_task, self._flush_task = self._flush_task, None
+            await flush_task
+
+    async def _start_flush(self) -> None:
+        """Hands the buffer to a new flush once the previous one finished."""
+        data, self._buffer = self._buffer, bytearray()
+        await self._wait_for_flush()
+        self._flush_task = asyncio.create_task(self._write(data))
+
+    async def write(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        """
+        Write data to the sink.
+
+        Args:
+            data (bytes, bytearray or memoryview): The data to write.
+
+        Returns:
+            None
+        """
+        if self.closed:
+            raise ValueError("write to closed sink")
+
+        self._buffer += data
+        if len(self._buffer) >= self.buffer_size:
+            await self._start_flush()
+
+    async def flush(self) -> None:
+        """
+        Write all the buffered data to the destination.
+
+        Returns:
+            None
+        """
+        if self._buffer:
+            await self._start_flush()
+        await self._wait_for_flush()
+
+    async def close(self) -> None:
+        """
+        Flush the sink and release its destination.
+
+        Returns:
+            None
+        """
+        if self.closed:
+            return
+
+        try:
+            await self.flush()
+        finally:
+            self.closed = True
+            await self._close()
+
+    async def __aenter__(self) -> "Sink":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.close()
+
+
+class FileSink(Sink):
+    """
+    FileSink writes to a file, which is opened, written and closed in a
+    worker thread so that slow disks do not block the event loop.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, bytes, "os.PathLike[Any]"],
+        *,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        offset: int = 0,
+    ) -> None:
+        """
+        Args:
+            path (str, bytes or os.PathLike): The path of the file. The file
+                is created or truncated when the first data is flushed, or
+                when the sink is closed.
+            buffer_size (int): See Sink.
+            offset (int): The position in the existing file to write from.
+                The file is truncated to it instead of being emptied.
+        """
+        super().__init__(buffer_size=buffer_size)
+        if not isinstance(offset, int):
+            raise TypeError("offset must be int")
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+
+        self.path = path
+        self.offset: int = offset
+        self._file: Optional[BinaryIO] = None
+
+    def _open(self) -> BinaryIO:
+        if self._file is None:
+            # pylint: disable=consider-using-with
+            if self.offset > 0:
+                self._file = open(self.path, "r+b")
+                self._file.truncate(self.offset)
+                self._file.seek(self.offset)
+            else:
+                self._file = open(self.path, "wb")
+        return self._file
+
+    def _write_blocking(self, data: bytearray) -> None:
+        # Every flush reaches the file, so that what was flushed is not lost
+        # if the process dies.
+        file = self._open()
+        file.write(data)
+        file.flush()
+
+    def _close_blocking(self) -> None:
+        self._open().close()
+
+    async def _write(self, data: bytearray) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._write_blocking, data
+        )
+
+    async def _close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._close_blocking)
+
+
+class PipeSink(Sink):
+    """
+    PipeSink writes to an already open binary file object, such as
+    sys.stdout.buffer or the stdin of a subprocess, in a worker thread.
+    The file object is flushed after every write and is only closed if
+    asked to.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        *,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        close_file: bool = False,
+    ) -> None:
+        """
+        Args:
+            file (BinaryIO): The binary file object to write to.
+            buffer_size (int): See Sink.
+            close_file (bool): Whether to close the file object when the sink
+                is closed.
+        """
+        super().__init__(buffer_size=buffer_size)
+        self.file: BinaryIO = file
+        self.close_file: bool = close_file
+
+    def _write_blocking(self, data: bytearray) -> None:
+        self.file.write(data)
+        self.file.flush()
+
+    async def _write(self, data: bytearray) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._write_blocking, data
+        )
+
+    async def _close(self) -> None:
+        if self.close_file:
+            await asyncio.get_running_loop().run_in_executor(None, self.file.close)
+
+
+class BytesSink(Sink):
+    """
+    BytesSink appends to a bytearray in memory. As appending does not block,
+    writes are passed on without being coalesced.
+    """
+
+    def __init__(self, target: Optional[bytearray] = None) -> None:
+        """
+        Args:
+            target (Optional[bytearray]): The bytearray to append to. A new
+                one is created if not given.
+        """
+        super().__init__(buffer_size=0)
+        if target is not None and not isinstance(target, bytearray):
+            raise TypeError("target must be bytearray")
+        self.target: bytearray = target if target is not None else bytearray()
+
+    async def _write(self, data: bytearray) -> None:
+        self.target += data
+
+    def getvalue(self) -> bytes:
+        """
+        Returns the data written so far.
+
+        Returns:
+            bytes: The data written so far.
+        """
+        return bytes(self.target)
+
+
+class CallbackSink(Sink):
+    """
+    CallbackSink passes the coalesced data to a callback. If the callback
+    returns an awaitable, it is awaited before the next flush starts.
+    Callbacks that block should be coroutines that hand off the work.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[bytes], Optional[Awaitable[None]]],
+        *,
+        buffer_size: int = 0,
+    ) -> None:
+        """
+        Args:
+            callback (callable): The function to call with the data.
+            buffer_size (int): See Sink. Defaults to passing on every write.
+        """
+        super().__init__(buffer_size=buffer_size)
+        if not callable(callback):
+            raise TypeError("callback must be callable")
+        self.callback = callback
+
+    async def _write(self, data: bytearray) -> None:
+        result = self.callback(bytes(data))
+        if result is not None:
+            await result
+
+
+class SubtitleSink(Sink):
+    """
+    SubtitleSink turns the metadata written by Communicate.save(), one JSON
+    object per line, into SRT subtitles, which are written to a file in a
+    worker thread once the sink is closed.
+    """
+
+    def __init__(self, path: Union[str, bytes, "os.PathLike[Any]"]) -> None:
+        """
+        Args:
+            path (str, bytes or os.PathLike): The path of the subtitle file.
+                It is created or truncated when the sink is closed.
+        """
+        super().__init__(buffer_size=0)
+        self.path = path
+        self.submaker = SubMaker()
+        self._partial_line = b""
+
+    async def _write(self, data: bytearray) -> None:
+        lines = (self._partial_line + data).split(b"\n")
+        self._partial_line = lines.pop()
+        for line in lines:
+            if line:
+                self.submaker.feed(json.loads(line))
+
+    def _write_blocking(self, srt: str) -> None:
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(srt)
+
+    async def _close(self) -> None:
+        if self._partial_line:
+            self.submaker.feed(json.loads(self._partial_line))
+            self._partial_line = b""
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._write_blocking, self.submaker.get_srt()
+        )
@@ -0,0 +1,437 @@
+"""StubServer module runs a local stand-in for the text-to-speech service, which
+speaks its WebSocket protocol, so that the client can be tested and benchmarked
+offline and reproducibly."""
+
+import asyncio
+import json
+import random
+import re
+import socket
+import struct
+import time
+from email.utils import formatdate
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape, unescape
+
+from aiohttp import WSMsgType, web
+
+from .constants import TRUSTED_CLIENT_TOKEN
+from .drm import DRM
+from .formats import (
+    CONTENT_TYPES,
+    DEFAULT_OUTPUT_FORMAT,
+    OUTPUT_FORMATS,
+    RIFF_HEADER_SIZE,
+    OutputFormat,
+)
+
+WSS_PATH = "/tts/cognitiveservices/websocket/v1"
+
+# The audio of the stub is silent MP3 frames of MPEG-2 Layer III at 48 kbit/s,
+# 24 kHz and mono, which are 144 bytes and 24 ms long each.
+MP3_FRAME = b"\xff\xf3\x64\xc4" + b"\x00" * 140
+MP3_FRAME_TICKS = 240_000
+
+# The duration of the silence before the first word and after the last word
+# of a turn, in ticks of 100 nanoseconds, as added by the service.
+LEADING_SILENCE = 1_000_000
+TRAILING_SILENCE = 8_750_000
+
+# The duration of a word, in ticks, is WORD_TICKS plus CHAR_TICKS per character.
+WORD_TICKS = 480_000
+CHAR_TICKS = 480_000
+
+PROSODY = re.compile(r"<prosody[^>]*>(.*)</prosody>", re.S)
+SENTENCE_END = re.compile(r"[.!?。！？][\"')\]]*$")
+
+# A boundary of a turn: its text, offset and duration in ticks.
+Boundary = Tuple[str, int, int]
+
+
+def _parse_headers(message: str) -> Tuple[Dict[str, str], str]:
+    """Splits a text message of the protocol into its headers and body."""
+    head, _, body = message.partition("\r\n\r\n")
+    headers = {}
+    for line in head.split("\r\n"):
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return headers, body
+
+
+def _riff_header(sample_rate: int) -> bytes:
+    """Returns the RIFF/WAVE header of 16-bit mono PCM of unknown size."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        0xFFFFFFFF,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        1,
+        sample_rate,
+        sample_rate * 2,
+        2,
+        16,
+        b"data",
+        0xFFFFFFFF,
+    )
+
+
+def _boundaries(text: str, word_boundary: bool) -> List[Boundary]:
+    """
+    Returns the word or sentence boundaries of the text of a turn, with the
+    durations the stub gives to its words.
+    """
+    boundaries: List[Boundary] = []
+    offset = LEADING_SILENCE
+    sentence: List[str] = []
+    sentence_offset = offset
+    for word in text.split():
+        duration = WORD_TICKS + CHAR_TICKS * len(word)
+        if word_boundary:
+            boundaries.append((word, offset, duration))
+        else:
+            sentence.append(word)
+            if SENTENCE_END.search(word):
+                boundaries.append(
+                    (
+                        " ".join(sentence),
+                        sentence_offset,
+                        offset + duration - sentence_offset,
+                    )
+                )
+                sentence = []
+                sentence_offset = offset + duration
+        offset += duration
+    if sentence:
+        boundaries.append(
+            (" ".join(sentence), sentence_offset, offset - sentence_offset)
+        )
+    return boundaries
+
+
+def _metadata_message(
+    prefix: str, kind: str, text: str, offset: int, duration: int
+) -> str:
+    """Returns the audio.metadata message of a boundary."""
+    metadata = {
+        "Metadata": [
+            {
+                "Type": kind,
+                "Data": {
+                    "Offset": offset,
+                    "Duration": duration,
+                    "text": {
+                        "Text": escape(text),
+                        "Length": len(text),
+                        "BoundaryType": kind,
+                    },
+                },
+            }
+        ]
+    }
+    return (
+        f"{prefix}Content-Type:application/json; charset=utf-8\r\n"
+        f"Path:audio.metadata\r\n\r\n{json.dumps(metadata)}"
+    )
+
+
+class StubServer:  # pylint: disable=too-many-instance-attributes
+    """
+    StubServer is a local WebSocket server speaking the protocol of the
+    text-to-speech service: it takes speech.config and ssml requests and
+    answers every turn with turn.start, response, audio.metadata, binary
+    audio messages with a 2-byte header length and turn.end. The audio is
+    silence whose duration follows the length of the words, in MP3 or PCM
+    depending on the requested output format.
+
+    The latency before every turn, the size of the audio messages and
+    failures of the service can be configured. All randomness comes from
+    a seeded generator, so that runs can be reproduced.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        frame_size: int = 4096,
+        frame_delay: float = 0.0,
+        throttle_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        clock_offset: float = 0.0,
+        check_token: bool = True,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            host (str): The host to listen on.
+            port (int): The port to listen on. 0 picks a free port.
+            latency (float): The seconds before a turn starts.
+            jitter (float): The most seconds randomly added to the latency.
+            frame_size (int): The most bytes of audio per binary message.
+            frame_delay (float): The seconds between binary messages.
+            throttle_rate (float): The probability of refusing a connection
+                with 429, as the service does when it is overloaded.
+            drop_rate (float): The probability of dropping the connection in
+                the middle of a turn, without a close frame.
+            clock_offset (float): The seconds the clock of the server is
+                ahead of the local clock. Connections are refused with 403
+                and the Date of the server if their Sec-MS-GEC token does not
+                match the clock of the server.
+            check_token (bool): Whether to check the Sec-MS-GEC token.
+            seed (Optional[int]): The seed of the random failures and jitter.
+        """
+        if not isinstance(frame_size, int):
+            raise TypeError("frame_size must be int")
+        if frame_size < 1:
+            raise ValueError("frame_size must be greater than 0")
+        for name, value in (
+            ("latency", latency),
+            ("jitter", jitter),
+            ("frame_delay", frame_delay),
+        ):
+            if value < 0:
+                raise ValueError(f"{name} must not be negative")
+        for name, value in (
+            ("throttle_rate", throttle_rate),
+            ("drop_rate", drop_rate),
+        ):
+            if not 0 <= value <= 1:
+                raise ValueError(f"{name} must be between 0 and 1")
+
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.frame_size = frame_size
+        self.frame_delay = frame_delay
+        self.throttle_rate = throttle_rate
+        self.drop_rate = drop_rate
+        self.clock_offset = clock_offset
+        self.check_token = check_token
+        self.random = random.Random(seed)
+        self.stats: Dict[str, int] = {
+            "connections": 0,
+            "forbidden": 0,
+            "throttled": 0,
+            "turns": 0,
+            "dropped": 0,
+            "audio_bytes": 0,
+        }
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        """The URL to connect to the server with, given as the endpoint of Communicate."""
+        return (
+            f"ws://{self.host}:{self.port}{WSS_PATH}"
+            f"?Ocp-Apim-Subscription-Key={TRUSTED_CLIENT_TOKEN}"
+        )
+
+    def _server_date(self) -> str:
+        """Returns the Date header of the server, following its clock."""
+        return formatdate(time.time() + self.clock_offset, usegmt=True)
+
+    def _token_is_valid(self, token: str) -> bool:
+        """Checks a Sec-MS-GEC token against the clock of the server."""
+        window = DRM.sec_ms_gec_window(time.time() + self.clock_offset)
+        return token in (
+            DRM.sec_ms_gec_for_window(window),
+            DRM.sec_ms_gec_for_window(window - 1),
+        )
+
+    async def start(self) -> "StubServer":
+        """
+        Start listening. If the port is 0, it is set to the port picked.
+
+        Returns:
+            StubServer: The server.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind((self.host, self.port))
+        except BaseException:
+            sock.close()
+            raise
+        self.port = sock.getsockname()[1]
+
+        app = web.Application()
+        app.router.add_get(WSS_PATH, self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.SockSite(self._runner, sock).start()
+        return self
+
+    async def close(self) -> None:
+        """
+        Stop listening and close all connections.
+
+        Returns:
+            None
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "StubServer":
+        return await self.start()
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.close()
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        """Handles a connection, refusing it or serving its turns."""
+        self.stats["connections"] += 1
+        token = request.query.get("Sec-MS-GEC", "")
+        if self.check_token and not self._token_is_valid(token):
+            self.stats["forbidden"] += 1
+            return web.Response(status=403, headers={"Date": self._server_date()})
+        if self.random.random() < self.throttle_rate:
+            self.stats["throttled"] += 1
+            return web.Response(status=429, headers={"Date": self._server_date()})
+
+        websocket = web.WebSocketResponse(protocols=("synthesize",))
+        websocket.headers["Date"] = self._server_date()
+        await websocket.prepare(request)
+
+        output_format = OUTPUT_FORMATS[DEFAULT_OUTPUT_FORMAT]
+        word_boundary = False
+        async for message in websocket:
+            if message.type != WSMsgType.TEXT:
+                continue
+
+            headers, body = _parse_headers(message.data)
+            path = headers.get("path")
+            if path == "speech.config":
+                audio = json.loads(body)["context"]["synthesis"]["audio"]
+                output_format = OUTPUT_FORMATS[audio["outputFormat"]]
+                options = audio["metadataoptions"]
+                word_boundary = options["wordBoundaryEnabled"] == "true"
+            elif path == "ssml":
+                match = PROSODY.search(body)
+                text = unescape(match.group(1)) if match is not None else ""
+                if not await self._turn(
+                    request,
+                    websocket,
+                    request_id=headers.get("x-requestid", ""),
+                    text=text,
+                    output_format=output_format,
+                    word_boundary=word_boundary,
+                ):
+                    break
+        return websocket
+
+    @staticmethod
+    def _audio_size(container: str, sample_rate: int, ticks: int) -> int:
+        """Returns the size of the first ticks of the silence of a turn."""
+        if container == "mp3":
+            return -(-ticks // MP3_FRAME_TICKS) * len(MP3_FRAME)
+        if container in ("riff", "raw"):
+            header_size = RIFF_HEADER_SIZE if container == "riff" else 0
+            return header_size + ticks * sample_rate // 10_000_000 * 2
+        raise ValueError(f"The stub does not support {container} audio")
+
+    @staticmethod
+    def _audio(output_format: OutputFormat, start: int, end: int) -> bytes:
+        """
+        Returns the bytes of the silence of a turn from start to end. Like
+        the service, every turn in a riff output format starts with a RIFF
+        header, whose sizes are left unknown as the turn is streamed.
+        """
+        if output_format.container == "mp3":
+            return MP3_FRAME * ((end - start) // len(MP3_FRAME))
+        if output_format.container == "riff" and start < RIFF_HEADER_SIZE:
+            header = _riff_header(output_format.sample_rate)
+            return (header + bytes(end - len(header)))[start:end]
+        return bytes(end - start)
+
+    async def _send_audio(
+        self, websocket: web.WebSocketResponse, headers: bytes, audio: bytes
+    ) -> None:
+        """Sends audio in binary messages of at most frame_size bytes."""
+        for start in range(0, len(audio), self.frame_size):
+            frame = audio[start : start + self.frame_size]
+            await websocket.send_bytes(headers + frame)
+            self.stats["audio_bytes"] += len(frame)
+            if self.frame_delay:
+                await asyncio.sleep(self.frame_delay)
+
+    async def _turn(
+        self,
+        request: web.Request,
+        websocket: web.WebSocketResponse,
+        *,
+        request_id: str,
+        text: str,
+        output_format: OutputFormat,
+        word_boundary: bool,
+    ) -> bool:
+        """
+        Answers an SSML request. Returns False if the connection was dropped.
+        """
+        self.stats["turns"] += 1
+        await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+
+        prefix = f"X-RequestId:{request_id}\r\n"
+        await websocket.send_str(
+            f"{prefix}Content-Type:application/json; charset=utf-8\r\n"
+            'Path:turn.start\r\n\r\n{"context":{"serviceTag":"stub"}}'
+        )
+        await websocket.send_str(
+            f"{prefix}Content-Type:application/json; charset=utf-8\r\n"
+            'Path:response\r\n\r\n{"context":{"serviceTag":"stub"}}'
+        )
+
+        audio_headers = (
+            f"{prefix}Content-Type:"
+            f"{CONTENT_TYPES[output_format.container][0].decode('ascii')}\r\n"
+            "Path:audio\r\n"
+        ).encode("utf-8")
+        audio_headers = len(audio_headers).to_bytes(2, "big") + audio_headers
+
+        boundaries = _boundaries(text, word_boundary)
+        kind = "WordBoundary" if word_boundary else "SentenceBoundary"
+        drop_at = (
+            self.random.randrange(len(boundaries))
+            if boundaries and self.random.random() < self.drop_rate
+            else -1
+        )
+
+        # The audio up to the end of every boundary follows its metadata,
+        # and the last boundary is followed by the trailing silence.
+        sent = 0
+        for index, (boundary_text, offset, duration) in enumerate(boundaries):
+            if index == drop_at:
+                self.stats["dropped"] += 1
+                if request.transport is not None:
+                    request.transport.close()
+                return False
+
+            await websocket.send_str(
+                _metadata_message(prefix, kind, boundary_text, offset, duration)
+            )
+
+            end = offset + duration
+            if index == len(boundaries) - 1:
+                end += TRAILING_SILENCE
+            size = self._audio_size(
+                output_format.container, output_format.sample_rate, end
+            )
+            await self._send_audio(
+                websocket,
+                audio_headers,
+                self._audio(output_format, sent, size),
+            )
+            sent = size
+
+        end_headers = f"{prefix}Path:audio\r\n".encode("utf-8")
+        await websocket.send_bytes(len(end_headers).to_bytes(2, "big") + end_headers)
+        await websocket.send_str(
+            f"{prefix}Content-Type:application/json; charset=utf-8\r\n"
+            'Path:turn.end\r\n\r\n{"context":{"serviceTag":"stub"}}'
+        )
+        return True
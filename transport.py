@@ -0,0 +1,359 @@
+"""Transport module is used to record the frames the service sends for every
+turn to a file, along with when they arrived, and to replay them later in place
+of the service, either at their original pace or as fast as possible."""
+
+import asyncio
+import os
+import struct
+import threading
+import time
+from collections import deque
+from typing import BinaryIO, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+from typing_extensions import Protocol
+
+from .exceptions import ReplayMismatch
+
+# Bump this whenever the layout of a recording changes.
+RECORDING_VERSION = 2
+
+RECORDING_MAGIC = b"EDGETTSREC"
+
+# Every recording starts with the magic and the version, followed by the
+# records of every turn. A record is its kind, the number of seconds since the
+# SSML request of its turn was sent, the length of its payload and the payload.
+HEADER = struct.Struct(f">{len(RECORDING_MAGIC)}sH")
+RECORD = struct.Struct(">BdI")
+
+# The kinds of records. A turn starts with a TURN record holding its key,
+# followed by the TEXT and BINARY frames of the service in the order they
+# arrived, up to the turn.end message. Turns that did not end are not
+# recorded.
+TURN = 0
+TEXT = 1
+BINARY = 2
+
+# A recorded frame, as its kind, the number of seconds since the SSML request
+# and its payload.
+Frame = Tuple[int, float, bytes]
+
+
+class FrameTransport(Protocol):
+    """
+    The part of a websocket connection a turn is synthesized over. Any
+    aiohttp.ClientWebSocketResponse is a FrameTransport.
+    """
+
+    async def send_str(self, data: str) -> None:
+        """Sends a TEXT frame."""
+
+    async def receive(self, timeout: Optional[float] = None) -> aiohttp.WSMessage:
+        """Receives the next frame."""
+
+
+def _is_turn_end(data: str) -> bool:
+    """Returns whether a TEXT frame of the service is the turn.end message."""
+    header_end = data.find("\r\n\r\n")
+    headers = data[:header_end] if header_end >= 0 else data
+    return "Path:turn.end" in headers.split("\r\n")
+
+
+class _RecordingTransport:
+    """
+    Forwards the frames of one turn, recording the frames received until the
+    turn ends. If the connection is closed before, the turn is not recorded,
+    so that the turn it is retried with is the one replayed.
+    """
+
+    def __init__(
+        self,
+        recorder: "SessionRecorder",
+        websocket: FrameTransport,
+        key: bytes,
+    ) -> None:
+        self.recorder = recorder
+        self.websocket = websocket
+        self.key = key
+        self.frames: List[Frame] = []
+        self.started = time.monotonic()
+
+    async def send_str(self, data: str) -> None:
+        """Sends a TEXT frame, and starts timing the turn from it."""
+        await self.websocket.send_str(data)
+        self.started = time.monotonic()
+
+    async def receive(self, timeout: Optional[float] = None) -> aiohttp.WSMessage:
+        """Receives the next frame and records it."""
+        received = await self.websocket.receive(timeout)
+        elapsed = time.monotonic() - self.started
+        if received.type == aiohttp.WSMsgType.TEXT:
+            self.frames.append((TEXT, elapsed, received.data.encode("utf-8")))
+            if _is_turn_end(received.data):
+                await self.__write_turn()
+        elif received.type == aiohttp.WSMsgType.BINARY:
+            self.frames.append((BINARY, elapsed, received.data))
+        return received
+
+    async def __write_turn(self) -> None:
+        """Writes the turn in a worker thread, so that the loop never blocks."""
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.recorder.write_turn, self.key, self.frames
+        )
+
+
+class SessionRecorder:
+    """
+    SessionRecorder records every turn the Communicate instances it is given
+    to synthesize from the service, frame by frame, to a file that
+    SessionReplay can replay later.
+
+    Turns are written once they end, so turns that were synthesized at once
+    are not interleaved, and turns that failed are not written. They are
+    written in a worker thread, so recording does not block the event loop.
+    The same SessionRecorder can be given to several Communicate instances.
+    """
+
+    def __init__(self, fname: str) -> None:
+        """
+        Args:
+            fname (str): The file to record to. It is overwritten.
+        """
+        if not isinstance(fname, str):
+            raise TypeError("fname must be str")
+
+        self.fname = fname
+        self.turns = 0
+        self.file: BinaryIO = open(fname, "wb")  # pylint: disable=consider-using-with
+        self.file.write(HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION))
+
+        # Guards the file, as turns that end at once are written from
+        # several worker threads.
+        self._lock = threading.Lock()
+
+    def record_turn(self, websocket: FrameTransport, key: bytes) -> FrameTransport:
+        """
+        Returns a transport that forwards the frames of a turn over the given
+        websocket, and records the turn once it ends.
+
+        Args:
+            websocket (FrameTransport): The connection of the turn.
+            key (bytes): The key of the turn, which identifies its partial
+                text and the settings it is synthesized with.
+
+        Returns:
+            FrameTransport: The transport to synthesize the turn over.
+        """
+        return _RecordingTransport(self, websocket, key)
+
+    def write_turn(self, key: bytes, frames: List[Frame]) -> None:
+        """
+        Write a turn to the recording.
+
+        Args:
+            key (bytes): The key of the turn.
+            frames (List[Frame]): The frames received during the turn.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self.file.closed:
+                raise RuntimeError("The recording is closed.")
+
+            self.file.write(RECORD.pack(TURN, 0.0, len(key)))
+            self.file.write(key)
+            for kind, elapsed, payload in frames:
+                self.file.write(RECORD.pack(kind, elapsed, len(payload)))
+                self.file.write(payload)
+            self.file.flush()
+            self.turns += 1
+
+    def close(self) -> None:
+        """
+        Close the recording. Turns that end after it was closed raise
+        RuntimeError.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.file.close()
+
+    def __enter__(self) -> "SessionRecorder":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+class _ReplayTransport:
+    """Replays the frames of one recorded turn from the recording."""
+
+    def __init__(self, replay: "SessionReplay", position: int) -> None:
+        self.replay = replay
+        self.position = position
+        self.started = 0.0
+
+    async def send_str(self, data: str) -> None:
+        """Starts replaying the turn, as its SSML request was sent."""
+        del data
+        self.started = time.monotonic()
+
+    async def receive(self, timeout: Optional[float] = None) -> aiohttp.WSMessage:
+        """
+        Returns the next recorded frame once it is due. The frame is read in
+        a worker thread, so that replaying does not block the event loop.
+        """
+        del timeout
+        frame, self.position = await asyncio.get_running_loop().run_in_executor(
+            None, self.replay.read_frame, self.position
+        )
+        if frame is None:
+            return aiohttp.WSMessage(aiohttp.WSMsgType.CLOSED, None, None)
+
+        kind, elapsed, payload = frame
+        if self.replay.speed is not None:
+            delay = self.started + elapsed / self.replay.speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        if kind == TEXT:
+            return aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, payload.decode(), None)
+        return aiohttp.WSMessage(aiohttp.WSMsgType.BINARY, payload, None)
+
+
+class SessionReplay:
+    """
+    SessionReplay replays a recording made with SessionRecorder in place of
+    the service, for the Communicate instances it is given to.
+
+    Every turn is answered with the first recorded turn of the same key that
+    was not replayed yet, so the text, voice and settings have to be the ones
+    that were recorded. Nothing is sent over the network.
+    """
+
+    def __init__(self, fname: str, *, speed: Optional[float] = 1.0) -> None:
+        """
+        Args:
+            fname (str): The recording to replay.
+            speed (Optional[float]): How many times faster than recorded the
+                frames of a turn are replayed. If None, they are replayed as
+                fast as possible.
+        """
+        if not isinstance(fname, str):
+            raise TypeError("fname must be str")
+        if speed is not None:
+            if not isinstance(speed, (int, float)):
+                raise TypeError("speed must be float")
+            if speed <= 0:
+                raise ValueError("speed must be greater than 0")
+
+        self.fname = fname
+        self.speed: Optional[float] = speed
+        self.file: BinaryIO = open(fname, "rb")  # pylint: disable=consider-using-with
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.turns: Dict[bytes, Deque[int]] = {}
+
+        # Guards the position of the file, as turns can be replayed from
+        # several event loops and threads at once.
+        self._lock = threading.Lock()
+        try:
+            self.__index()
+        except BaseException:
+            self.file.close()
+            raise
+
+    def __index(self) -> None:
+        """Finds where the frames of every recorded turn start."""
+        header = self.file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{self.fname} is not a recording.")
+        magic, version = HEADER.unpack(header)
+        if magic != RECORDING_MAGIC:
+            raise ValueError(f"{self.fname} is not a recording.")
+        if version != RECORDING_VERSION:
+            raise ValueError(
+                f"{self.fname} is a recording of version {version}, "
+                f"expected {RECORDING_VERSION}."
+            )
+
+        position = HEADER.size
+        while position < self.size:
+            kind, _, length = self.__read_record(position)
+            position += RECORD.size
+            if kind == TURN:
+                key = self.file.read(length)
+                self.turns.setdefault(key, deque()).append(position + length)
+            position += length
+
+    def __read_record(self, position: int) -> Tuple[int, float, int]:
+        """Reads the record at the given position, without its payload."""
+        self.file.seek(position)
+        record = self.file.read(RECORD.size)
+        if len(record) < RECORD.size:
+            raise ValueError(f"{self.fname} is truncated.")
+        kind, elapsed, length = RECORD.unpack(record)
+        if (
+            kind not in (TURN, TEXT, BINARY)
+            or position + RECORD.size + length > self.size
+        ):
+            raise ValueError(f"{self.fname} is corrupted.")
+        return kind, elapsed, length
+
+    def read_frame(self, position: int) -> Tuple[Optional[Frame], int]:
+        """
+        Reads the frame at the given position of the recording.
+
+        Args:
+            position (int): The position of the frame.
+
+        Returns:
+            Tuple[Optional[Frame], int]: The frame, or None at the end of its
+                turn, and the position of the next frame.
+        """
+        if position >= self.size:
+            return None, position
+        with self._lock:
+            kind, elapsed, length = self.__read_record(position)
+            if kind == TURN:
+                return None, position
+            payload = self.file.read(length)
+        return (kind, elapsed, payload), position + RECORD.size + length
+
+    def replay_turn(self, key: bytes) -> FrameTransport:
+        """
+        Returns a transport that replays the next recorded turn of the given key.
+
+        Args:
+            key (bytes): The key of the turn, as given to
+                SessionRecorder.record_turn() when it was recorded.
+
+        Returns:
+            FrameTransport: The transport to synthesize the turn over.
+
+        Raises:
+            ReplayMismatch: If no turn of the key is left to replay.
+        """
+        positions = self.turns.get(key)
+        if not positions:
+            raise ReplayMismatch(
+                f"{self.fname} has no turn left for the partial text and "
+                "settings being synthesized."
+            )
+        return _ReplayTransport(self, positions.popleft())
+
+    def close(self) -> None:
+        """
+        Close the recording.
+
+        Returns:
+            None
+        """
+        self.file.close()
+
+    def __enter__(self) -> "SessionReplay":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
@@ -2,10 +2,12 @@
 
 # pylint: disable=too-few-public-methods
 
-from typing import List
+from typing import Any, List
 
 from typing_extensions import Literal, NotRequired, TypedDict
 
+from .metrics import ChunkMetrics
+
 
 class TTSChunk(TypedDict):
     """TTS chunk data."""
@@ -17,6 +19,28 @@ class TTSChunk(TypedDict):
     text: NotRequired[str]  # only for WordBoundary and SentenceBoundary
 
 
+class TTSChunkView(TypedDict):
+    """TTS chunk data whose audio data is a view into the buffer it arrived in."""
+
+    type: Literal["audio", "WordBoundary", "SentenceBoundary"]
+    data: NotRequired[memoryview]  # only for audio
+    duration: NotRequired[float]  # only for WordBoundary and SentenceBoundary
+    offset: NotRequired[float]  # only for WordBoundary and SentenceBoundary
+    text: NotRequired[str]  # only for WordBoundary and SentenceBoundary
+
+
+class PCMChunk(TypedDict):
+    """PCM chunk data."""
+
+    type: Literal["audio", "WordBoundary", "SentenceBoundary"]
+    samples: NotRequired[Any]  # only for audio, a numpy.ndarray of the samples
+    sample_offset: int  # index of the first sample of the audio or boundary
+    sample_duration: NotRequired[int]  # only for WordBoundary and SentenceBoundary
+    duration: NotRequired[float]  # only for WordBoundary and SentenceBoundary
+    offset: NotRequired[float]  # only for WordBoundary and SentenceBoundary
+    text: NotRequired[str]  # only for WordBoundary and SentenceBoundary
+
+
 class VoiceTag(TypedDict):
     """VoiceTag data."""
 
@@ -60,3 +84,4 @@ class CommunicateState(TypedDict):
     offset_compensation: float
     last_duration_offset: float
     stream_was_called: bool
+    chunk_metrics: NotRequired[ChunkMetrics]  # only for turns, if metrics are recorded
@@ -2,14 +2,21 @@
 
 import argparse
 import asyncio
+import json
+import os
 import sys
-from typing import Optional, TextIO
+import time
+from typing import Any, Dict, Generator, Iterable, List, Optional, TextIO, Tuple, Union
 
 from tabulate import tabulate
 
 from . import Communicate, SubMaker, list_voices
-from .constants import DEFAULT_VOICE
-from .data_classes import UtilArgs
+from .batch import BatchCommunicator, BatchJob
+from .constants import DEFAULT_VOICE, TEXT_BLOCK_SIZE
+from .data_classes import TTSConfig, UtilArgs
+from .formats import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS, fix_riff_sizes
+from .playback import PLAYERS, LiveSubtitles, PlayerSink, find_player
+from .sinks import FileSink, PipeSink, Sink
 
 
 async def _print_voices(*, proxy: Optional[str]) -> None:
@@ -29,11 +36,44 @@ async def _print_voices(*, proxy: Optional[str]) -> None:
     print(tabulate(table, headers))
 
 
-async def _run_tts(args: UtilArgs) -> None:
+def _read_blocks(file: TextIO) -> Generator[str, None, None]:
+    """Read a text file in blocks, so that it never has to fit in memory."""
+    while True:
+        block = file.read(TEXT_BLOCK_SIZE)
+        if not block:
+            return
+        yield block
+
+
+def _audio_sinks(args: UtilArgs) -> Tuple[List[Sink], Optional[PlayerSink]]:
+    """
+    Returns the sinks the audio is written to, and the player if any. With
+    --play, the audio is played as it arrives instead of being written to
+    stdout, and is also written to --write-media if given.
+    """
+    sinks: List[Sink] = []
+    if args.write_media is not None and args.write_media != "-":
+        sinks.append(FileSink(args.write_media))
+    elif args.write_media == "-" or not args.play:
+        sinks.append(PipeSink(sys.stdout.buffer))
+
+    player: Optional[PlayerSink] = None
+    if args.play:
+        player = PlayerSink(find_player(args.output_format, args.play))
+        sinks.append(player)
+    return sinks, player
+
+
+async def _run_tts(args: UtilArgs, text: Union[str, Iterable[str]]) -> None:
     """Run TTS after parsing arguments from command line."""
 
     try:
-        if sys.stdin.isatty() and sys.stdout.isatty() and not args.write_media:
+        if (
+            sys.stdin.isatty()
+            and sys.stdout.isatty()
+            and not args.write_media
+            and not args.play
+        ):
             print(
                 "Warning: TTS output will be written to the terminal. "
                 "Use --write-media to write to a file.\n"
@@ -47,41 +87,259 @@ async def _run_tts(args: UtilArgs) -> None:
         return
 
     communicate = Communicate(
-        args.text,
+        text,
         args.voice,
         rate=args.rate,
         volume=args.volume,
         pitch=args.pitch,
+        output_format=args.output_format,
         proxy=args.proxy,
     )
     submaker = SubMaker()
+    audio_sinks, player = _audio_sinks(args)
+    live: Optional[LiveSubtitles] = None
+    if player is not None:
+        await player.start()
+        if args.live_subtitles:
+            live = LiveSubtitles(player)
+
+    sub_file: Optional[TextIO] = None
+    stopped = False
     try:
-        audio_file = (
-            open(args.write_media, "wb")
-            if args.write_media is not None and args.write_media != "-"
-            else sys.stdout.buffer
-        )
-        sub_file: Optional[TextIO] = (
-            open(args.write_subtitles, "w", encoding="utf-8")
-            if args.write_subtitles is not None and args.write_subtitles != "-"
-            else None
-        )
-        if sub_file is None and args.write_subtitles == "-":
+        if args.write_subtitles is not None and args.write_subtitles != "-":
+            sub_file = open(args.write_subtitles, "w", encoding="utf-8")
+        elif args.write_subtitles == "-":
             sub_file = sys.stderr
 
-        async for chunk in communicate.stream():
+        stream = communicate.stream()
+        async for chunk in stream:
             if chunk["type"] == "audio":
-                audio_file.write(chunk["data"])
+                for sink in audio_sinks:
+                    await sink.write(chunk["data"])
             elif chunk["type"] in ("WordBoundary", "SentenceBoundary"):
                 submaker.feed(chunk)
+                if live is not None:
+                    live.feed(chunk)
+            if player is not None and player.stopped:
+                # The player was quit, so the rest is not synthesized.
+                stopped = True
+                await stream.aclose()
+                break
 
         if sub_file is not None:
             sub_file.write(submaker.get_srt())
+
+        # Closing the player waits for it to finish playing.
+        for sink in audio_sinks:
+            await sink.close()
+        if (
+            OUTPUT_FORMATS[args.output_format].container == "riff"
+            and args.write_media is not None
+            and args.write_media != "-"
+        ):
+            fix_riff_sizes(args.write_media)
+        if live is not None and not stopped:
+            live.finish()
     finally:
-        if audio_file is not sys.stdout.buffer:
-            audio_file.close()
-        if sub_file is not None and sub_file is not sys.stderr:
-            sub_file.close()
+        if live is not None:
+            live.cancel()
+        try:
+            for sink in audio_sinks:
+                await sink.close()
+        finally:
+            if sub_file is not None and sub_file is not sys.stderr:
+                sub_file.close()
+
+
+# The keys a line of a batch manifest can have, and the ones it must have.
+MANIFEST_KEYS = (
+    "text",
+    "file",
+    "voice",
+    "rate",
+    "volume",
+    "pitch",
+    "write_media",
+    "write_subtitles",
+)
+REQUIRED_MANIFEST_KEYS = ("write_media",)
+
+# A job of a batch manifest, as its line number and its entry.
+ManifestEntry = Tuple[int, Dict[str, str]]
+
+
+def _read_manifest(args: UtilArgs) -> List[ManifestEntry]:
+    """
+    Reads the entries of a batch manifest, one JSON object per line, and
+    validates them, so that mistakes are reported before any job starts.
+    Paths are made relative to the directory of the manifest, and settings
+    an entry does not give are taken from the command line.
+    """
+    base = os.path.dirname(args.batch)
+    entries: List[ManifestEntry] = []
+    with open(args.batch, encoding="utf-8") as file:
+        for lineno, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                if not isinstance(entry, dict):
+                    raise ValueError("expected a JSON object")
+                unknown = sorted(set(entry) - set(MANIFEST_KEYS))
+                if unknown:
+                    raise ValueError(f"unknown keys {', '.join(unknown)}")
+                for key, value in entry.items():
+                    if not isinstance(value, str):
+                        raise ValueError(f"{key} must be a string")
+                for key in REQUIRED_MANIFEST_KEYS:
+                    if key not in entry:
+                        raise ValueError(f"{key} is missing")
+                if ("text" in entry) == ("file" in entry):
+                    raise ValueError("exactly one of text and file must be given")
+                for key in ("file", "write_media", "write_subtitles"):
+                    if key in entry:
+                        entry[key] = os.path.join(base, entry[key])
+                if "file" in entry and not os.path.isfile(entry["file"]):
+                    raise ValueError(f"{entry['file']} does not exist")
+                for key in ("voice", "rate", "volume", "pitch"):
+                    entry.setdefault(key, getattr(args, key))
+                TTSConfig(
+                    entry["voice"],
+                    entry["rate"],
+                    entry["volume"],
+                    entry["pitch"],
+                    "SentenceBoundary",
+                    args.output_format,
+                )
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"{args.batch}:{lineno}: {e}") from e
+            entries.append((lineno, entry))
+    return entries
+
+
+def _is_done(entry: Dict[str, str]) -> bool:
+    """Returns whether all outputs of a manifest entry exist."""
+    return all(
+        os.path.exists(entry[key])
+        for key in ("write_media", "write_subtitles")
+        if key in entry
+    )
+
+
+def _read_jobs(entries: List[ManifestEntry]) -> List[BatchJob]:
+    """
+    Returns the jobs of the manifest entries, reading their text files. It
+    is run in a worker thread before the jobs start, so that reading the
+    files does not block the event loop the jobs run on.
+    """
+    jobs: List[BatchJob] = []
+    for _, entry in entries:
+        if "file" in entry:
+            with open(entry["file"], encoding="utf-8") as file:
+                text = file.read()
+        else:
+            text = entry["text"]
+        jobs.append(
+            BatchJob(
+                text,
+                entry["write_media"],
+                subtitles=entry.get("write_subtitles"),
+                voice=entry["voice"],
+                rate=entry["rate"],
+                volume=entry["volume"],
+                pitch=entry["pitch"],
+            )
+        )
+    return jobs
+
+
+async def _run_batch(args: UtilArgs) -> int:
+    """
+    Run the jobs of a batch manifest in one process, printing the progress
+    and a summary, and return the exit status.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        entries = await loop.run_in_executor(None, _read_manifest, args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    started = time.monotonic()
+    reports: Dict[int, Dict[str, Any]] = {}
+    pending: List[ManifestEntry] = []
+    for lineno, entry in entries:
+        if not args.overwrite and _is_done(entry):
+            reports[lineno] = {"line": lineno, "status": "skipped"}
+        else:
+            pending.append((lineno, entry))
+    try:
+        jobs = await loop.run_in_executor(None, _read_jobs, pending)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(
+        f"{len(entries)} jobs, {len(reports)} already done, "
+        f"running {len(pending)} at up to {args.jobs} at once",
+        file=sys.stderr,
+    )
+
+    batch = BatchCommunicator(
+        args.voice,
+        rate=args.rate,
+        volume=args.volume,
+        pitch=args.pitch,
+        output_format=args.output_format,
+        proxy=args.proxy,
+        max_concurrency=args.jobs,
+    )
+    async for result in batch.run(jobs):
+        lineno, entry = pending[result.index]
+        reports[lineno] = {
+            "line": lineno,
+            "status": "done" if result.ok else "failed",
+            "elapsed": round(result.elapsed, 3),
+        }
+        if result.error is not None:
+            reports[lineno]["error"] = f"{type(result.error).__name__}: {result.error}"
+        print(
+            f"[{len(reports)}/{len(entries)}] {reports[lineno]['status']} "
+            f"{entry['write_media']} ({result.elapsed:.2f} s)"
+            + (f": {reports[lineno]['error']}" if result.error is not None else ""),
+            file=sys.stderr,
+        )
+
+    counts = {
+        status: sum(report["status"] == status for report in reports.values())
+        for status in ("done", "skipped", "failed")
+    }
+    elapsed = time.monotonic() - started
+    print(
+        f"{counts['done']} done, {counts['skipped']} skipped, "
+        f"{counts['failed']} failed in {elapsed:.2f} s",
+        file=sys.stderr,
+    )
+    if args.summary is not None:
+        summary = {
+            "manifest": args.batch,
+            **counts,
+            "elapsed": round(elapsed, 3),
+            "jobs": [
+                {
+                    **reports[lineno],
+                    **{
+                        key: entry[key]
+                        for key in ("write_media", "write_subtitles")
+                        if key in entry
+                    },
+                }
+                for lineno, entry in entries
+            ],
+        }
+        with open(args.summary, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+            file.write("\n")
+    return 1 if counts["failed"] else 0
 
 
 async def amain() -> None:
@@ -92,6 +350,14 @@ async def amain() -> None:
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("-t", "--text", help="what TTS will say")
     group.add_argument("-f", "--file", help="same as --text but read from file")
+    group.add_argument(
+        "--batch",
+        metavar="MANIFEST",
+        help="run the jobs of a JSON lines file in one process. Every line is "
+        "an object with text or file, write_media and optionally "
+        "write_subtitles, voice, rate, volume and pitch. Paths are relative "
+        "to the manifest.",
+    )
     parser.add_argument(
         "-v",
         "--voice",
@@ -110,26 +376,79 @@ async def amain() -> None:
     parser.add_argument(
         "--write-media", help="send media output to file instead of stdout"
     )
+    parser.add_argument(
+        "--output-format",
+        default=DEFAULT_OUTPUT_FORMAT,
+        choices=sorted(OUTPUT_FORMATS),
+        metavar="FORMAT",
+        help=f"set audio output format. Default {DEFAULT_OUTPUT_FORMAT}. "
+        f"One of: {', '.join(sorted(OUTPUT_FORMATS))}.",
+    )
     parser.add_argument(
         "--write-subtitles",
         help="send subtitle output to provided file instead of stderr",
     )
+    parser.add_argument(
+        "--play",
+        nargs="?",
+        const="auto",
+        choices=("auto",) + PLAYERS,
+        metavar="PLAYER",
+        help="play the audio as it arrives instead of writing it to stdout, "
+        f"with one of {', '.join(PLAYERS)}. Default: the first one installed.",
+    )
+    parser.add_argument(
+        "--live-subtitles",
+        action="store_true",
+        help="print the subtitles to stderr as they are played with --play",
+    )
     parser.add_argument("--proxy", help="use a proxy for TTS and voice list.")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=4,
+        help="number of --batch jobs run at once, each over its own connection. "
+        "Default 4.",
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="run --batch jobs whose outputs already exist",
+    )
+    parser.add_argument(
+        "--summary", help="write the results of --batch as JSON to this file"
+    )
     args = parser.parse_args(namespace=UtilArgs())
+    if args.jobs < 1:
+        parser.error("--jobs must be greater than 0")
+    if args.live_subtitles and not args.play:
+        parser.error("--live-subtitles requires --play")
+    if args.play and args.batch:
+        parser.error("--play cannot be used with --batch")
+    if args.play:
+        try:
+            find_player(args.output_format, args.play)
+        except ValueError as e:
+            parser.error(str(e))
 
     if args.list_voices:
         await _print_voices(proxy=args.proxy)
         sys.exit(0)
 
-    if args.file is not None:
+    if args.batch:
+        sys.exit(await _run_batch(args))
+
+    # Files are streamed to the service as they are read instead of being
+    # read into memory first.
+    if args.file:
         if args.file in ("-", "/dev/stdin"):
-            args.text = sys.stdin.read()
+            await _run_tts(args, _read_blocks(sys.stdin))
         else:
             with open(args.file, encoding="utf-8") as file:
-                args.text = file.read()
-
-    if args.text is not None:
-        await _run_tts(args)
+                await _run_tts(args, _read_blocks(file))
+    else:
+        await _run_tts(args, args.text)
 
 
 def main() -> None:
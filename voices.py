@@ -6,11 +6,11 @@ import ssl
 from typing import Any, List, Optional
 
 import aiohttp
-import certifi
 from typing_extensions import Unpack
 
 from .constants import SEC_MS_GEC_VERSION, VOICE_HEADERS, VOICE_LIST
 from .drm import DRM
+from .session import SessionManager
 from .typing import Voice, VoicesManagerFind, VoicesManagerVoice
 
 
@@ -53,8 +53,28 @@ async def __list_voices(
     return data
 
 
+async def __list_voices_with_retry(
+    session: aiohttp.ClientSession, ssl_ctx: ssl.SSLContext, proxy: Optional[str]
+) -> List[Voice]:
+    """
+    Private function that calls __list_voices() and retries once after
+    correcting the clock skew if the service rejects the request.
+    """
+    try:
+        return await __list_voices(session, ssl_ctx, proxy)
+    except aiohttp.ClientResponseError as e:
+        if e.status != 403:
+            raise
+
+        DRM.handle_client_response_error(e)
+        return await __list_voices(session, ssl_ctx, proxy)
+
+
 async def list_voices(
-    *, connector: Optional[aiohttp.BaseConnector] = None, proxy: Optional[str] = None
+    *,
+    connector: Optional[aiohttp.BaseConnector] = None,
+    proxy: Optional[str] = None,
+    session_manager: Optional[SessionManager] = None,
 ) -> List[Voice]:
     """
     List all available voices and their attributes.
@@ -65,21 +85,29 @@ async def list_voices(
     Args:
         connector (Optional[aiohttp.BaseConnector]): The connector to use for the request.
         proxy (Optional[str]): The proxy to use for the request.
+        session_manager (Optional[SessionManager]): The session manager to use for
+            the request. Defaults to the process-wide session manager. Cannot be
+            used with connector.
 
     Returns:
         List[Voice]: A list of voices and their attributes.
     """
-    ssl_ctx = ssl.create_default_context(cafile=certifi.where())
-    async with aiohttp.ClientSession(connector=connector, trust_env=True) as session:
-        try:
-            data = await __list_voices(session, ssl_ctx, proxy)
-        except aiohttp.ClientResponseError as e:
-            if e.status != 403:
-                raise
-
-            DRM.handle_client_response_error(e)
-            data = await __list_voices(session, ssl_ctx, proxy)
-    return data
+    if session_manager is not None and connector is not None:
+        raise ValueError("session_manager cannot be used with connector")
+    if session_manager is None:
+        session_manager = SessionManager.default()
+
+    if connector is None:
+        return await __list_voices_with_retry(
+            await session_manager.session(), session_manager.ssl_context, proxy
+        )
+
+    async with aiohttp.ClientSession(
+        connector=connector, trust_env=True, trace_configs=[DRM.trace_config()]
+    ) as session:
+        return await __list_voices_with_retry(
+            session, session_manager.ssl_context, proxy
+        )
 
 
 class VoicesManager:
@@ -93,13 +121,20 @@ class VoicesManager:
 
     @classmethod
     async def create(
-        cls, custom_voices: Optional[List[Voice]] = None
+        cls,
+        custom_voices: Optional[List[Voice]] = None,
+        *,
+        session_manager: Optional[SessionManager] = None,
     ) -> "VoicesManager":
         """
         Creates a VoicesManager object and populates it with all available voices.
         """
         self = VoicesManager()
-        voices = await list_voices() if custom_voices is None else custom_voices
+        voices = (
+            await list_voices(session_manager=session_manager)
+            if custom_voices is None
+            else custom_voices
+        )
         self.voices = [
             {**voice, "Language": voice["Locale"].split("-")[0]} for voice in voices
         ]